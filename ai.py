@@ -1,41 +1,67 @@
 from abc import ABC, abstractmethod
 from units import UnitType, UnitState
+from commands import Attack, Move, Follow, Repair, Supply, Skill
+from tracing import tracer, INFO
 import random
 import math
 
 class AIController(ABC):
+    # 各决策阶段的执行频率（次/秒），子类按需声明；计时使用模拟时间dt
+    PHASE_RATES = {}
+    
     def __init__(self, team):
         self.team = team
+        self.phase_timers = {name: 0.0 for name in self.PHASE_RATES}
         
     @abstractmethod
-    def update(self, units, game_state):
+    def update(self, units, game_state, dt):
         pass
+        
+    def close(self):
+        """释放控制器占用的资源（如子进程）"""
+        pass
+        
+    def advance_phases(self, dt):
+        """所有阶段计时器前进dt"""
+        for name in self.phase_timers:
+            self.phase_timers[name] += dt
+            
+    def phase_ready(self, name):
+        """阶段到期时返回True并开始下一周期（未被检查的到期阶段会一直保持到期）"""
+        period = 1.0 / self.PHASE_RATES[name]
+        timer = self.phase_timers[name]
+        if timer + 1e-9 < period:
+            return False
+        self.phase_timers[name] = min(timer - period, period)
+        return True
 
 class SimpleAI(AIController):
+    PHASE_RATES = {
+        "command": 1 / 0.3,   # 每0.3秒更新一次命令
+        "strategy": 1 / 5.0,  # 每5秒调整策略
+    }
+    
     def __init__(self, team):
         super().__init__(team)
-        self.command_cooldown = 0
-        self.strategy_timer = 0
         self.current_strategy = "aggressive"  # aggressive, defensive, balanced
         self.last_player_mothership_pos = None
         self.attack_waves = []  # 攻击波次
         self.formation_center = None
         
-    def update(self, units, game_state):
-        self.command_cooldown -= 1/60  # 假设60 FPS
-        self.strategy_timer += 1/60
+    def update(self, units, game_state, dt):
+        self.advance_phases(dt)
         
-        if self.command_cooldown > 0:
+        if not self.phase_ready("command"):
             return
             
-        my_units = [u for u in units if u.team == self.team and u.state != UnitState.DEAD]
-        enemy_units = [u for u in units if u.team != self.team and u.state != UnitState.DEAD]
-        player_mothership = game_state.get_mothership(1 - self.team)
+        view = game_state.world_view
+        my_units = view.my_units(self.team)
+        enemy_units = view.enemy_units(self.team)
+        player_mothership = view.mothership(1 - self.team)
         
         # 每5秒调整策略
-        if self.strategy_timer > 5.0:
-            self.adjust_strategy(my_units, enemy_units)
-            self.strategy_timer = 0
+        if self.phase_ready("strategy"):
+            self.adjust_strategy(my_units, enemy_units, view.forces)
             
         # 执行策略
         if self.current_strategy == "aggressive":
@@ -44,13 +70,10 @@ class SimpleAI(AIController):
             self.execute_defensive_strategy(my_units, enemy_units, player_mothership, game_state)
         else:
             self.execute_balanced_strategy(my_units, enemy_units, player_mothership, game_state)
-            
-        self.command_cooldown = 0.3  # 每0.3秒更新一次命令
         
-    def adjust_strategy(self, my_units, enemy_units):
+    def adjust_strategy(self, my_units, enemy_units, forces):
         """根据战场情况调整策略"""
-        my_strength = sum(u.hp + u.attack_damage for u in my_units)
-        enemy_strength = sum(u.hp + u.attack_damage for u in enemy_units)
+        my_strength, enemy_strength = forces.compare(self.team, self.calculate_force_strength)
         
         strength_ratio = my_strength / max(enemy_strength, 1)
         
@@ -61,7 +84,13 @@ class SimpleAI(AIController):
         else:
             self.current_strategy = "balanced"
             
-        print(f"AI Strategy: {self.current_strategy} (Ratio: {strength_ratio:.2f})")
+        if tracer.enabled("ai", INFO):
+            tracer.emit("ai", INFO, f"AI Strategy: {self.current_strategy} (Ratio: {strength_ratio:.2f})", team=self.team)
+        
+    def calculate_force_strength(self, stats):
+        """阵营实力：血量与攻击力之和（读取增量维护的汇总）"""
+        _, hp, attack = stats.totals()
+        return hp + attack
         
     def execute_aggressive_strategy(self, my_units, enemy_units, player_mothership, game_state):
         """激进策略：全力进攻"""
@@ -76,22 +105,18 @@ class SimpleAI(AIController):
                     unit.attack_target != player_mothership or
                     unit.state == UnitState.IDLE):
                     
-                    unit.attack_target = player_mothership
-                    unit.target = player_mothership
-                    unit.state = UnitState.ATTACKING
+                    game_state.commands.submit(Attack(unit, player_mothership))
                     
         # 母舰提供火力支援
-        mothership = game_state.get_mothership(self.team)
+        mothership = game_state.world_view.mothership(self.team)
         if mothership and enemy_units:
             nearest_enemy = min(enemy_units, key=lambda u: mothership.distance_to(u))
             if mothership.distance_to(nearest_enemy) <= mothership.attack_range:
-                mothership.target = nearest_enemy
-                mothership.attack_target = nearest_enemy
-                mothership.state = UnitState.ATTACKING
+                game_state.commands.submit(Attack(mothership, nearest_enemy))
                 
     def execute_defensive_strategy(self, my_units, enemy_units, player_mothership, game_state):
         """防守策略：保护母舰"""
-        mothership = game_state.get_mothership(self.team)
+        mothership = game_state.world_view.mothership(self.team)
         if not mothership:
             return
             
@@ -102,7 +127,7 @@ class SimpleAI(AIController):
                 
             # 能量低时返回母舰
             if unit.energy < 30:
-                unit.state = UnitState.RETURNING
+                game_state.commands.submit(Supply(unit))
                 continue
                 
             # 在母舰附近寻找敌人
@@ -112,9 +137,7 @@ class SimpleAI(AIController):
             if nearby_enemies:
                 # 攻击最近的敌人
                 target = min(nearby_enemies, key=lambda u: unit.distance_to(u))
-                unit.attack_target = target
-                unit.target = target
-                unit.state = UnitState.ATTACKING
+                game_state.commands.submit(Attack(unit, target))
             else:
                 # 在母舰周围巡逻
                 patrol_radius = 150
@@ -122,12 +145,11 @@ class SimpleAI(AIController):
                 patrol_x = mothership.x + math.cos(angle) * patrol_radius
                 patrol_y = mothership.y + math.sin(angle) * patrol_radius
                 
-                unit.target_pos = (patrol_x, patrol_y)
-                unit.state = UnitState.MOVING
+                game_state.commands.submit(Move(unit, (patrol_x, patrol_y)))
                 
     def execute_balanced_strategy(self, my_units, enemy_units, player_mothership, game_state):
         """平衡策略：攻守兼备"""
-        mothership = game_state.get_mothership(self.team)
+        mothership = game_state.world_view.mothership(self.team)
         combat_units = [u for u in my_units if u.unit_type != UnitType.MOTHERSHIP and u.unit_type != UnitType.REPAIR]
         repair_units = [u for u in my_units if u.unit_type == UnitType.REPAIR]
         
@@ -138,7 +160,7 @@ class SimpleAI(AIController):
         # 进攻单位：攻击最近的敌人
         for unit in attack_units:
             if unit.energy < 20:
-                unit.state = UnitState.RETURNING
+                game_state.commands.submit(Supply(unit))
                 continue
                 
             if enemy_units:
@@ -149,14 +171,12 @@ class SimpleAI(AIController):
                 else:
                     target = min(enemy_units, key=lambda u: unit.distance_to(u))
                     
-                unit.attack_target = target
-                unit.target = target
-                unit.state = UnitState.ATTACKING
+                game_state.commands.submit(Attack(unit, target))
                 
         # 防守单位：保护母舰和修理机
         for unit in defense_units:
             if unit.energy < 30:
-                unit.state = UnitState.RETURNING
+                game_state.commands.submit(Supply(unit))
                 continue
                 
             # 寻找威胁母舰的敌人
@@ -165,19 +185,16 @@ class SimpleAI(AIController):
                       
             if threats:
                 target = min(threats, key=lambda u: unit.distance_to(u))
-                unit.attack_target = target
-                unit.target = target
-                unit.state = UnitState.ATTACKING
+                game_state.commands.submit(Attack(unit, target))
             else:
                 # 跟随母舰
                 if mothership:
-                    unit.follow_target = mothership
-                    unit.state = UnitState.FOLLOWING
+                    game_state.commands.submit(Follow(unit, mothership))
                     
         # 修理机逻辑
         for repair_unit in repair_units:
             if repair_unit.energy < 20:
-                repair_unit.state = UnitState.RETURNING
+                game_state.commands.submit(Supply(repair_unit))
                 continue
                 
             # 寻找需要修理的单位
@@ -186,20 +203,17 @@ class SimpleAI(AIController):
             if damaged_allies:
                 # 优先修理血量最低的
                 target = min(damaged_allies, key=lambda u: u.hp / u.max_hp)
-                repair_unit.repair_target = target
-                repair_unit.target = target
-                repair_unit.state = UnitState.REPAIRING
+                game_state.commands.submit(Repair(repair_unit, target))
             else:
                 # 跟随母舰
                 if mothership:
-                    repair_unit.follow_target = mothership
-                    repair_unit.state = UnitState.FOLLOWING
+                    game_state.commands.submit(Follow(repair_unit, mothership))
                     
         # 母舰AI：使用技能和攻击
         if mothership:
             # 使用技能
             if hasattr(mothership, 'sp') and mothership.sp >= mothership.max_sp:
-                mothership.use_skill(my_units + enemy_units, game_state)
+                game_state.commands.submit(Skill(mothership, game_state.world_view.units))
                 
             # 攻击范围内的敌人
             if enemy_units:
@@ -208,15 +222,13 @@ class SimpleAI(AIController):
                 if enemies_in_range:
                     # 优先攻击血量低的敌人
                     target = min(enemies_in_range, key=lambda u: u.hp)
-                    mothership.attack_target = target
-                    mothership.target = target
-                    mothership.state = UnitState.ATTACKING
+                    game_state.commands.submit(Attack(mothership, target))
                     
         # 使用技能
         for unit in my_units:
             if (hasattr(unit, 'sp') and unit.sp >= unit.max_sp and 
                 unit.unit_type != UnitType.MOTHERSHIP):
-                unit.use_skill(my_units + enemy_units, game_state)
+                game_state.commands.submit(Skill(unit, game_state.world_view.units))
 
 class AggressiveAI(SimpleAI):
     """更激进的AI"""
@@ -224,7 +236,7 @@ class AggressiveAI(SimpleAI):
         super().__init__(team)
         self.current_strategy = "aggressive"
         
-    def adjust_strategy(self, my_units, enemy_units):
+    def adjust_strategy(self, my_units, enemy_units, forces):
         # 始终保持激进
         self.current_strategy = "aggressive"
 
@@ -234,6 +246,6 @@ class DefensiveAI(SimpleAI):
         super().__init__(team)
         self.current_strategy = "defensive"
         
-    def adjust_strategy(self, my_units, enemy_units):
+    def adjust_strategy(self, my_units, enemy_units, forces):
         # 始终保持防守
         self.current_strategy = "defensive"
\ No newline at end of file
@@ -0,0 +1,53 @@
+import importlib
+
+# AI类型 -> (模块, 类名)，从强到弱排列；模块在第一次创建该类型的控制器时才导入
+AI_REGISTRY = {
+    # 恶魔级AI（最高难度）
+    "apocalypse": ("demon_ai", "ApocalypseAI"),
+    "nightmare": ("demon_ai", "NightmareAI"),
+    "demon": ("demon_ai", "DemonAI"),
+    # 空战专用AI
+    "kamikaze": ("dogfight_ai", "KamikazeAI"),
+    "blitzkrieg": ("dogfight_ai", "BlitzkriegAI"),
+    "dogfight": ("dogfight_ai", "DogfightAI"),
+    # 精英级AI
+    "terminator": ("super_ai", "TerminatorAI"),
+    "elite": ("super_ai", "EliteAI"),
+    # 改进AI系列
+    "hyper_aggressive": ("improved_ai", "HyperAggressiveAI"),
+    "turtle": ("improved_ai", "TurtleAI"),
+    "advanced": ("improved_ai", "AdvancedAI"),
+    # 基础AI系列
+    "aggressive": ("ai", "AggressiveAI"),
+    "defensive": ("ai", "DefensiveAI"),
+    "simple": ("ai", "SimpleAI"),
+}
+
+DEFAULT_AI_TYPE = "elite"  # 未知AI类型使用的默认AI
+
+# 已解析的AI类型 -> 控制器类
+ai_classes = {}
+
+def ai_types():
+    """所有已注册的AI类型（从强到弱）"""
+    return tuple(AI_REGISTRY)
+
+def register_ai(ai_type, module_name, class_name):
+    """注册（或替换）一种AI类型，模块延迟到第一次使用时导入"""
+    AI_REGISTRY[ai_type] = (module_name, class_name)
+    ai_classes.pop(ai_type, None)
+
+def get_ai_class(ai_type):
+    """解析AI类型对应的控制器类，未知类型返回默认AI"""
+    if ai_type not in AI_REGISTRY:
+        ai_type = DEFAULT_AI_TYPE
+    cls = ai_classes.get(ai_type)
+    if cls is None:
+        module_name, class_name = AI_REGISTRY[ai_type]
+        cls = getattr(importlib.import_module(module_name), class_name)
+        ai_classes[ai_type] = cls
+    return cls
+
+def create_ai_controller(ai_type, team):
+    """创建AI控制器"""
+    return get_ai_class(ai_type)(team)
@@ -0,0 +1,56 @@
+import time
+from units import UnitState
+from config import AI_FRAME_BUDGET_MS, AI_MIN_UNITS_PER_FRAME, AI_COST_SMOOTHING
+
+def needs_attention(unit):
+    """优先决策的单位：目标已死亡/丢失，或正处于交战距离内"""
+    target = unit.attack_target
+    if target is None or target.state == UnitState.DEAD:
+        return True
+    return unit.distance_to(target) <= unit.attack_range * 1.5
+
+class AIScheduler:
+    """按时间预算分帧的单位决策调度
+
+    每帧按"优先单位在前、其余按上次决策时间轮转"的顺序产出单位，
+    并用指数平均估计单个单位的决策耗时，预计超出预算时停止，
+    没轮到的单位保持上一次的命令。每帧至少处理 min_units 个单位。
+    budget_ms 为 None 时不限预算（每帧处理全部单位，结果与帧耗时无关）。
+    """
+
+    def __init__(self, budget_ms=AI_FRAME_BUDGET_MS, min_units=AI_MIN_UNITS_PER_FRAME):
+        self.budget_ms = budget_ms
+        self.min_units = min_units
+        self.cost = 0.0  # 单个单位决策的平均耗时（秒）
+        self.frame = 0
+        self.served = {}  # 单位 -> 上次决策的帧序号
+        self.processed = 0
+        self.total = 0
+
+    def schedule(self, units, priority=needs_attention):
+        """产出本帧要决策的单位"""
+        self.frame += 1
+        served = self.served
+        if len(served) > len(units) * 2 + 16:
+            served = {u: served[u] for u in units if u in served}
+            self.served = served
+
+        if priority is None:
+            queue = sorted(units, key=lambda u: served.get(u, -1))
+        else:
+            queue = sorted(units, key=lambda u: (not priority(u), served.get(u, -1)))
+        self.total = len(queue)
+        self.processed = 0
+
+        budget = self.budget_ms / 1000 if self.budget_ms is not None else None
+        start = last = time.perf_counter()
+        for unit in queue:
+            if (budget is not None and self.processed >= self.min_units and
+                    last - start + self.cost > budget):
+                break
+            served[unit] = self.frame
+            yield unit
+            now = time.perf_counter()
+            self.cost += (now - last - self.cost) * AI_COST_SMOOTHING
+            last = now
+            self.processed += 1
@@ -0,0 +1,170 @@
+import math
+import random
+import multiprocessing
+from collections import deque
+from ai import AIController
+from units import UnitType, UnitState
+from world_view import WorldView
+from influence_map import InfluenceMap
+from prediction import MotionTracker
+from team_stats import ForceStats
+from commands import CommandQueue, decode_command
+from config import AI_WORKER_LATENCY
+
+REFERENCE_FIELDS = ('target', 'attack_target', 'follow_target', 'repair_target')
+
+def unit_ref(value):
+    """单位引用转成id，其他值原样返回"""
+    return value.id if value is not None and hasattr(value, 'id') else value
+
+def make_snapshot(units, known_ids):
+    """把单位列表压缩成元组；子进程没见过的单位额外附带静态信息"""
+    statics = []
+    rows = []
+    for unit in units:
+        if unit.id not in known_ids:
+            known_ids.add(unit.id)
+            statics.append((unit.id, unit.team, unit.unit_type.value, unit.name, unit.skill_data))
+        rows.append((unit.id, unit.x, unit.y, unit.vx, unit.vy, unit.hp, unit.max_hp,
+                     unit.attack_damage, unit.attack_range, unit.energy, unit.max_energy,
+                     unit.sp, unit.max_sp, unit.speed, unit.state.value,
+                     unit_ref(unit.target), unit.target_pos, unit_ref(unit.attack_target),
+                     unit_ref(unit.follow_target), unit_ref(unit.repair_target)))
+    return statics, rows
+
+class UnitProxy:
+    """子进程中的单位镜像，只包含AI读写的字段"""
+
+    def __init__(self, unit_id, team, unit_type, name, skill_data):
+        self.id = unit_id
+        self.team = team
+        self.unit_type = UnitType(unit_type)
+        self.name = name
+        self.skill_data = skill_data
+
+    def distance_to(self, other):
+        return math.sqrt((self.x - other.x) ** 2 + (self.y - other.y) ** 2)
+
+class WorkerWorld:
+    """子进程中的游戏状态替身：维护单位镜像、影响力图、运动历史、实力汇总、世界快照和命令队列"""
+
+    def __init__(self):
+        self.proxies = {}  # id -> UnitProxy（跨tick复用，AI按单位对象缓存的数据保持有效）
+        self.units = []
+        self.influence_map = InfluenceMap()
+        self.motion = MotionTracker()
+        self.forces = ForceStats()  # 单位镜像不跟踪属性变化，每tick按快照重建
+        self.world_view = WorldView(())
+        # AI提交的命令，编码后传回主进程应用；到那时单位状态已变化，去重交给主进程
+        self.commands = CommandQueue(dedup=False)
+        self.level_time = 0
+
+    def apply_snapshot(self, level_time, statics, rows):
+        proxies = self.proxies
+        for unit_id, team, unit_type, name, skill_data in statics:
+            proxies[unit_id] = UnitProxy(unit_id, team, unit_type, name, skill_data)
+
+        alive = set()
+        pending_refs = []
+        for row in rows:
+            (unit_id, x, y, vx, vy, hp, max_hp, attack_damage, attack_range, energy, max_energy,
+             sp, max_sp, speed, state, target, target_pos, attack_target,
+             follow_target, repair_target) = row
+            proxy = proxies[unit_id]
+            proxy.x, proxy.y, proxy.vx, proxy.vy = x, y, vx, vy
+            proxy.hp, proxy.max_hp, proxy.attack_damage, proxy.attack_range = hp, max_hp, attack_damage, attack_range
+            proxy.energy, proxy.max_energy, proxy.sp, proxy.max_sp = energy, max_energy, sp, max_sp
+            proxy.speed = speed
+            proxy.state = UnitState(state)
+            proxy.target_pos = target_pos
+            pending_refs.append((proxy, (target, attack_target, follow_target, repair_target)))
+            alive.add(unit_id)
+
+        # 已移除的单位标记为死亡，AI里残留的引用可以据此判断
+        for unit_id in [i for i in proxies if i not in alive]:
+            proxies.pop(unit_id).state = UnitState.DEAD
+
+        for proxy, refs in pending_refs:
+            for name, ref in zip(REFERENCE_FIELDS, refs):
+                setattr(proxy, name, proxies.get(ref) if ref is not None else None)
+
+        self.units = [proxies[row[0]] for row in rows]
+        self.level_time = level_time
+        self.influence_map.update(self.units)
+        self.motion.record(self.units, level_time)
+        self.forces.rebuild(self.units)
+        self.world_view = WorldView(self.units, level_time, self.influence_map, self.motion, self.forces)
+
+    def collect_commands(self):
+        """取出本tick提交的命令并编码"""
+        return [command.encode() for command in self.commands.drain()]
+
+def worker_main(conn, controller, seed):
+    """子进程入口：接收快照、运行AI、返回命令，收到None时退出"""
+    if seed is not None:
+        random.seed(seed)
+    # 子进程不占用主循环时间，逐单位决策不再按时间预算截断，结果只取决于快照
+    if hasattr(controller, 'unit_scheduler'):
+        controller.unit_scheduler.budget_ms = None
+    world = WorkerWorld()
+    while True:
+        message = conn.recv()
+        if message is None:
+            break
+        level_time, dt, statics, rows = message
+        world.apply_snapshot(level_time, statics, rows)
+        controller.update(world.units, world, dt)
+        conn.send(world.collect_commands())
+    conn.close()
+
+def apply_commands(commands, game_state):
+    """在主进程把命令提交到命令队列，单位或目标已移除的命令丢弃"""
+    if not commands:
+        return
+    by_id = {unit.id: unit for unit in game_state.world_view.units}
+    for row in commands:
+        command = decode_command(row, by_id)
+        if command is not None:
+            game_state.commands.submit(command)
+
+class WorkerAIController(AIController):
+    """在子进程中运行AI控制器
+
+    每个tick把世界快照发给子进程，tick N 的决策在 tick N+latency 应用。
+    到期的命令没有返回时阻塞等待，因此结果与子进程快慢无关。
+    """
+
+    def __init__(self, controller, latency=AI_WORKER_LATENCY, seed=None):
+        super().__init__(controller.team)
+        self.latency = max(1, latency)
+        self.in_flight = deque()  # 已发送、尚未应用的快照数
+        self.known_ids = set()
+        context = multiprocessing.get_context('spawn')
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=worker_main, args=(child_conn, controller, seed),
+                                       daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def update(self, units, game_state, dt):
+        while len(self.in_flight) >= self.latency:
+            self.in_flight.popleft()
+            apply_commands(self.conn.recv(), game_state)
+
+        statics, rows = make_snapshot(game_state.world_view.units, self.known_ids)
+        self.conn.send((game_state.level_time, dt, statics, rows))
+        self.in_flight.append(game_state.level_time)
+
+    def close(self):
+        """通知子进程退出"""
+        if self.process is None:
+            return
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.conn.close()
+        self.process = None
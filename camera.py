@@ -1,4 +1,5 @@
 import pygame
+import copy
 from config import EDGE_SCROLL_MARGIN, EDGE_SCROLL_SPEED, MAP_WIDTH, MAP_HEIGHT
 
 class Camera:
@@ -152,6 +153,14 @@ class Camera:
         self.zoom = max(self.zoom / 1.1, self.min_zoom)
         self.clamp_position()
         
+    def scaled(self, scale):
+        """获取按比例缩小的视图（用于降低分辨率渲染）"""
+        view = copy.copy(self)
+        view.width = int(self.width * scale)
+        view.height = int(self.height * scale)
+        view.zoom = self.zoom * scale
+        return view
+        
     def focus_on(self, x, y):
         """立即聚焦到指定位置"""
         self.x = x
@@ -1,7 +1,7 @@
-import pygame
 import math
 from config import *
 from units import UnitType
+from commands import Attack, Move, Follow, Repair, Supply, Skill
 
 class CommandSystem:
     def __init__(self):
@@ -41,70 +41,52 @@ class CommandSystem:
     def execute_command_at_position(self, game_state, camera):
         """在当前光标位置执行命令"""
         if self.mode == CommandMode.SELECTING_TARGET and self.pending_command:
+            commands = game_state.commands
             if self.pending_command == "move":
-                self.execute_move_command()
+                self.execute_move_command(commands)
             elif self.valid_target:
                 if self.pending_command == "attack":
-                    self.execute_attack_command()
+                    self.execute_attack_command(commands)
                 elif self.pending_command == "follow":
-                    self.execute_follow_command()
+                    self.execute_follow_command(commands)
                 elif self.pending_command == "repair":
-                    self.execute_repair_command()
+                    self.execute_repair_command(commands)
                     
         self.cancel_command()
         
-    def execute_move_command(self):
+    def execute_move_command(self, commands):
         """执行移动命令"""
-        from units import UnitState
         for unit in self.pending_units:
-            unit.target_pos = self.cursor_pos
-            unit.state = UnitState.MOVING
-            unit.target = None
-            unit.attack_target = None
-            unit.repair_target = None
+            commands.submit(Move(unit, self.cursor_pos))
             
-    def execute_attack_command(self):
+    def execute_attack_command(self, commands):
         """执行攻击(追击)命令"""
-        from units import UnitState
         for unit in self.pending_units:
             if unit.attack_damage > 0 and unit.unit_type != UnitType.REPAIR:
-                unit.attack_target = self.valid_target
-                unit.target = self.valid_target
-                unit.state = UnitState.ATTACKING
+                commands.submit(Attack(unit, self.valid_target))
                 
-    def execute_follow_command(self):
+    def execute_follow_command(self, commands):
         """执行跟随命令"""
-        from units import UnitState
         for unit in self.pending_units:
-            unit.follow_target = self.valid_target
-            unit.state = UnitState.FOLLOWING
-            unit.attack_target = None
-            unit.repair_target = None
+            commands.submit(Follow(unit, self.valid_target))
             
-    def execute_repair_command(self):
+    def execute_repair_command(self, commands):
         """执行修理命令"""
-        from units import UnitState
         for unit in self.pending_units:
             if unit.unit_type == UnitType.REPAIR or unit.unit_type == UnitType.MOTHERSHIP:
-                unit.repair_target = self.valid_target
-                unit.target = self.valid_target
-                unit.state = UnitState.REPAIRING
+                commands.submit(Repair(unit, self.valid_target))
                 
     def execute_direct_command(self, command_type, units, game_state):
         """执行直接命令（不需要选择目标）"""
-        from units import UnitState
-        
+        commands = game_state.commands
         if command_type == "supply":
             for unit in units:
                 if unit.unit_type != UnitType.MOTHERSHIP:
-                    unit.state = UnitState.RETURNING
-                    unit.attack_target = None
-                    unit.repair_target = None
+                    commands.submit(Supply(unit))
                     
         elif command_type == "skill":
             for unit in units:
-                if unit.unit_type != UnitType.MOTHERSHIP and unit.sp >= unit.max_sp:
-                    unit.use_skill(game_state.units, game_state)
+                commands.submit(Skill(unit, game_state.units))
                     
     def cancel_command(self):
         """取消命令"""
@@ -158,7 +140,7 @@ class CommandSystem:
         dy /= length
         
         # 绘制箭头主线
-        pygame.draw.line(screen, color, (start_x, start_y), (end_x, end_y), 3)
+        screen.line(color, (start_x, start_y), (end_x, end_y), 3)
         
         # 绘制箭头头部
         arrow_length = min(20, length * 0.2)  # 箭头头部长度
@@ -172,19 +154,19 @@ class CommandSystem:
         right_y = end_y - arrow_length * (dy * math.cos(-arrow_angle) + dx * math.sin(-arrow_angle))
         
         # 绘制箭头头部
-        pygame.draw.line(screen, color, (end_x, end_y), (left_x, left_y), 3)
-        pygame.draw.line(screen, color, (end_x, end_y), (right_x, right_y), 3)
+        screen.line(color, (end_x, end_y), (left_x, left_y), 3)
+        screen.line(color, (end_x, end_y), (right_x, right_y), 3)
         
     def draw_target_indicator(self, screen, x, y, color):
         """绘制目标指示器"""
         # 绘制目标圈
-        pygame.draw.circle(screen, color, (int(x), int(y)), 15, 2)
-        pygame.draw.circle(screen, color, (int(x), int(y)), 8, 2)
+        screen.circle(color, (int(x), int(y)), 15, 2)
+        screen.circle(color, (int(x), int(y)), 8, 2)
         
     def draw_position_indicator(self, screen, x, y, color):
         """绘制位置指示器"""
         # 绘制位置标记
-        pygame.draw.circle(screen, color, (int(x), int(y)), 8, 2)
+        screen.circle(color, (int(x), int(y)), 8, 2)
         # 绘制十字
-        pygame.draw.line(screen, color, (x-6, y), (x+6, y), 2)
-        pygame.draw.line(screen, color, (x, y-6), (x, y+6), 2)
\ No newline at end of file
+        screen.line(color, (x-6, y), (x+6, y), 2)
+        screen.line(color, (x, y-6), (x, y+6), 2)
\ No newline at end of file
@@ -0,0 +1,255 @@
+from collections import Counter
+from units import UnitType, UnitState
+
+class Command:
+    """单位命令基类
+
+    玩家和AI只提交命令，由 GameState 在tick开始时统一应用到单位上。
+    同一单位同一通道（channel）的命令在一个tick内后提交的覆盖先提交的。
+    """
+
+    __slots__ = ('unit',)
+    channel = 'order'
+    ARGS = ()  # 除unit外的构造参数，编码时按此顺序输出
+    UNIT_ARGS = ()  # 引用单位的参数，编码时转成id
+
+    def __init__(self, unit):
+        self.unit = unit
+
+    def is_noop(self):
+        """应用后单位状态不会变化（重复命令）"""
+        return False
+
+    def apply(self, game_state):
+        raise NotImplementedError
+
+    def encode(self):
+        """编码成只含基本类型的元组 (类型名, 单位id, 参数)，用于子进程AI和回放"""
+        args = []
+        for name in self.ARGS:
+            value = getattr(self, name)
+            if name in self.UNIT_ARGS and value is not None:
+                value = value.id
+            args.append(value)
+        return (type(self).__name__, self.unit.id, tuple(args))
+
+    @classmethod
+    def decode_args(cls, args, by_id):
+        """把编码的参数还原成构造参数，引用的单位已不存在时返回None"""
+        values = []
+        for name, value in zip(cls.ARGS, args):
+            if name in cls.UNIT_ARGS and value is not None:
+                value = by_id.get(value)
+                if value is None:
+                    return None
+            values.append(value)
+        return values
+
+    def __repr__(self):
+        args = ', '.join(repr(getattr(self, name)) for name in self.ARGS)
+        return f"{type(self).__name__}({self.unit!r}{', ' if args else ''}{args})"
+
+class Attack(Command):
+    """攻击（追击）目标；aim 为可选的拦截点，写入 target_pos"""
+
+    __slots__ = ('target', 'aim')
+    ARGS = ('target', 'aim')
+    UNIT_ARGS = ('target',)
+
+    def __init__(self, unit, target, aim=None):
+        super().__init__(unit)
+        self.target = target
+        self.aim = aim
+
+    def is_noop(self):
+        unit = self.unit
+        return (unit.state == UnitState.ATTACKING and
+                unit.attack_target is self.target and unit.target is self.target and
+                (self.aim is None or unit.target_pos == self.aim))
+
+    def apply(self, game_state):
+        unit = self.unit
+        unit.attack_target = self.target
+        unit.target = self.target
+        unit.state = UnitState.ATTACKING
+        if self.aim is not None:
+            unit.target_pos = self.aim
+
+class Move(Command):
+    """移动到指定位置，放弃当前的攻击/修理目标"""
+
+    __slots__ = ('pos',)
+    ARGS = ('pos',)
+
+    def __init__(self, unit, pos):
+        super().__init__(unit)
+        self.pos = pos
+
+    def is_noop(self):
+        unit = self.unit
+        return (unit.state == UnitState.MOVING and unit.target_pos == self.pos and
+                unit.target is None and unit.attack_target is None and unit.repair_target is None)
+
+    def apply(self, game_state):
+        unit = self.unit
+        unit.target_pos = self.pos
+        unit.state = UnitState.MOVING
+        unit.target = None
+        unit.attack_target = None
+        unit.repair_target = None
+
+class Follow(Command):
+    """跟随友方单位，放弃当前的攻击/修理目标"""
+
+    __slots__ = ('target',)
+    ARGS = ('target',)
+    UNIT_ARGS = ('target',)
+
+    def __init__(self, unit, target):
+        super().__init__(unit)
+        self.target = target
+
+    def is_noop(self):
+        unit = self.unit
+        return (unit.state == UnitState.FOLLOWING and unit.follow_target is self.target and
+                unit.attack_target is None and unit.repair_target is None)
+
+    def apply(self, game_state):
+        unit = self.unit
+        unit.follow_target = self.target
+        unit.state = UnitState.FOLLOWING
+        unit.attack_target = None
+        unit.repair_target = None
+
+class Repair(Command):
+    """修理友方单位"""
+
+    __slots__ = ('target',)
+    ARGS = ('target',)
+    UNIT_ARGS = ('target',)
+
+    def __init__(self, unit, target):
+        super().__init__(unit)
+        self.target = target
+
+    def is_noop(self):
+        unit = self.unit
+        return (unit.state == UnitState.REPAIRING and
+                unit.repair_target is self.target and unit.target is self.target)
+
+    def apply(self, game_state):
+        unit = self.unit
+        unit.repair_target = self.target
+        unit.target = self.target
+        unit.state = UnitState.REPAIRING
+
+class Supply(Command):
+    """返回母舰补给，放弃当前的攻击/修理目标"""
+
+    __slots__ = ()
+
+    def is_noop(self):
+        unit = self.unit
+        return (unit.state == UnitState.RETURNING and
+                unit.attack_target is None and unit.repair_target is None)
+
+    def apply(self, game_state):
+        unit = self.unit
+        unit.state = UnitState.RETURNING
+        unit.attack_target = None
+        unit.repair_target = None
+
+class Skill(Command):
+    """释放技能，targets 为技能作用的候选单位；技能未就绪时丢弃"""
+
+    __slots__ = ('targets',)
+    channel = 'skill'
+    ARGS = ('targets',)
+
+    def __init__(self, unit, targets):
+        super().__init__(unit)
+        self.targets = targets
+
+    def is_noop(self):
+        unit = self.unit
+        return (unit.unit_type == UnitType.MOTHERSHIP or not unit.skill_data or
+                unit.sp < unit.max_sp)
+
+    def apply(self, game_state):
+        self.unit.use_skill(self.targets, game_state)
+
+    def encode(self):
+        return ('Skill', self.unit.id, (tuple(u.id for u in self.targets),))
+
+    @classmethod
+    def decode_args(cls, args, by_id):
+        return [[by_id[i] for i in args[0] if i in by_id]]
+
+COMMAND_TYPES = {cls.__name__: cls for cls in (Attack, Move, Follow, Repair, Supply, Skill)}
+
+def decode_command(row, by_id):
+    """还原 Command.encode() 的结果，单位或目标已不存在时返回None"""
+    name, unit_id, args = row
+    unit = by_id.get(unit_id)
+    if unit is None:
+        return None
+    cls = COMMAND_TYPES[name]
+    values = cls.decode_args(args, by_id)
+    if values is None:
+        return None
+    return cls(unit, *values)
+
+class CommandQueue:
+    """待应用的单位命令
+
+    submit() 时丢弃与单位当前状态相同的重复命令，同一单位同一通道只保留最后一条；
+    flush() 在tick开始时按提交顺序应用（跳过已死亡的单位）。
+    stats 按 submitted/dropped/superseded/applied 计数，applied_by_type 按命令类型计数。
+    dedup 为False时不按单位状态去重（单位状态只是快照、命令稍后在别处应用时使用）。
+    """
+
+    def __init__(self, dedup=True):
+        self.dedup = dedup
+        self.pending = {}  # (单位, 通道) -> 命令
+        self.stats = Counter()
+        self.applied_by_type = Counter()
+
+    def clear(self):
+        self.pending.clear()
+
+    def submit(self, command):
+        """提交命令，被当作重复命令丢弃时返回False"""
+        self.stats['submitted'] += 1
+        key = (command.unit, command.channel)
+        if self.dedup and command.is_noop():
+            # 后提交的命令优先：已有的待应用命令也一并作废
+            if self.pending.pop(key, None) is not None:
+                self.stats['superseded'] += 1
+            self.stats['dropped'] += 1
+            return False
+        if key in self.pending:
+            self.stats['superseded'] += 1
+            del self.pending[key]
+        self.pending[key] = command
+        return True
+
+    def drain(self):
+        """取出所有待应用的命令（不应用）"""
+        commands = list(self.pending.values())
+        self.pending.clear()
+        return commands
+
+    def flush(self, game_state):
+        """应用所有待应用的命令，返回实际应用的命令列表"""
+        if not self.pending:
+            return []
+        applied = []
+        for command in self.drain():
+            if command.unit.state == UnitState.DEAD or command.is_noop():
+                self.stats['dropped'] += 1
+                continue
+            command.apply(game_state)
+            applied.append(command)
+            self.applied_by_type[type(command).__name__] += 1
+        self.stats['applied'] += len(applied)
+        return applied
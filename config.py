@@ -60,6 +60,75 @@ FIGHTER_AUTO_ATTACK_RANGE = 300  # 战斗机自动攻击范围
 CIRCLE_STRAFE_RADIUS = 100  # 围绕攻击半径
 CIRCLE_STRAFE_SPEED = 1  # 围绕速度
 
+# 缩放细节层级（LOD）设置
+LOD_SIMPLE_ZOOM = 0.8   # 缩放低于此值时不再绘制属性条、状态点和指示线
+LOD_DOT_ZOOM = 0.6      # 缩放低于此值时单位简化为阵营色圆点
+LOD_CLUSTER_CELL = 14   # 圆点模式下的合并网格（屏幕像素），同格同阵营单位合并为一个点
+
+# 特效帧缓存设置
+EFFECT_CACHE_FRAMES = 12                  # 每种特效预渲染的帧数
+EFFECT_CACHE_RADIUS_STEP = 4              # 屏幕半径档位（像素）
+EFFECT_CACHE_MAX_RADIUS = 160             # 超过此屏幕半径的特效直接绘制不缓存
+EFFECT_CACHE_MAX_BYTES = 32 * 1024 * 1024  # 帧缓存占用上限
+
+# AI世界快照设置
+SPATIAL_CELL_SIZE = 150  # 空间索引的网格大小
+
+# 影响力图设置
+INFLUENCE_CELL_SIZE = 50     # 影响力网格大小
+INFLUENCE_RADIUS = 400       # 单位威胁的影响半径（线性衰减到0）
+INFLUENCE_NEAR_RADIUS = 200  # 近距离统计半径
+INFLUENCE_MID_RADIUS = 400   # 中距离统计半径
+
+# 运动预测设置
+PREDICTION_HISTORY = 10      # 每个单位保留的位置采样数（每tick一个）
+
+# AI调度设置
+AI_FRAME_BUDGET_MS = 2.0     # 每个AI控制器每帧逐单位决策的时间预算（毫秒）
+AI_MIN_UNITS_PER_FRAME = 4   # 每帧至少决策的单位数
+AI_COST_SMOOTHING = 0.2      # 单位决策耗时的指数平均系数
+
+# AI子进程设置
+AI_WORKER_ENABLED = False    # 是否在子进程中运行AI控制器
+AI_WORKER_LATENCY = 1        # tick N 的AI决策在 tick N+延迟 应用
+
+# 小地图设置
+MINIMAP_SIZE = 200      # 小地图边长（像素）
+MINIMAP_MARGIN = 10     # 距屏幕右上角的边距
+MINIMAP_UNIT_HZ = 10    # 单位点层每秒刷新次数
+
+# 画质自适应设置
+QUALITY_FRAME_BUDGET_MS = 1000 / FPS  # 每帧预算（毫秒）
+QUALITY_SAMPLE_FRAMES = 60            # 滚动平均的帧数
+QUALITY_DOWNGRADE_RATIO = 1.1         # 平均帧时间超过预算的此倍数时降档
+QUALITY_UPGRADE_RATIO = 0.6           # 平均帧时间低于预算的此倍数时升档
+QUALITY_HOLD_FRAMES = 120             # 切换档位后至少保持的帧数（滞后，防止来回跳档）
+QUALITY_TIERS = [
+    # max_effects: 同时存在的特效上限（None为不限）  projectile_lines: 是否绘制射击线
+    # status_bars: 是否绘制属性条  star_density: 星空绘制比例  render_scale: 内部渲染分辨率比例
+    {'name': '高', 'max_effects': None, 'projectile_lines': True, 'status_bars': True, 'star_density': 1.0, 'render_scale': 1.0},
+    {'name': '中', 'max_effects': 120, 'projectile_lines': True, 'status_bars': True, 'star_density': 0.6, 'render_scale': 1.0},
+    {'name': '低', 'max_effects': 60, 'projectile_lines': False, 'status_bars': False, 'star_density': 0.3, 'render_scale': 1.0},
+    {'name': '最低', 'max_effects': 30, 'projectile_lines': False, 'status_bars': False, 'star_density': 0.0, 'render_scale': 0.75},
+]
+
+# 帧录制设置
+CAPTURE_DIR = "captures"     # 录制输出目录
+CAPTURE_FORMAT = "png"       # png: 图片序列；raw: 原始RGB帧 + 索引
+CAPTURE_FRAME_SKIP = 1       # 每录一帧后跳过的帧数
+CAPTURE_SCALE = 0.5          # 录制分辨率比例
+CAPTURE_QUEUE_SIZE = 30      # 待写盘帧队列上限，满了直接丢帧
+
+# 跟踪日志设置（环境变量 RTS_TRACE / RTS_TRACE_FILE 可覆盖）
+TRACE_SPEC = "info"          # 记录级别：debug/info/warning/off，可按分类设置，如 "info,ai:debug"
+TRACE_FILE = None            # JSONL输出路径，None表示只保留在内存
+TRACE_BUFFER_SIZE = 2000     # 内存中保留的最近事件数
+
+# 回放设置
+REPLAY_RECORD = False        # 游戏中是否录制回放（随机种子 + 每tick应用的命令）
+REPLAY_DIR = "replays"       # 回放输出目录
+REPLAY_CHECKSUM_INTERVAL = 30  # 每隔多少tick记录一次状态校验和
+
 # 评分系统
 SCORE_BASE_VICTORY = 1000  # 胜利基础分
 SCORE_TIME_BONUS_MAX = 500  # 最大时间奖励
@@ -1,8 +1,7 @@
-import math
-import random
-import time
 from super_ai import TerminatorAI
-from units import UnitType, UnitState
+from target_scoring import TargetScorer, DogfightTargetProfile
+from commands import Attack, Supply, Skill
+from tracing import tracer, DEBUG
 from config import *
 
 class DogfightAI(TerminatorAI):
@@ -12,24 +11,27 @@ class DogfightAI(TerminatorAI):
         super().__init__(team)
         self.dogfight_mode = True
         self.engagement_range = 9999  # 无限交战距离
-        self.last_enemy_positions = {}
+        self.dogfight_target_scorer = TargetScorer(self, DogfightTargetProfile())
         
-    def update(self, units, game_state):
+    def update(self, units, game_state, dt):
+        self.advance_phases(dt)
+        if not self.phase_ready("targeting"):
+            return
+            
         # 超高频更新
-        my_units = [u for u in units if u.team == self.team and u.state != UnitState.DEAD]
-        enemy_units = [u for u in units if u.team != self.team and u.state != UnitState.DEAD]
+        view = self.observe(game_state)
+        my_units = view.my_units(self.team)
+        enemy_units = view.enemy_units(self.team)
         
         if not enemy_units:
             return
             
-        print(f"DOGFIGHT AI: {len(my_units)} fighters vs {len(enemy_units)} enemies")
-        
-        # 记录敌人位置用于预判
-        for enemy in enemy_units:
-            self.last_enemy_positions[enemy] = (enemy.x, enemy.y, time.time())
+        if tracer.enabled("ai", DEBUG):
+            tracer.emit("ai", DEBUG, f"DOGFIGHT AI: {len(my_units)} fighters vs {len(enemy_units)} enemies", team=self.team)
         
         # 每个单位都要立即交战
-        for unit in my_units:
+        self.dogfight_target_scorer.prepare(my_units, enemy_units)
+        for unit in self.unit_scheduler.schedule(my_units):
             self.dogfight_control(unit, enemy_units, game_state)
             
     def dogfight_control(self, unit, enemy_units, game_state):
@@ -37,87 +39,42 @@ class DogfightAI(TerminatorAI):
         
         # 只要有一点能量就继续战斗
         if unit.energy < 1:
-            unit.state = UnitState.RETURNING
+            game_state.commands.submit(Supply(unit))
             return
             
         # 非常激进的技能释放
         if unit.sp >= unit.max_sp * 0.3:  # 30%就释放技能！
-            print(f"Fighter {unit.name} using skill at 30% SP!")
-            unit.use_skill(enemy_units + [unit], game_state)
+            if game_state.commands.submit(Skill(unit, enemy_units + (unit,))):
+                if tracer.enabled("ai", DEBUG):
+                    tracer.emit("ai", DEBUG, f"Fighter {unit.name} using skill at 30% SP!", unit=unit.id)
             
         # 选择目标并立即开火
         target = self.select_dogfight_target(unit, enemy_units)
         
         if target:
             distance = unit.distance_to(target)
-            print(f"Fighter {unit.name} engaging {target.name} at {distance:.1f} units")
-            
-            # 无条件锁定并攻击
-            unit.attack_target = target
-            unit.target = target
-            unit.state = UnitState.ATTACKING
             
-            # 如果距离太远，强制移动过去
+            # 如果距离太远，强制移动过去（预判敌人位置）
+            predicted_pos = None
             if distance > unit.attack_range * 1.5:
-                # 预判敌人位置
-                predicted_pos = self.predict_enemy_position(target)
-                unit.target_pos = predicted_pos
-                print(f"Moving to intercept at predicted position: {predicted_pos}")
+                predicted_pos = self.predict_enemy_position(unit, target)
                 
-    def select_dogfight_target(self, unit, enemy_units):
-        """空战目标选择 - 优先最近的敌人"""
-        if not enemy_units:
-            return None
-            
-        # 计算威胁值
-        def calculate_threat(enemy):
-            distance = unit.distance_to(enemy)
-            
-            # 基础威胁值
-            threat = 1000
-            
-            # 距离越近威胁越大
-            threat += max(0, 500 - distance)
-            
-            # 血量因素
-            hp_ratio = enemy.hp / enemy.max_hp
-            if hp_ratio < 0.4:
-                threat += 300  # 残血优先
+            # 无条件锁定并攻击
+            if game_state.commands.submit(Attack(unit, target, predicted_pos)):
+                if tracer.enabled("ai", DEBUG):
+                    tracer.emit("ai", DEBUG, f"Fighter {unit.name} engaging {target.name} at {distance:.1f} units", unit=unit.id, target=target.id)
+                if predicted_pos:
+                    if tracer.enabled("ai", DEBUG):
+                        tracer.emit("ai", DEBUG, f"Moving to intercept at predicted position: {predicted_pos}", unit=unit.id, target=target.id)
                 
-            # 攻击力威胁
-            threat += enemy.attack_damage * 5
-            
-            # 速度威胁（快的敌人更危险）
-            threat += enemy.speed * 2
-            
-            return threat
-            
-        return max(enemy_units, key=calculate_threat)
-        
-    def predict_enemy_position(self, enemy):
-        """预判敌人位置"""
-        if enemy not in self.last_enemy_positions:
-            return (enemy.x, enemy.y)
-            
-        last_pos = self.last_enemy_positions[enemy]
-        last_x, last_y, last_time = last_pos
-        
-        current_time = time.time()
-        time_diff = current_time - last_time
+    def select_dogfight_target(self, unit, enemy_units):
+        """空战目标选择 - 优先最近的敌人，残血、高攻和高速的敌人加分"""
+        return self.dogfight_target_scorer.best(unit, enemy_units)
         
-        if time_diff > 0:
-            # 计算速度向量
-            vel_x = (enemy.x - last_x) / time_diff
-            vel_y = (enemy.y - last_y) / time_diff
-            
-            # 预测0.5秒后的位置
-            predict_time = 0.5
-            predicted_x = enemy.x + vel_x * predict_time
-            predicted_y = enemy.y + vel_y * predict_time
-            
-            return (predicted_x, predicted_y)
-            
-        return (enemy.x, enemy.y)
+    def predict_enemy_position(self, unit, enemy):
+        """预判拦截点：按敌人当前速度和自身速度求最早能相遇的位置"""
+        x, y = self.world_view.motion.intercept((unit,), (enemy,), unit.speed)[0].tolist()
+        return (x, y)
 
 class BlitzkriegAI(DogfightAI):
     """闪电战AI - 极速攻击"""
@@ -126,17 +83,23 @@ class BlitzkriegAI(DogfightAI):
         super().__init__(team)
         self.blitz_mode = True
         
-    def update(self, units, game_state):
-        my_units = [u for u in units if u.team == self.team and u.state != UnitState.DEAD]
-        enemy_units = [u for u in units if u.team != self.team and u.state != UnitState.DEAD]
+    def update(self, units, game_state, dt):
+        self.advance_phases(dt)
+        if not self.phase_ready("targeting"):
+            return
+            
+        view = self.observe(game_state)
+        my_units = view.my_units(self.team)
+        enemy_units = view.enemy_units(self.team)
         
         if not enemy_units:
             return
             
-        print(f"BLITZKRIEG: All units charge!")
+        if tracer.enabled("ai", DEBUG):
+            tracer.emit("ai", DEBUG, "BLITZKRIEG: All units charge!", team=self.team)
         
         # 所有单位同时冲锋
-        for unit in my_units:
+        for unit in self.unit_scheduler.schedule(my_units):
             self.blitzkrieg_charge(unit, enemy_units, game_state)
             
     def blitzkrieg_charge(self, unit, enemy_units, game_state):
@@ -144,25 +107,21 @@ class BlitzkriegAI(DogfightAI):
         
         # 永不停歇
         if unit.energy < 0.5:  # 几乎没能量才停
-            unit.state = UnitState.RETURNING
+            game_state.commands.submit(Supply(unit))
             return
             
         # 立即释放技能
         if unit.sp >= unit.max_sp * 0.2:  # 20%就释放！
-            unit.use_skill(enemy_units + [unit], game_state)
+            game_state.commands.submit(Skill(unit, enemy_units + (unit,)))
             
         # 找最近的敌人，直接冲过去
         if enemy_units:
             target = min(enemy_units, key=lambda e: unit.distance_to(e))
             
-            print(f"BLITZ CHARGE: {unit.name} -> {target.name}")
-            
-            unit.attack_target = target
-            unit.target = target
-            unit.state = UnitState.ATTACKING
-            
             # 强制移动到目标位置
-            unit.target_pos = (target.x, target.y)
+            if game_state.commands.submit(Attack(unit, target, (target.x, target.y))):
+                if tracer.enabled("ai", DEBUG):
+                    tracer.emit("ai", DEBUG, f"BLITZ CHARGE: {unit.name} -> {target.name}", unit=unit.id, target=target.id)
 
 class KamikazeAI(BlitzkriegAI):
     """神风AI - 不计代价的攻击"""
@@ -171,16 +130,22 @@ class KamikazeAI(BlitzkriegAI):
         super().__init__(team)
         self.kamikaze_mode = True
         
-    def update(self, units, game_state):
-        my_units = [u for u in units if u.team == self.team and u.state != UnitState.DEAD]
-        enemy_units = [u for u in units if u.team != self.team and u.state != UnitState.DEAD]
+    def update(self, units, game_state, dt):
+        self.advance_phases(dt)
+        if not self.phase_ready("targeting"):
+            return
+            
+        view = self.observe(game_state)
+        my_units = view.my_units(self.team)
+        enemy_units = view.enemy_units(self.team)
         
         if not enemy_units:
             return
             
-        print(f"KAMIKAZE MODE: {len(my_units)} units on suicide mission!")
+        if tracer.enabled("ai", DEBUG):
+            tracer.emit("ai", DEBUG, f"KAMIKAZE MODE: {len(my_units)} units on suicide mission!", team=self.team)
         
-        for unit in my_units:
+        for unit in self.unit_scheduler.schedule(my_units):
             self.kamikaze_attack(unit, enemy_units, game_state)
             
     def kamikaze_attack(self, unit, enemy_units, game_state):
@@ -189,20 +154,18 @@ class KamikazeAI(BlitzkriegAI):
         # 永不回头！即使没能量也要战斗
         if unit.energy <= 0 and unit.hp < unit.max_hp * 0.1:
             # 只有在濒死且没能量时才回去
-            unit.state = UnitState.RETURNING
+            game_state.commands.submit(Supply(unit))
             return
             
         # 有一点SP就释放
         if unit.sp >= unit.max_sp * 0.1:  # 10%就释放技能！
-            unit.use_skill(enemy_units + [unit], game_state)
+            game_state.commands.submit(Skill(unit, enemy_units + (unit,)))
             
         # 选择最高价值目标，不惜一切代价攻击
         if enemy_units:
             # 优先攻击血量最多的敌人（造成最大损失）
             target = max(enemy_units, key=lambda e: e.hp + e.attack_damage)
             
-            print(f"KAMIKAZE: {unit.name} targeting {target.name} (HP: {target.hp})")
-            
-            unit.attack_target = target
-            unit.target = target
-            unit.state = UnitState.ATTACKING
\ No newline at end of file
+            if game_state.commands.submit(Attack(unit, target)):
+                if tracer.enabled("ai", DEBUG):
+                    tracer.emit("ai", DEBUG, f"KAMIKAZE: {unit.name} targeting {target.name} (HP: {target.hp})", unit=unit.id, target=target.id)
\ No newline at end of file
@@ -0,0 +1,81 @@
+import pygame
+from collections import OrderedDict
+from render_commands import SurfaceCanvas
+from config import (EFFECT_CACHE_FRAMES, EFFECT_CACHE_RADIUS_STEP,
+                    EFFECT_CACHE_MAX_RADIUS, EFFECT_CACHE_MAX_BYTES)
+
+class EffectFrameCache:
+    """特效动画帧缓存
+
+    圆环类特效的每一帧只取决于 time/duration，按 (特效类型, 附加参数, 屏幕半径档位)
+    为每种特效预渲染 N 帧，播放时每帧只需一次 blit。按占用字节数做 LRU 淘汰。
+    """
+
+    KEY_COLOR = (0, 0, 0)  # 帧表面的透明色
+
+    def __init__(self, frame_count=EFFECT_CACHE_FRAMES, radius_step=EFFECT_CACHE_RADIUS_STEP,
+                 max_radius=EFFECT_CACHE_MAX_RADIUS, max_bytes=EFFECT_CACHE_MAX_BYTES):
+        self.frame_count = frame_count
+        self.radius_step = radius_step
+        self.max_radius = max_radius
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # 键 -> [帧列表, 半边长, 已占用字节]
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self):
+        """清空缓存"""
+        self.entries.clear()
+        self.bytes_used = 0
+
+    def blit(self, screen, render_frame, key, radius, progress, center):
+        """绘制缓存帧；半径超出缓存范围时返回False，由调用方直接绘制"""
+        if radius <= 0:
+            return True
+        # 半径向上取整到档位，相近大小的特效共用一套帧
+        bucket = -(-int(radius) // self.radius_step) * self.radius_step
+        if bucket > self.max_radius:
+            return False
+
+        entry_key = key + (bucket,)
+        entry = self.entries.get(entry_key)
+        if entry is None:
+            entry = [[None] * self.frame_count, bucket + 4, 0]
+            self.entries[entry_key] = entry
+        else:
+            self.entries.move_to_end(entry_key)
+
+        index = min(self.frame_count - 1, max(0, int(progress * self.frame_count)))
+        frames, half, _ = entry
+        frame = frames[index]
+        if frame is None:
+            self.misses += 1
+            frame = pygame.Surface((half * 2, half * 2))
+            frame.fill(self.KEY_COLOR)
+            frame.set_colorkey(self.KEY_COLOR)
+            # 用帧区间中点的进度渲染
+            render_frame(SurfaceCanvas(frame), (half, half), bucket, (index + 0.5) / self.frame_count)
+            frames[index] = frame
+
+            size = frame.get_bytesize() * half * half * 4
+            entry[2] += size
+            self.bytes_used += size
+            self.evict(entry_key)
+        else:
+            self.hits += 1
+
+        screen.blit(frame, (center[0] - half, center[1] - half))
+        return True
+
+    def evict(self, keep_key):
+        """淘汰最久未使用的条目直到占用不超过上限"""
+        while self.bytes_used > self.max_bytes and len(self.entries) > 1:
+            oldest_key = next(iter(self.entries))
+            if oldest_key == keep_key:
+                break
+            _, _, size = self.entries.pop(oldest_key)
+            self.bytes_used -= size
+
+# 所有特效共享的帧缓存
+effect_frame_cache = EffectFrameCache()
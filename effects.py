@@ -1,6 +1,6 @@
-import pygame
 import math
 from config import COLOR_WHITE, COLOR_YELLOW, COLOR_ENEMY, COLOR_BLUE, COLOR_PURPLE, COLOR_CYAN
+from effect_cache import effect_frame_cache
 
 class Effect:
     def __init__(self, x, y, duration):
@@ -16,6 +16,30 @@ class Effect:
     def draw(self, screen, camera):
         pass
 
+class RingEffect(Effect):
+    """圆环类特效：画面只取决于进度和半径，通过帧缓存播放"""
+    def __init__(self, x, y, duration, radius):
+        super().__init__(x, y, duration)
+        self.radius = radius
+        
+    def frame_key(self):
+        """帧缓存键（颜色等会影响画面的参数需要加入）"""
+        return (type(self).__name__,)
+        
+    def render_frame(self, surface, center, radius, progress):
+        """在画布surface上以center为圆心绘制一帧，radius为屏幕上的最大半径"""
+        pass
+        
+    def draw(self, screen, camera):
+        progress = self.time / self.duration
+        sx, sy = camera.world_to_screen(self.x, self.y)
+        radius = self.radius * camera.zoom
+        
+        # 半径过大的特效不缓存，直接绘制
+        if not effect_frame_cache.blit(screen, self.render_frame, self.frame_key(),
+                                       radius, progress, (sx, sy)):
+            self.render_frame(screen, (sx, sy), radius, progress)
+
 class ProjectileEffect(Effect):
     def __init__(self, x1, y1, x2, y2):
         super().__init__(x1, y1, 0.2)
@@ -29,7 +53,7 @@ class ProjectileEffect(Effect):
         sx1, sy1 = camera.world_to_screen(self.x, self.y)
         sx2, sy2 = camera.world_to_screen(self.x2, self.y2)
         
-        pygame.draw.line(screen, color, (sx1, sy1), (sx2, sy2), 2)
+        screen.line(color, (sx1, sy1), (sx2, sy2), 2)
 
 # 新增真正的投射物类
 class Projectile:
@@ -63,7 +87,7 @@ class Projectile:
         
     def draw(self, screen, camera):
         sx, sy = camera.world_to_screen(self.x, self.y)
-        pygame.draw.circle(screen, (255, 200, 0), (sx, sy), 3)
+        screen.circle((255, 200, 0), (sx, sy), 3)
 
 # 炮击投射物
 class ArtilleryProjectile(Projectile):
@@ -112,12 +136,12 @@ class MissileProjectile(Projectile):
     def draw(self, screen, camera):
         sx, sy = camera.world_to_screen(self.x, self.y)
         # 绘制导弹
-        pygame.draw.circle(screen, (255, 100, 100), (sx, sy), 4)
+        screen.circle((255, 100, 100), (sx, sy), 4)
         # 绘制尾焰
         trail_x = self.x - (self.target_x - self.x) * 0.1
         trail_y = self.y - (self.target_y - self.y) * 0.1
         tsx, tsy = camera.world_to_screen(trail_x, trail_y)
-        pygame.draw.line(screen, (255, 200, 100), (tsx, tsy), (sx, sy), 2)
+        screen.line((255, 200, 100), (tsx, tsy), (sx, sy), 2)
 
 # 光束效果
 class BeamEffect(Effect):
@@ -136,7 +160,7 @@ class BeamEffect(Effect):
         # 绘制光束
         width = int(8 * (1 - progress) * camera.zoom)
         if width > 0:
-            pygame.draw.line(screen, COLOR_CYAN, (sx1, sy1), (sx2, sy2), width)
+            screen.line(COLOR_CYAN, (sx1, sy1), (sx2, sy2), width)
 
 class MeleeEffect(Effect):
     def __init__(self, x1, y1, x2, y2):
@@ -154,22 +178,18 @@ class MeleeEffect(Effect):
         # 绘制冲击波
         radius = int(30 * progress * camera.zoom)
         if radius > 0:
-            pygame.draw.circle(screen, color, (sx2, sy2), radius, 2)
+            screen.circle(color, (sx2, sy2), radius, 2)
 
-class ArtilleryEffect(Effect):
+class ArtilleryEffect(RingEffect):
     def __init__(self, x, y, radius):
-        super().__init__(x, y, 0.5)
-        self.explosion_radius = radius
-        
-    def draw(self, screen, camera):
-        progress = self.time / self.duration
-        sx, sy = camera.world_to_screen(self.x, self.y)
+        super().__init__(x, y, 0.5, radius)
         
+    def render_frame(self, surface, center, radius, progress):
         # 爆炸效果
         color = (255, int(255 * (1 - progress)), 0)
-        radius = int(self.explosion_radius * progress * camera.zoom)
+        radius = int(radius * progress)
         if radius > 0:
-            pygame.draw.circle(screen, color, (sx, sy), radius, 3)
+            surface.circle(color, center, radius, 3)
 
 class MissileEffect(Effect):
     def __init__(self, x1, y1, x2, y2):
@@ -187,92 +207,72 @@ class MissileEffect(Effect):
         sx, sy = camera.world_to_screen(current_x, current_y)
         
         # 绘制导弹
-        pygame.draw.circle(screen, (255, 255, 255), (sx, sy), int(3 * camera.zoom))
+        screen.circle((255, 255, 255), (sx, sy), int(3 * camera.zoom))
         
         # 到达目标时爆炸
         if progress > 0.8:
             explosion_radius = int(20 * camera.zoom)
-            pygame.draw.circle(screen, COLOR_ENEMY, (sx, sy), explosion_radius, 2)
+            screen.circle(COLOR_ENEMY, (sx, sy), explosion_radius, 2)
 
-class SkillEffect(Effect):
+class SkillEffect(RingEffect):
     def __init__(self, x, y, radius):
-        super().__init__(x, y, 1.0)
-        self.radius = radius
-        
-    def draw(self, screen, camera):
-        alpha = 1 - (self.time / self.duration)
-        current_radius = self.radius * (self.time / self.duration)
-        
-        sx, sy = camera.world_to_screen(self.x, self.y)
-        radius = int(current_radius * camera.zoom)
+        super().__init__(x, y, 1.0, radius)
         
+    def render_frame(self, surface, center, radius, progress):
+        radius = int(radius * progress)
         if radius > 0:
-            pygame.draw.circle(screen, COLOR_WHITE, (sx, sy), radius, 2)
+            surface.circle(COLOR_WHITE, center, radius, 2)
 
-class ExplosionEffect(Effect):
+class ExplosionEffect(RingEffect):
     def __init__(self, x, y, radius):
-        super().__init__(x, y, 0.8)
-        self.radius = radius
-        
-    def draw(self, screen, camera):
-        progress = self.time / self.duration
-        sx, sy = camera.world_to_screen(self.x, self.y)
+        super().__init__(x, y, 0.8, radius)
         
+    def render_frame(self, surface, center, radius, progress):
         # 多层爆炸效果
         for i in range(3):
             alpha = 1 - (progress + i * 0.1)
             if alpha > 0:
                 color = (255, int(200 * alpha), int(100 * alpha))
-                radius = int((self.radius * (progress + i * 0.1)) * camera.zoom)
-                if radius > 0:
-                    pygame.draw.circle(screen, color, (sx, sy), radius, 2)
+                layer_radius = int(radius * (progress + i * 0.1))
+                if layer_radius > 0:
+                    surface.circle(color, center, layer_radius, 2)
 
-class HealEffect(Effect):
+class HealEffect(RingEffect):
     def __init__(self, x, y, radius):
-        super().__init__(x, y, 1.0)
-        self.radius = radius
-        
-    def draw(self, screen, camera):
-        progress = self.time / self.duration
-        sx, sy = camera.world_to_screen(self.x, self.y)
+        super().__init__(x, y, 1.0, radius)
         
+    def render_frame(self, surface, center, radius, progress):
         # 治疗光环
         color = (0, 255, int(255 * (1 - progress)))
-        radius = int(self.radius * progress * camera.zoom)
+        radius = int(radius * progress)
         if radius > 0:
-            pygame.draw.circle(screen, color, (sx, sy), radius, 2)
+            surface.circle(color, center, radius, 2)
 
-class BuffEffect(Effect):
+class BuffEffect(RingEffect):
     def __init__(self, x, y, radius, color):
-        super().__init__(x, y, 0.5)
-        self.radius = radius
+        super().__init__(x, y, 0.5, radius)
         self.color = color
         
-    def draw(self, screen, camera):
-        progress = self.time / self.duration
-        sx, sy = camera.world_to_screen(self.x, self.y)
+    def frame_key(self):
+        return (type(self).__name__, self.color)
         
+    def render_frame(self, surface, center, radius, progress):
         # 增益光环
-        alpha = 1 - progress
-        radius = int(self.radius * camera.zoom)
+        radius = int(radius)
         if radius > 0:
             for i in range(3):
-                pygame.draw.circle(screen, self.color, (sx, sy), 
-                                 radius - i * 20, 2)
+                surface.circle(self.color, center, 
+                               radius - i * 20, 2)
 
-class ShieldEffect(Effect):
+class ShieldEffect(RingEffect):
     def __init__(self, x, y, radius):
-        super().__init__(x, y, 1.0)
-        self.radius = radius
-        
-    def draw(self, screen, camera):
-        progress = self.time / self.duration
-        sx, sy = camera.world_to_screen(self.x, self.y)
+        super().__init__(x, y, 1.0, radius)
         
+    def render_frame(self, surface, center, radius, progress):
         # 护盾展开效果
-        radius = int(self.radius * progress * camera.zoom)
+        radius = int(radius * progress)
         if radius > 0:
-            pygame.draw.circle(screen, COLOR_CYAN, (sx, sy), radius, 3)
+            surface.circle(COLOR_CYAN, center, radius, 3)
 
 class TeleportEffect(Effect):
     def __init__(self, x1, y1, x2, y2):
@@ -287,13 +287,13 @@ class TeleportEffect(Effect):
         sx1, sy1 = camera.world_to_screen(self.x, self.y)
         radius1 = int(30 * (1 - progress) * camera.zoom)
         if radius1 > 0:
-            pygame.draw.circle(screen, COLOR_PURPLE, (sx1, sy1), radius1, 2)
+            screen.circle(COLOR_PURPLE, (sx1, sy1), radius1, 2)
             
         # 传送终点效果
         sx2, sy2 = camera.world_to_screen(self.x2, self.y2)
         radius2 = int(30 * progress * camera.zoom)
         if radius2 > 0:
-            pygame.draw.circle(screen, COLOR_PURPLE, (sx2, sy2), radius2, 2)
+            screen.circle(COLOR_PURPLE, (sx2, sy2), radius2, 2)
 
 class DisableEffect(Effect):
     def __init__(self, x, y, radius):
@@ -308,7 +308,7 @@ class DisableEffect(Effect):
         radius = int(self.radius * camera.zoom)
         if radius > 0:
             color = (200, 0, 200)
-            pygame.draw.circle(screen, color, (sx, sy), radius, 2)
+            screen.circle(color, (sx, sy), radius, 2)
 
 class GlobalHealEffect(Effect):
     def __init__(self):
@@ -319,11 +319,8 @@ class GlobalHealEffect(Effect):
         progress = self.time / self.duration
         alpha = int(50 * (1 - abs(progress - 0.5) * 2))
         
-        # 创建绿色覆盖层
-        overlay = pygame.Surface((screen.get_width(), screen.get_height()))
-        overlay.set_alpha(alpha)
-        overlay.fill((0, 255, 0))
-        screen.blit(overlay, (0, 0))
+        # 绿色覆盖层（执行时从表面池借用）
+        screen.overlay((0, 255, 0), alpha)
 
 # 为了向后兼容，保留旧的 AttackEffect
 AttackEffect = ProjectileEffect
\ No newline at end of file
@@ -0,0 +1,39 @@
+import heapq
+from itertools import count
+
+class ExpiryScheduler:
+    """定时到期调度（最小堆）
+
+    buff、debuff和护盾在施加时登记到期时间，GameState 每个tick推进一次时钟，
+    只有到期的条目才回调，单位不再逐帧递减计时。条目不支持取消：
+    回调的最后一个参数是该条目的到期时间，重复施加后调用方记下的是新的到期时间，
+    旧条目回调时比对不上即忽略。
+    """
+
+    def __init__(self):
+        self.now = 0.0
+        self.heap = []  # (到期时间, 序号, 回调, 参数)
+        self.sequence = count()  # 同一时间到期的条目按登记顺序回调
+        self.fired = 0  # 已回调的条目数
+
+    def __len__(self):
+        return len(self.heap)
+
+    def schedule(self, delay, callback, *args):
+        """delay 秒后回调 callback(*args, 到期时间)，返回到期时间"""
+        expires_at = self.now + delay
+        heapq.heappush(self.heap, (expires_at, next(self.sequence), callback, args))
+        return expires_at
+
+    def advance(self, dt):
+        """时钟前进 dt，依次回调所有已到期的条目"""
+        self.now += dt
+        heap = self.heap
+        while heap and heap[0][0] <= self.now:
+            expires_at, _, callback, args = heapq.heappop(heap)
+            self.fired += 1
+            callback(*args, expires_at)
+
+    def clear(self):
+        self.heap.clear()
+        self.now = 0.0
@@ -0,0 +1,113 @@
+import os
+import json
+import queue
+import threading
+import pygame
+from config import CAPTURE_QUEUE_SIZE, CAPTURE_FORMAT, CAPTURE_FRAME_SKIP, CAPTURE_SCALE
+
+class FrameCapture:
+    """异步帧录制
+
+    游戏循环只把显示表面复制（可选缩小）后放入有界队列，编码和写盘在后台线程完成。
+    队列满时直接丢帧，不会阻塞游戏循环。
+
+    fmt: 'png' 输出 frame_000000.png 序列；'raw' 把RGB像素追加到 frames.raw，
+    并在 index.jsonl 中记录每帧的偏移和尺寸。
+    frame_skip: 每录一帧后跳过的帧数
+    scale: 录制分辨率比例
+    """
+
+    def __init__(self, output_dir, fmt=CAPTURE_FORMAT, frame_skip=CAPTURE_FRAME_SKIP,
+                 scale=CAPTURE_SCALE, max_queue=CAPTURE_QUEUE_SIZE):
+        if fmt not in ('png', 'raw'):
+            raise ValueError(f"不支持的录制格式: {fmt}")
+        self.output_dir = output_dir
+        self.fmt = fmt
+        self.frame_skip = frame_skip
+        self.scale = scale
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.worker = None
+        self.frame_counter = 0  # 收到的帧数（含跳过的）
+        self.captured = 0       # 放入队列的帧数
+        self.dropped = 0        # 队列满丢弃的帧数
+        self.written = 0        # 已写盘的帧数
+
+    @property
+    def active(self):
+        return self.worker is not None
+
+    def start(self):
+        """开始录制"""
+        if self.worker:
+            return
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.worker = threading.Thread(target=self.run_worker, daemon=True)
+        self.worker.start()
+
+    def stop(self):
+        """停止录制，等待队列中的帧写完"""
+        if not self.worker:
+            return
+        self.queue.put(None)
+        self.worker.join()
+        self.worker = None
+
+    def capture(self, surface, game_time=None, block=False):
+        """提交一帧，返回是否进入队列；block为True时队列满则等待（无头模式用）"""
+        if not self.worker:
+            return False
+        frame_number = self.frame_counter
+        self.frame_counter += 1
+        if frame_number % (self.frame_skip + 1):
+            return False
+        # 队列已满时不做复制，直接丢帧
+        if not block and self.queue.full():
+            self.dropped += 1
+            return False
+
+        if self.scale != 1:
+            width, height = surface.get_size()
+            frame = pygame.transform.scale(surface, (max(1, int(width * self.scale)),
+                                                     max(1, int(height * self.scale))))
+        else:
+            frame = surface.copy()
+
+        try:
+            self.queue.put((frame_number, game_time, frame), block=block)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        self.captured += 1
+        return True
+
+    def run_worker(self):
+        """后台线程：编码并写盘"""
+        raw_file = index_file = None
+        if self.fmt == 'raw':
+            raw_file = open(os.path.join(self.output_dir, 'frames.raw'), 'wb')
+            index_file = open(os.path.join(self.output_dir, 'index.jsonl'), 'w', encoding='utf-8')
+
+        try:
+            while True:
+                item = self.queue.get()
+                if item is None:
+                    break
+                frame_number, game_time, frame = item
+                if self.fmt == 'png':
+                    path = os.path.join(self.output_dir, f"frame_{frame_number:06d}.png")
+                    pygame.image.save(frame, path)
+                else:
+                    data = pygame.image.tobytes(frame, 'RGB')
+                    index_file.write(json.dumps({
+                        'frame': frame_number,
+                        'time': game_time,
+                        'offset': raw_file.tell(),
+                        'size': list(frame.get_size()),
+                        'format': 'RGB',
+                    }) + "\n")
+                    raw_file.write(data)
+                self.written += 1
+        finally:
+            if raw_file:
+                raw_file.close()
+                index_file.close()
@@ -1,24 +1,49 @@
 import pygame
 import random
 import math
-from ai import SimpleAI
+import time
+from itertools import islice
+from units import UnitType, UnitState
 from config import COLOR_BLACK, COLOR_WHITE, COLOR_YELLOW
 from terrain import TerrainManager
-from improved_ai import AdvancedAI, HyperAggressiveAI, TurtleAI
+from lod import LODPolicy, LOD_FULL, LOD_DOTS
+from surface_pool import surface_pool
+from render_commands import RenderBuffer, PygameRenderBackend
+from quality_governor import QualityGovernor
+from effects import ProjectileEffect
+from world_view import WorldView
+from influence_map import InfluenceMap
+from prediction import MotionTracker
+from commands import CommandQueue
+from team_stats import ForceStats
+from expiry import ExpiryScheduler
+from tracing import tracer, INFO
 
 class GameState:
     def __init__(self):
         self.units = []
+        self.draw_order = []  # 按y坐标排序的持久绘制列表，每帧增量修复
         self.effects = []
         self.projectiles = []
         self.selected_units = []
         self.player_team = 0
         self.ai_controllers = []
+        self.world_view = WorldView(())  # 每个tick在AI更新前重建的只读世界快照
+        self.influence_map = InfluenceMap()  # 各阵营的威胁影响力网格
+        self.motion = MotionTracker()  # 单位运动历史，AI预判共用
+        self.commands = CommandQueue()  # 玩家和AI提交的命令，tick开始时统一应用
+        self.forces = ForceStats()  # 各阵营实力汇总，单位属性变化时增量更新
+        self.expiry = ExpiryScheduler()  # buff/debuff和护盾的到期调度
+        self.replay = None  # 回放录制/校验，每个tick结束时回调 on_tick(game_state, dt, 应用的命令)
         self.level_time = 0
         self.background_image = None
         self.stars = []
         self.terrain_manager = TerrainManager()
         self.game_paused = False  # 统一的暂停状态
+        self.lod_policy = LODPolicy()  # 按缩放选择单位绘制细节
+        self.render_buffer = RenderBuffer()  # 世界绘制命令缓冲
+        self.render_backend = PygameRenderBackend()  # 无头模式可替换为 NullRenderBackend
+        self.quality = QualityGovernor()  # 按帧时间自动调整画质档位
         self.generate_starfield()
         
     def generate_starfield(self):
@@ -38,8 +63,77 @@ class GameState:
         
     def add_unit(self, unit):
         self.units.append(unit)
+        self.forces.add(unit)
+        unit.expiry = self.expiry
+        self.insert_draw_order(unit)
+        
+    def clear_ai_controllers(self):
+        """关闭并移除所有AI控制器"""
+        for ai in self.ai_controllers:
+            ai.close()
+        self.ai_controllers.clear()
+        
+    def clear_units(self):
+        """清空所有单位"""
+        self.units.clear()
+        self.draw_order.clear()
+        self.forces.clear()
+        self.expiry.clear()
+        
+    def insert_draw_order(self, unit):
+        """按y坐标把新单位插入绘制列表（二分查找）"""
+        order = self.draw_order
+        lo, hi = 0, len(order)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if order[mid].y <= unit.y:
+                lo = mid + 1
+            else:
+                hi = mid
+        order.insert(lo, unit)
+        
+    def remove_dead_from_draw_order(self):
+        """原地移除绘制列表中的死亡单位"""
+        order = self.draw_order
+        write = 0
+        for unit in order:
+            if unit.state != UnitState.DEAD:
+                order[write] = unit
+                write += 1
+        del order[write:]
+        
+    def repair_draw_order(self):
+        """修复绘制顺序
+        
+        单位的y坐标每帧只有微小变化，列表基本有序，
+        原地插入排序接近线性且不分配新列表。
+        """
+        order = self.draw_order
+        if len(order) != len(self.units):
+            # 有单位绕过add_unit加入或移除，整体重建
+            order[:] = self.units
+            order.sort(key=lambda u: u.y)
+            return
+            
+        for i in range(1, len(order)):
+            unit = order[i]
+            y = unit.y
+            j = i - 1
+            if order[j].y <= y:
+                continue
+            while j >= 0 and order[j].y > y:
+                order[j + 1] = order[j]
+                j -= 1
+            order[j + 1] = unit
         
     def add_effect(self, effect):
+        # 低画质档位限制特效数量并省略射击线
+        quality = self.quality.tier
+        if not quality['projectile_lines'] and isinstance(effect, ProjectileEffect):
+            return
+        max_effects = quality['max_effects']
+        if max_effects is not None and len(self.effects) >= max_effects:
+            return
         self.effects.append(effect)
         
     def add_projectile(self, projectile):
@@ -48,7 +142,6 @@ class GameState:
         
     def get_all_friendly_units(self, team):
         """获取指定阵营的所有单位（除了母舰）- 修复：包含修理机"""
-        from units import UnitType, UnitState
         return [u for u in self.units 
                 if (u.team == team and 
                     u.unit_type != UnitType.MOTHERSHIP and 
@@ -56,7 +149,6 @@ class GameState:
         
     def get_mothership(self, team):
         """获取指定阵营的母舰"""
-        from units import UnitType, UnitState
         for unit in self.units:
             if (unit.team == team and 
                 unit.unit_type == UnitType.MOTHERSHIP and 
@@ -66,23 +158,23 @@ class GameState:
         
     def get_units_by_team(self, team):
         """获取指定阵营的所有存活单位"""
-        from units import UnitState
         return [u for u in self.units if u.team == team and u.state != UnitState.DEAD]
         
     def get_enemy_units(self, team):
         """获取敌方单位"""
-        from units import UnitState
         return [u for u in self.units if u.team != team and u.state != UnitState.DEAD]
         
     def pause_game(self):
         """暂停游戏"""
         self.game_paused = True
-        print(f"Game paused: {self.game_paused}")  # 调试信息
+        if tracer.enabled("game", INFO):
+            tracer.emit("game", INFO, f"Game paused: {self.game_paused}")
         
     def resume_game(self):
         """恢复游戏"""
         self.game_paused = False
-        print(f"Game resumed: {self.game_paused}")  # 调试信息
+        if tracer.enabled("game", INFO):
+            tracer.emit("game", INFO, f"Game resumed: {self.game_paused}")
         
     def is_paused(self):
         """检查游戏是否暂停"""
@@ -114,7 +206,6 @@ class GameState:
     def get_unit_at_position(self, x, y, radius=None):
         """获取指定位置的单位"""
         for unit in self.units:
-            from units import UnitState
             if unit.state == UnitState.DEAD:
                 continue
                 
@@ -171,6 +262,12 @@ class GameState:
         if not self.is_paused():
             self.level_time += dt
             
+        # 应用上一tick之后提交的命令
+        applied = self.commands.flush(self)
+        
+        # 处理到期的buff/debuff和护盾
+        self.expiry.advance(dt)
+        
         # 更新单位
         for unit in self.units:
             unit.update(dt, self.units, self)
@@ -179,63 +276,109 @@ class GameState:
         self.projectiles = [p for p in self.projectiles if p.update(dt, self.units, self)]
             
         # 移除死亡单位
-        from units import UnitState
         dead_units = [u for u in self.units if u.state == UnitState.DEAD]
         for dead_unit in dead_units:
             if dead_unit in self.selected_units:
                 self.selected_units.remove(dead_unit)
                 dead_unit.selected = False
+            self.forces.remove(dead_unit)
                 
         self.units = [u for u in self.units if u.state != UnitState.DEAD]
+        if dead_units:
+            self.remove_dead_from_draw_order()
+        
+        # 增量更新影响力图和运动历史，再构建本tick的世界快照，所有AI共享
+        self.influence_map.update(self.units)
+        self.motion.record(self.units, self.level_time)
+        self.world_view = WorldView(self.units, self.level_time, self.influence_map, self.motion, self.forces)
         
         # 更新AI
         for ai in self.ai_controllers:
-            ai.update(self.units, self)
+            ai.update(self.units, self, dt)
             
         # 更新特效
         self.effects = [e for e in self.effects if e.update(dt)]
         
+        if self.replay is not None:
+            self.replay.on_tick(self, dt, applied)
+        
+    def begin_render(self, screen):
+        """开始录制一帧绘制命令，返回命令缓冲"""
+        self.render_buffer.begin(screen.get_size())
+        return self.render_buffer
+        
+    def flush_render(self, screen):
+        """把缓冲中的绘制命令交给后端执行"""
+        self.render_backend.execute(self.render_buffer, screen)
+        
     def draw(self, screen, camera, sprite_manager):
         """绘制游戏状态"""
-        # 绘制星空背景
-        for star in self.stars:
-            sx, sy = camera.world_to_screen(star['x'], star['y'])
+        quality = self.quality.tier
+        # 细节层级按实际缩放决定，不受渲染分辨率影响
+        lod = self.lod_policy.level_for(camera.zoom)
+        
+        # 低画质时在缩小的表面上绘制世界，再放大到屏幕
+        render_scale = quality['render_scale']
+        if render_scale < 1:
+            width, height = screen.get_size()
+            target = surface_pool.get((int(width * render_scale), int(height * render_scale)))
+            target.fill(COLOR_BLACK)
+            view = camera.scaled(render_scale)
+        else:
+            target = screen
+            view = camera
+        buffer = self.begin_render(target)
+        
+        # 绘制星空背景（低画质时只画一部分）
+        star_count = int(len(self.stars) * quality['star_density'])
+        for star in islice(self.stars, star_count):
+            sx, sy = view.world_to_screen(star['x'], star['y'])
             # 只绘制屏幕可见范围内的星星
-            if -50 <= sx <= screen.get_width() + 50 and -50 <= sy <= screen.get_height() + 50:
-                size = int(star['size'] * camera.zoom)
+            if -50 <= sx <= buffer.get_width() + 50 and -50 <= sy <= buffer.get_height() + 50:
+                size = int(star['size'] * view.zoom)
                 if size > 0:
-                    pygame.draw.circle(screen, star['color'], (sx, sy), size)
+                    buffer.circle(star['color'], (sx, sy), size)
         
         # 绘制地形
-        self.terrain_manager.draw(screen, camera)
+        self.terrain_manager.draw(buffer, view)
         
         # 绘制背景图片（如果有）
         if self.background_image:
             # 计算背景位置（视差效果）
-            bg_x = -camera.x * 0.5
-            bg_y = -camera.y * 0.5
+            bg_x = -view.x * 0.5
+            bg_y = -view.y * 0.5
             # 确保背景图片适配屏幕
             bg_rect = self.background_image.get_rect()
             bg_rect.x = bg_x
             bg_rect.y = bg_y
-            screen.blit(self.background_image, bg_rect)
+            buffer.blit(self.background_image, bg_rect)
         
         # 按层次绘制单位（先绘制背景单位，再绘制前景单位）
-        # 按Y坐标排序，实现简单的深度效果
-        sorted_units = sorted(self.units, key=lambda u: u.y)
-        
-        for unit in sorted_units:
-            unit.draw(screen, camera, sprite_manager)
+        # 按Y坐标排序，实现简单的深度效果（持久列表增量修复）
+        self.repair_draw_order()
+        sorted_units = self.draw_order
+        
+        # 缩小时按细节层级简化绘制
+        if lod == LOD_DOTS:
+            self.lod_policy.draw_unit_dots(buffer, view, sorted_units)
+        else:
+            detail = lod == LOD_FULL and quality['status_bars']
+            for unit in sorted_units:
+                unit.draw(buffer, view, sprite_manager, detail)
         
         # 绘制投射物（在单位之后，特效之前）
         for projectile in self.projectiles:
-            projectile.draw(screen, camera)
+            projectile.draw(buffer, view)
                 
         # 绘制特效（在单位之上）
         for effect in self.effects:
-            effect.draw(screen, camera)
+            effect.draw(buffer, view)
+            
+        self.flush_render(target)
+        if target is not screen:
+            pygame.transform.scale(target, screen.get_size(), screen)
             
-        # 绘制选择指示器
+        # 绘制选择指示器（使用表面池的临时表面，直接画到屏幕上）
         self.draw_selection_indicators(screen, camera)
         
     def draw_selection_indicators(self, screen, camera):
@@ -246,26 +389,29 @@ class GameState:
                 radius = int((unit.radius + 8) * camera.zoom)
                 
                 # 绘制脉动的选择圈
-                import time
                 pulse = (math.sin(time.time() * 4) + 1) / 2  # 0-1之间的脉动值
                 alpha = int(100 + pulse * 155)  # 100-255之间的透明度
                 
                 # 友方和敌方使用不同颜色
                 color = COLOR_WHITE if unit.team == self.player_team else COLOR_YELLOW
                 
-                # 创建一个临时表面来实现透明度效果
-                temp_surface = pygame.Surface((radius * 2 + 4, radius * 2 + 4), pygame.SRCALPHA)
+                # 借用一个临时透明表面来实现透明度效果
+                temp_surface = surface_pool.get_clear((radius * 2 + 4, radius * 2 + 4))
                 pygame.draw.circle(temp_surface, (*color, alpha), 
                                  (radius + 2, radius + 2), radius, 2)
                 screen.blit(temp_surface, (screen_x - radius - 2, screen_y - radius - 2))
                 
     def reset(self):
         """重置游戏状态"""
-        self.units.clear()
+        self.clear_units()
         self.effects.clear()
         self.projectiles.clear()
         self.selected_units.clear()
-        self.ai_controllers.clear()
+        self.clear_ai_controllers()
+        self.influence_map.clear()
+        self.motion.clear()
+        self.commands.clear()
+        self.replay = None
         self.background_image = None
         self.game_paused = False
         self.terrain_manager = TerrainManager()
@@ -319,7 +465,6 @@ class GameState:
         
     def get_units_in_range(self, center_x, center_y, radius, team=None, unit_type=None):
         """获取指定范围内的单位"""
-        from units import UnitState
         units_in_range = []
         
         for unit in self.units:
@@ -352,6 +497,9 @@ class GameState:
         """移除单位"""
         if unit in self.units:
             self.units.remove(unit)
+            self.forces.remove(unit)
+        if unit in self.draw_order:
+            self.draw_order.remove(unit)
         if unit in self.selected_units:
             self.selected_units.remove(unit)
             unit.selected = False
@@ -381,7 +529,6 @@ class GameState:
             
     def update_collisions(self):
         """更新所有单位之间的碰撞"""
-        from units import UnitState
         
         for i in range(len(self.units)):
             for j in range(i + 1, len(self.units)):
@@ -404,13 +551,11 @@ class GameState:
         
     def get_units_by_type(self, unit_type):
         """获取指定类型的所有单位"""
-        from units import UnitState
         return [u for u in self.units 
                 if u.unit_type == unit_type and u.state != UnitState.DEAD]
                 
     def count_units(self, team=None, unit_type=None):
         """统计单位数量"""
-        from units import UnitState
         count = 0
         
         for unit in self.units:
@@ -439,7 +584,6 @@ class GameState:
         
     def is_game_over(self):
         """检查游戏是否结束"""
-        from units import UnitType
         
         # 检查是否有任一方的所有单位都被消灭
         player_alive = self.count_units(team=self.player_team) > 0
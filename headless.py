@@ -0,0 +1,170 @@
+import os
+import io
+import sys
+import time
+import random
+import argparse
+import contextlib
+
+# 无头模式使用SDL的dummy驱动，必须在导入pygame之前设置
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+from config import SCREEN_WIDTH, SCREEN_HEIGHT, FPS, COLOR_BLACK, CAPTURE_FORMAT, CAPTURE_SCALE
+from camera import Camera
+from game_state import GameState
+from level_manager import LevelManager
+from sprite_manager import SpriteManager
+from render_commands import NullRenderBackend
+from frame_capture import FrameCapture
+from tracing import tracer
+from replay import ReplayRecorder
+
+class HeadlessRunner:
+    """无头模式运行关卡
+
+    以固定时间步长推进，不限帧率；不需要画面时使用 NullRenderBackend 丢弃绘制命令。
+    """
+
+    def __init__(self, level_manager, level_index, dt=1 / FPS, render=False, seed=None,
+                 ai_workers=False):
+        pygame.init()
+        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.level_manager = level_manager
+        self.game_state = GameState()
+        self.camera = Camera(SCREEN_WIDTH, SCREEN_HEIGHT)
+        self.sprite_manager = SpriteManager()
+        self.dt = dt
+        self.render = render
+        self.frame = 0
+        self.result = None  # "victory" / "defeat" / None（未分胜负）
+
+        if not render:
+            self.game_state.render_backend = NullRenderBackend()
+
+        level_manager.ai_workers = ai_workers
+        level_manager.ai_worker_seed = seed
+        if seed is not None:
+            # 与游戏中开始关卡的顺序一致：设置种子 → 重置状态（生成地形）→ 加载关卡，回放可复现
+            random.seed(seed)
+            self.game_state.reset()
+        self.loaded = level_manager.load_level(level_index, self.game_state, self.sprite_manager)
+        if self.loaded:
+            self.camera.focus_on(*level_manager.get_map_center(self.game_state))
+
+    def step(self):
+        """推进一帧，返回对局是否结束"""
+        self.game_state.update(self.dt)
+        self.frame += 1
+        if self.level_manager.check_victory(self.game_state):
+            self.result = "victory"
+        elif self.level_manager.check_defeat(self.game_state):
+            self.result = "defeat"
+        return self.result is not None
+
+    def draw(self):
+        self.screen.fill(COLOR_BLACK)
+        self.game_state.draw(self.screen, self.camera, self.sprite_manager)
+
+    def run(self, max_frames, capture=None, capture_interval=1):
+        """运行到分出胜负或达到帧数上限；capture不为空时每capture_interval帧录制一帧"""
+        while self.frame < max_frames:
+            finished = self.step()
+            if capture and self.frame % capture_interval == 0:
+                self.draw()
+                # 无头模式没有实时要求，队列满时等待而不是丢帧
+                capture.capture(self.screen, self.game_state.level_time, block=True)
+            elif self.render:
+                self.draw()
+            if finished:
+                break
+        return self.result
+
+    def close(self):
+        """关闭AI子进程"""
+        self.game_state.clear_ai_controllers()
+
+def main():
+    parser = argparse.ArgumentParser(description="无头模式运行关卡")
+    parser.add_argument("level", help="关卡文件名（可省略.json）或关卡名")
+    parser.add_argument("--frames", type=int, default=FPS * 300, help="最多运行的帧数")
+    parser.add_argument("--dt", type=float, default=1 / FPS, help="固定时间步长（秒）")
+    parser.add_argument("--seed", type=int, default=None, help="随机种子")
+    parser.add_argument("--render", action="store_true", help="每帧都执行绘制")
+    parser.add_argument("--capture", metavar="DIR", help="录制输出目录")
+    parser.add_argument("--interval", type=int, default=10, help="每多少帧录制一帧")
+    parser.add_argument("--format", choices=["png", "raw"], default=CAPTURE_FORMAT, help="录制格式")
+    parser.add_argument("--scale", type=float, default=CAPTURE_SCALE, help="录制分辨率比例")
+    parser.add_argument("--ai-workers", action="store_true", help="在子进程中运行AI控制器")
+    parser.add_argument("--verbose", action="store_true", help="显示关卡和AI的输出")
+    parser.add_argument("--record", metavar="PATH", help="录制回放（JSONL）；录制时逐单位决策不限时间预算")
+    parser.add_argument("--trace", metavar="SPEC", help="跟踪级别，如 debug 或 info,ai:debug")
+    parser.add_argument("--trace-file", metavar="PATH", help="跟踪事件JSONL输出路径")
+    args = parser.parse_args()
+
+    if args.trace:
+        tracer.configure(args.trace)
+    if args.trace_file:
+        tracer.open_file(args.trace_file)
+    tracer.echo = args.verbose
+
+    output = sys.stdout if args.verbose else io.StringIO()
+    with contextlib.redirect_stdout(output):
+        level_manager = LevelManager()
+    level_index = level_manager.find_level(args.level)
+    if level_index is None:
+        print(f"找不到关卡: {args.level}")
+        return 1
+
+    if args.record and args.seed is None:
+        args.seed = random.randrange(1 << 31)
+
+    capture = None
+    if args.capture:
+        capture = FrameCapture(args.capture, fmt=args.format, frame_skip=0, scale=args.scale)
+        capture.start()
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        runner = HeadlessRunner(level_manager, level_index, args.dt,
+                                render=args.render or capture is not None, seed=args.seed,
+                                ai_workers=args.ai_workers)
+        recorder = None
+        if runner.loaded and args.record:
+            # 逐单位决策的时间预算与机器快慢有关，录制时关闭，重新模拟才能得到相同的决策
+            for controller in runner.game_state.ai_controllers:
+                if hasattr(controller, 'unit_scheduler'):
+                    controller.unit_scheduler.budget_ms = None
+            recorder = ReplayRecorder(args.record, level_manager.available_levels[level_index]['file'],
+                                      args.seed, args.dt)
+            recorder.start(runner.game_state, args.ai_workers)
+        if runner.loaded:
+            runner.run(args.frames, capture, args.interval)
+        if recorder:
+            recorder.close(runner.game_state, runner.result)
+        runner.close()
+    elapsed = time.perf_counter() - start
+
+    if capture:
+        capture.stop()
+    if not runner.loaded:
+        print("加载关卡失败")
+        return 1
+
+    game_state = runner.game_state
+    survivors = [len([u for u in game_state.units if u.team == team]) for team in (0, 1)]
+    print(f"结果: {runner.result or '未分胜负'}")
+    print(f"帧数: {runner.frame}  游戏时间: {game_state.level_time:.1f}s  存活: {survivors[0]} vs {survivors[1]}")
+    print(f"耗时: {elapsed:.2f}s ({elapsed / max(1, runner.frame) * 1000:.2f}ms/帧)")
+    if capture:
+        print(f"录制: {capture.written} 帧写入, {capture.dropped} 帧丢弃 -> {args.capture}")
+    if recorder:
+        print(f"回放: {recorder.tick} tick, {recorder.commands} 条命令, 种子 {args.seed} -> {args.record}")
+    if args.trace or args.trace_file:
+        tracer.close()
+        print(f"跟踪: {tracer.emitted} 条事件" + (f" -> {args.trace_file}" if args.trace_file else ""))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
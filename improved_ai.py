@@ -1,118 +1,57 @@
 import math
 import random
-import time
-from abc import ABC, abstractmethod
+from ai import AIController
 from units import UnitType, UnitState
+from commands import Attack, Move, Follow, Repair, Supply, Skill
+from target_scoring import TargetScorer, BestTargetProfile
+from tracing import tracer, INFO
 from config import *
 
-class ImprovedAIController(ABC):
+class ImprovedAIController(AIController):
     def __init__(self, team):
-        self.team = team
-        self.command_cooldown = 0
-        self.strategy_timer = 0
+        super().__init__(team)
         self.last_strategy_change = 0
         self.target_priorities = {}  # 目标优先级缓存
         self.group_formations = {}   # 编队信息
-        self.last_threat_assessment = 0
-        self.threat_map = {}
-        
-    @abstractmethod
-    def update(self, units, game_state):
-        pass
-    
-    def assess_threats(self, my_units, enemy_units):
-        """威胁评估系统"""
-        current_time = time.time()
-        if current_time - self.last_threat_assessment < 1.0:  # 每秒评估一次
-            return self.threat_map
-            
-        self.threat_map.clear()
-        self.last_threat_assessment = current_time
+        self.world_view = None  # 最近一次update看到的世界快照
+        self.best_target_scorer = TargetScorer(self, BestTargetProfile())
         
-        for enemy in enemy_units:
-            # 计算威胁值
-            threat_score = 0
-            
-            # 基础威胁（攻击力和血量）
-            threat_score += enemy.attack_damage * 2
-            threat_score += enemy.hp * 0.5
-            
-            # 距离威胁（距离我方单位越近威胁越大）
-            min_distance = float('inf')
-            for my_unit in my_units:
-                dist = enemy.distance_to(my_unit)
-                if dist < min_distance:
-                    min_distance = dist
-            
-            if min_distance < 200:
-                threat_score *= 2
-            elif min_distance < 400:
-                threat_score *= 1.5
-                
-            # 特殊单位威胁加成
-            if enemy.unit_type == UnitType.MOTHERSHIP:
-                threat_score *= 3
-            elif enemy.unit_type == UnitType.BOMBER:
+    def observe(self, game_state):
+        """记录本tick的世界快照并返回"""
+        self.world_view = game_state.world_view
+        return self.world_view
+
+    def assess_threat(self, enemy):
+        """威胁评估：基础威胁按影响力图上的我方单位分布加成，O(1)"""
+        # 基础威胁（攻击力和血量）
+        threat_score = enemy.attack_damage * 2 + enemy.hp * 0.5
+
+        # 距离威胁（附近有我方单位时威胁更大）
+        influence = self.world_view.influence if self.world_view else None
+        if influence is not None:
+            if influence.near_count(self.team, enemy.x, enemy.y):
                 threat_score *= 2
-            elif enemy.unit_type == UnitType.HEAVY:
+            elif influence.mid_count(self.team, enemy.x, enemy.y):
                 threat_score *= 1.5
-                
-            self.threat_map[enemy] = threat_score
-            
-        return self.threat_map
-    
+
+        # 特殊单位威胁加成
+        if enemy.unit_type == UnitType.MOTHERSHIP:
+            threat_score *= 3
+        elif enemy.unit_type == UnitType.BOMBER:
+            threat_score *= 2
+        elif enemy.unit_type == UnitType.HEAVY:
+            threat_score *= 1.5
+
+        return threat_score
+
     def select_best_target(self, unit, enemy_units, my_units):
-        """智能目标选择"""
-        if not enemy_units:
-            return None
-            
-        threat_map = self.assess_threats(my_units, enemy_units)
-        best_target = None
-        best_score = -1
-        
-        for enemy in enemy_units:
-            distance = unit.distance_to(enemy)
-            
-            # 超出攻击范围的目标降低优先级
-            if distance > unit.attack_range * 2:
-                continue
-                
-            score = 0
-            
-            # 威胁值权重
-            threat_score = threat_map.get(enemy, 0)
-            score += threat_score * 0.4
-            
-            # 距离权重（越近越好）
-            distance_score = max(0, 500 - distance) / 500 * 100
-            score += distance_score * 0.3
-            
-            # 血量权重（优先攻击残血）
-            hp_ratio = enemy.hp / enemy.max_hp
-            if hp_ratio < 0.3:
-                score += 100  # 残血目标高优先级
-            elif hp_ratio < 0.6:
-                score += 50
-                
-            # 单位类型优先级
-            if enemy.unit_type == UnitType.MOTHERSHIP:
-                score += 200
-            elif enemy.unit_type == UnitType.REPAIR:
-                score += 150  # 优先攻击修理机
-            elif enemy.unit_type == UnitType.BOMBER:
-                score += 120
-                
-            # 是否在攻击范围内
-            if distance <= unit.attack_range:
-                score += 100
-                
-            if score > best_score:
-                best_score = score
-                best_target = enemy
-                
-        return best_target
+        """智能目标选择：威胁、距离、残血和类型加权，超出两倍攻击范围的目标不考虑
+
+        同一批单位的评分由 best_target_scorer.prepare() 一次算出
+        """
+        return self.best_target_scorer.best(unit, enemy_units)
     
-    def should_use_skill(self, unit, units, game_state):
+    def should_use_skill(self, unit, game_state):
         """智能技能释放判断"""
         if unit.sp < unit.max_sp or not unit.skill_data:
             return False
@@ -121,30 +60,19 @@ class ImprovedAIController(ABC):
         skill_type = unit.skill_data.get("type", "")
         skill_range = unit.skill_data.get("range", 100)
         
-        my_units = [u for u in units if u.team == self.team and u.state != UnitState.DEAD]
-        enemy_units = [u for u in units if u.team != self.team and u.state != UnitState.DEAD]
+        view = game_state.world_view
         
         if skill_type == "damage_aoe":
-            # 范围伤害：检查范围内敌人数量
-            enemies_in_range = 0
-            for enemy in enemy_units:
-                if unit.distance_to(enemy) <= skill_range:
-                    enemies_in_range += 1
-            return enemies_in_range >= 2  # 至少2个敌人时释放
+            # 范围伤害：检查范围内敌人数量，至少2个敌人时释放
+            return view.neighbours(unit, skill_range).enemies >= 2
             
         elif skill_type == "heal_aoe":
             # 范围治疗：检查范围内受伤友军
-            damaged_allies = 0
-            for ally in my_units:
-                if (unit.distance_to(ally) <= skill_range and 
-                    ally.hp < ally.max_hp * 0.7):
-                    damaged_allies += 1
-            return damaged_allies >= 2
+            return view.neighbours(unit, skill_range).damaged_allies >= 2
             
         elif skill_type in ["buff_speed", "buff_attack"]:
             # 增益技能：在战斗中释放
-            nearby_enemies = [e for e in enemy_units if unit.distance_to(e) < 300]
-            return len(nearby_enemies) >= 1
+            return view.neighbours(unit, 300).enemies >= 1
             
         elif skill_type == "shield":
             # 护盾：血量低时释放
@@ -152,14 +80,24 @@ class ImprovedAIController(ABC):
             
         elif skill_type == "disable":
             # 禁用：对威胁最大的敌人释放
-            if enemy_units:
-                threat_map = self.assess_threats(my_units, enemy_units)
-                max_threat = max(threat_map.values()) if threat_map else 0
-                return max_threat > 100
+            return any(self.assess_threat(e) > 100 for e in view.enemy_units(self.team))
                 
         return False
 
 class AdvancedAI(ImprovedAIController):
+    # 实力计算的单位类型加权
+    FORCE_TYPE_WEIGHTS = {
+        UnitType.MOTHERSHIP: 3,
+        UnitType.HEAVY: 1.5,
+        UnitType.BOMBER: 1.3,
+    }
+    
+    PHASE_RATES = {
+        "command": 1 / 0.2,   # 每0.2秒更新命令
+        "strategy": 1 / 3.0,  # 每3秒调整策略
+        "micro": 1 / 0.1,     # 每0.1秒微操
+    }
+    
     def __init__(self, team):
         super().__init__(team)
         self.current_strategy = "balanced"
@@ -168,30 +106,26 @@ class AdvancedAI(ImprovedAIController):
             "aggressive": {"formation_radius": 100, "max_distance": 300},
             "balanced": {"formation_radius": 120, "max_distance": 250}
         }
-        self.micro_management_timer = 0
         
-    def update(self, units, game_state):
-        self.command_cooldown -= 1/60
-        self.strategy_timer += 1/60
-        self.micro_management_timer += 1/60
+    def update(self, units, game_state, dt):
+        self.advance_phases(dt)
         
-        if self.command_cooldown > 0:
+        if not self.phase_ready("command"):
             return
             
-        my_units = [u for u in units if u.team == self.team and u.state != UnitState.DEAD]
-        enemy_units = [u for u in units if u.team != self.team and u.state != UnitState.DEAD]
-        player_mothership = game_state.get_mothership(1 - self.team)
-        my_mothership = game_state.get_mothership(self.team)
+        view = self.observe(game_state)
+        my_units = view.my_units(self.team)
+        enemy_units = view.enemy_units(self.team)
+        player_mothership = view.mothership(1 - self.team)
+        my_mothership = view.mothership(self.team)
         
         # 每3秒调整策略
-        if self.strategy_timer > 3.0:
+        if self.phase_ready("strategy"):
             self.adjust_strategy(my_units, enemy_units, player_mothership)
-            self.strategy_timer = 0
             
         # 每0.1秒进行微操
-        if self.micro_management_timer > 0.1:
+        if self.phase_ready("micro"):
             self.micro_management(my_units, enemy_units, game_state)
-            self.micro_management_timer = 0
             
         # 执行策略
         if self.current_strategy == "aggressive":
@@ -200,8 +134,6 @@ class AdvancedAI(ImprovedAIController):
             self.execute_defensive_strategy(my_units, enemy_units, player_mothership, game_state)
         else:
             self.execute_balanced_strategy(my_units, enemy_units, player_mothership, game_state)
-            
-        self.command_cooldown = 0.2  # 更频繁的命令更新
         
     def adjust_strategy(self, my_units, enemy_units, player_mothership):
         """动态策略调整"""
@@ -209,8 +141,7 @@ class AdvancedAI(ImprovedAIController):
             return
             
         # 计算综合实力对比
-        my_strength = self.calculate_force_strength(my_units)
-        enemy_strength = self.calculate_force_strength(enemy_units)
+        my_strength, enemy_strength = self.world_view.forces.compare(self.team, self.calculate_force_strength)
         
         strength_ratio = my_strength / max(enemy_strength, 1)
         
@@ -227,30 +158,16 @@ class AdvancedAI(ImprovedAIController):
             
         if new_strategy != self.current_strategy:
             self.current_strategy = new_strategy
-            print(f"AI Strategy changed to: {self.current_strategy} (Ratio: {strength_ratio:.2f})")
-            
-    def calculate_force_strength(self, units):
-        """计算部队综合实力"""
-        strength = 0
-        for unit in units:
-            # 基础实力
-            unit_strength = unit.hp + unit.attack_damage * 2
-            
-            # 能量影响
-            energy_ratio = unit.energy / unit.max_energy if unit.max_energy > 0 else 1
-            unit_strength *= (0.5 + energy_ratio * 0.5)
-            
-            # 单位类型加权
-            if unit.unit_type == UnitType.MOTHERSHIP:
-                unit_strength *= 3
-            elif unit.unit_type == UnitType.HEAVY:
-                unit_strength *= 1.5
-            elif unit.unit_type == UnitType.BOMBER:
-                unit_strength *= 1.3
-                
-            strength += unit_strength
+            if tracer.enabled("ai", INFO):
+                tracer.emit("ai", INFO, f"AI Strategy changed to: {self.current_strategy} (Ratio: {strength_ratio:.2f})", team=self.team)
             
-        return strength
+    def calculate_force_strength(self, stats):
+        """计算部队综合实力
+
+        每个单位 (血量 + 攻击力×2) × (0.5 + 能量比例×0.5) × 类型加权，
+        从阵营汇总按分组求和，O(1)
+        """
+        return stats.weighted_strength(2, 0.5, self.FORCE_TYPE_WEIGHTS)
         
     def micro_management(self, my_units, enemy_units, game_state):
         """微操管理"""
@@ -260,18 +177,18 @@ class AdvancedAI(ImprovedAIController):
                 
             # 能量管理
             if unit.energy < 20 and unit.state != UnitState.RETURNING:
-                unit.state = UnitState.RETURNING
+                game_state.commands.submit(Supply(unit))
                 continue
                 
             # 智能技能释放
-            if self.should_use_skill(unit, my_units + enemy_units, game_state):
-                unit.use_skill(my_units + enemy_units, game_state)
+            if self.should_use_skill(unit, game_state):
+                game_state.commands.submit(Skill(unit, game_state.world_view.units))
                 
             # 修理机特殊逻辑
             if unit.unit_type == UnitType.REPAIR:
-                self.manage_repair_unit(unit, my_units, enemy_units)
+                self.manage_repair_unit(unit, my_units, enemy_units, game_state)
                 
-    def manage_repair_unit(self, repair_unit, my_units, enemy_units):
+    def manage_repair_unit(self, repair_unit, my_units, enemy_units, game_state):
         """修理机管理"""
         if repair_unit.state == UnitState.RETURNING:
             return
@@ -294,13 +211,12 @@ class AdvancedAI(ImprovedAIController):
             target = damaged_allies[0]
             
             if repair_unit.repair_target != target:
-                repair_unit.repair_target = target
-                repair_unit.target = target
-                repair_unit.state = UnitState.REPAIRING
+                game_state.commands.submit(Repair(repair_unit, target))
                 
     def execute_aggressive_strategy(self, my_units, enemy_units, player_mothership, game_state):
         """激进策略"""
         combat_units = [u for u in my_units if u.unit_type not in [UnitType.MOTHERSHIP, UnitType.REPAIR]]
+        self.best_target_scorer.prepare(combat_units, enemy_units)
         
         for unit in combat_units:
             if unit.energy < 30:
@@ -311,22 +227,18 @@ class AdvancedAI(ImprovedAIController):
             if target:
                 if (unit.attack_target != target or 
                     unit.state not in [UnitState.ATTACKING, UnitState.CIRCLE_STRAFING]):
-                    unit.attack_target = target
-                    unit.target = target
-                    unit.state = UnitState.ATTACKING
+                    game_state.commands.submit(Attack(unit, target))
                     
         # 母舰支援
-        mothership = game_state.get_mothership(self.team)
+        mothership = game_state.world_view.mothership(self.team)
         if mothership and enemy_units:
             target = self.select_best_target(mothership, enemy_units, my_units)
             if target and mothership.distance_to(target) <= mothership.attack_range:
-                mothership.attack_target = target
-                mothership.target = target
-                mothership.state = UnitState.ATTACKING
+                game_state.commands.submit(Attack(mothership, target))
                 
     def execute_defensive_strategy(self, my_units, enemy_units, player_mothership, game_state):
         """防守策略"""
-        mothership = game_state.get_mothership(self.team)
+        mothership = game_state.world_view.mothership(self.team)
         if not mothership:
             return
             
@@ -335,23 +247,22 @@ class AdvancedAI(ImprovedAIController):
         
         combat_units = [u for u in my_units if u.unit_type not in [UnitType.MOTHERSHIP, UnitType.REPAIR]]
         
+        # 防御圈内的敌人（所有单位共用）
+        nearby_enemies = [e for e in enemy_units 
+                        if mothership.distance_to(e) < max_distance]
+        self.best_target_scorer.prepare(combat_units, nearby_enemies)
+        
         for unit in combat_units:
             if unit.energy < 20:
-                unit.state = UnitState.RETURNING
+                game_state.commands.submit(Supply(unit))
                 continue
                 
             distance_to_mothership = unit.distance_to(mothership)
             
-            # 在防御圈内寻找目标
-            nearby_enemies = [e for e in enemy_units 
-                            if mothership.distance_to(e) < max_distance]
-            
             if nearby_enemies:
                 target = self.select_best_target(unit, nearby_enemies, my_units)
                 if target:
-                    unit.attack_target = target
-                    unit.target = target
-                    unit.state = UnitState.ATTACKING
+                    game_state.commands.submit(Attack(unit, target))
             else:
                 # 回到防御阵型
                 if distance_to_mothership > formation_radius:
@@ -359,8 +270,7 @@ class AdvancedAI(ImprovedAIController):
                     pos_x = mothership.x + math.cos(angle) * formation_radius * 0.8
                     pos_y = mothership.y + math.sin(angle) * formation_radius * 0.8
                     
-                    unit.target_pos = (pos_x, pos_y)
-                    unit.state = UnitState.MOVING
+                    game_state.commands.submit(Move(unit, (pos_x, pos_y)))
                     
     def execute_balanced_strategy(self, my_units, enemy_units, player_mothership, game_state):
         """平衡策略"""
@@ -370,42 +280,40 @@ class AdvancedAI(ImprovedAIController):
         attack_count = int(len(combat_units) * 0.6)
         attack_units = combat_units[:attack_count]
         defense_units = combat_units[attack_count:]
+        self.best_target_scorer.prepare(attack_units, enemy_units)
         
         # 进攻单位
         for unit in attack_units:
             if unit.energy < 25:
-                unit.state = UnitState.RETURNING
+                game_state.commands.submit(Supply(unit))
                 continue
                 
             target = self.select_best_target(unit, enemy_units, my_units)
             if target:
-                unit.attack_target = target
-                unit.target = target
-                unit.state = UnitState.ATTACKING
+                game_state.commands.submit(Attack(unit, target))
                 
         # 防守单位
-        mothership = game_state.get_mothership(self.team)
+        mothership = game_state.world_view.mothership(self.team)
         if mothership:
+            # 威胁母舰的敌人（所有防守单位共用）
+            threats = [e for e in enemy_units 
+                      if mothership.distance_to(e) < 250]
+            self.best_target_scorer.prepare(defense_units, threats)
+            
             for unit in defense_units:
                 if unit.energy < 30:
-                    unit.state = UnitState.RETURNING
+                    game_state.commands.submit(Supply(unit))
                     continue
                     
                 # 保护母舰
-                threats = [e for e in enemy_units 
-                          if mothership.distance_to(e) < 250]
-                          
                 if threats:
                     target = self.select_best_target(unit, threats, my_units)
                     if target:
-                        unit.attack_target = target
-                        unit.target = target
-                        unit.state = UnitState.ATTACKING
+                        game_state.commands.submit(Attack(unit, target))
                 else:
                     # 巡逻
                     if unit.distance_to(mothership) > 200:
-                        unit.follow_target = mothership
-                        unit.state = UnitState.FOLLOWING
+                        game_state.commands.submit(Follow(unit, mothership))
 
 # 专门的激进AI
 class HyperAggressiveAI(AdvancedAI):
@@ -415,8 +323,7 @@ class HyperAggressiveAI(AdvancedAI):
         
     def adjust_strategy(self, my_units, enemy_units, player_mothership):
         # 始终保持激进，但根据实力调整激进程度
-        my_strength = self.calculate_force_strength(my_units)
-        enemy_strength = self.calculate_force_strength(enemy_units)
+        my_strength, enemy_strength = self.world_view.forces.compare(self.team, self.calculate_force_strength)
         strength_ratio = my_strength / max(enemy_strength, 1)
         
         if strength_ratio > 0.8:
@@ -432,8 +339,7 @@ class TurtleAI(AdvancedAI):
         
     def adjust_strategy(self, my_units, enemy_units, player_mothership):
         # 始终保持防守，但实力足够时可以反击
-        my_strength = self.calculate_force_strength(my_units)
-        enemy_strength = self.calculate_force_strength(enemy_units)
+        my_strength, enemy_strength = self.world_view.forces.compare(self.team, self.calculate_force_strength)
         strength_ratio = my_strength / max(enemy_strength, 1)
         
         if strength_ratio > 1.5:
@@ -0,0 +1,156 @@
+import math
+import numpy as np
+from config import (MAP_WIDTH, MAP_HEIGHT, INFLUENCE_CELL_SIZE, INFLUENCE_RADIUS,
+                    INFLUENCE_NEAR_RADIUS, INFLUENCE_MID_RADIUS)
+
+class InfluenceMap:
+    """粗网格影响力/威胁图
+
+    每个阵营三张网格：
+    - influence: 单位攻击力按距离线性衰减后的叠加（威胁/控制力）
+    - near / mid: 近距离、中距离范围内的单位数量
+
+    每个单位把预先计算好的"印章"叠加到所属阵营的网格上，并记录印章位置。
+    每tick只处理跨格、攻击力变化或死亡的单位：擦掉旧印章、盖上新印章，
+    之后任何位置的查询都是一次数组下标访问。
+    """
+
+    BORDER = 200  # 与相机的地图边界余量一致
+
+    def __init__(self, cell_size=INFLUENCE_CELL_SIZE):
+        self.cell_size = cell_size
+        self.origin = -self.BORDER
+        self.cols = math.ceil((MAP_WIDTH + self.BORDER * 2) / cell_size)
+        self.rows = math.ceil((MAP_HEIGHT + self.BORDER * 2) / cell_size)
+
+        self.influence_kernel = self.make_kernel(INFLUENCE_RADIUS, falloff=True)
+        self.near_kernel = self.make_kernel(INFLUENCE_NEAR_RADIUS)
+        self.mid_kernel = self.make_kernel(INFLUENCE_MID_RADIUS)
+
+        self.layers = {}  # 阵营 -> (influence, near, mid)
+        self.total_influence = np.zeros((self.rows, self.cols), dtype=np.float32)
+        self.stamps = {}  # 单位 -> (阵营, 行, 列, 强度)
+
+    def make_kernel(self, radius, falloff=False):
+        """生成圆形印章；falloff为True时从中心的1线性衰减到边缘的0"""
+        cells = int(radius // self.cell_size)
+        offsets = np.arange(-cells, cells + 1) * self.cell_size
+        distance = np.sqrt(offsets[:, None] ** 2 + offsets[None, :] ** 2)
+        if falloff:
+            return np.clip(1 - distance / radius, 0, None).astype(np.float32)
+        return (distance <= radius).astype(np.float32)
+
+    def clear(self):
+        """清空所有印章"""
+        self.layers.clear()
+        self.total_influence.fill(0)
+        self.stamps.clear()
+
+    def cell_of(self, x, y):
+        """世界坐标对应的网格（超出地图时夹到边缘）"""
+        col = int((x - self.origin) // self.cell_size)
+        row = int((y - self.origin) // self.cell_size)
+        return (min(max(row, 0), self.rows - 1), min(max(col, 0), self.cols - 1))
+
+    def get_layers(self, team):
+        layers = self.layers.get(team)
+        if layers is None:
+            shape = (self.rows, self.cols)
+            layers = (np.zeros(shape, dtype=np.float32),
+                      np.zeros(shape, dtype=np.float32),
+                      np.zeros(shape, dtype=np.float32))
+            self.layers[team] = layers
+        return layers
+
+    def apply_kernel(self, grid, kernel, row, col, scale):
+        """把印章按比例叠加到网格（自动裁剪边缘）"""
+        half = kernel.shape[0] // 2
+        top, left = row - half, col - half
+        r0, c0 = max(top, 0), max(left, 0)
+        r1 = min(top + kernel.shape[0], self.rows)
+        c1 = min(left + kernel.shape[1], self.cols)
+        grid[r0:r1, c0:c1] += kernel[r0 - top:r1 - top, c0 - left:c1 - left] * scale
+
+    def stamp(self, team, row, col, strength, sign):
+        influence, near, mid = self.get_layers(team)
+        self.apply_kernel(influence, self.influence_kernel, row, col, strength * sign)
+        self.apply_kernel(self.total_influence, self.influence_kernel, row, col, strength * sign)
+        self.apply_kernel(near, self.near_kernel, row, col, sign)
+        self.apply_kernel(mid, self.mid_kernel, row, col, sign)
+
+    def update(self, units):
+        """增量更新：只重盖位置格子或攻击力发生变化的单位，擦除已移除的单位"""
+        stamps = self.stamps
+        seen = set()
+        for unit in units:
+            seen.add(unit)
+            row, col = self.cell_of(unit.x, unit.y)
+            strength = unit.attack_damage
+            old = stamps.get(unit)
+            if old is not None:
+                if old[1] == row and old[2] == col and old[3] == strength:
+                    continue
+                self.stamp(old[0], old[1], old[2], old[3], -1)
+            self.stamp(unit.team, row, col, strength, 1)
+            stamps[unit] = (unit.team, row, col, strength)
+
+        if len(stamps) > len(seen):
+            for unit in [u for u in stamps if u not in seen]:
+                team, row, col, strength = stamps.pop(unit)
+                self.stamp(team, row, col, strength, -1)
+
+    def friendly_influence(self, team, x, y):
+        """己方影响力"""
+        layers = self.layers.get(team)
+        if layers is None:
+            return 0.0
+        return float(layers[0][self.cell_of(x, y)])
+
+    def threat(self, team, x, y):
+        """敌方影响力（威胁）"""
+        cell = self.cell_of(x, y)
+        layers = self.layers.get(team)
+        own = layers[0][cell] if layers is not None else 0.0
+        return float(self.total_influence[cell] - own)
+
+    def safety(self, team, x, y):
+        """己方影响力减去敌方影响力，正值表示己方控制"""
+        cell = self.cell_of(x, y)
+        layers = self.layers.get(team)
+        own = layers[0][cell] if layers is not None else 0.0
+        return float(own * 2 - self.total_influence[cell])
+
+    def near_count(self, team, x, y):
+        """近距离范围内该阵营的单位数量"""
+        layers = self.layers.get(team)
+        if layers is None:
+            return 0
+        return int(round(float(layers[1][self.cell_of(x, y)])))
+
+    def mid_count(self, team, x, y):
+        """中距离范围内该阵营的单位数量"""
+        layers = self.layers.get(team)
+        if layers is None:
+            return 0
+        return int(round(float(layers[2][self.cell_of(x, y)])))
+
+    def is_frontline(self, team, x, y, threshold=1.0):
+        """双方影响力都超过阈值的位置视为前线"""
+        cell = self.cell_of(x, y)
+        layers = self.layers.get(team)
+        if layers is None:
+            return False
+        own = layers[0][cell]
+        return bool(own >= threshold and self.total_influence[cell] - own >= threshold)
+
+    def frontline_cells(self, team, threshold=1.0):
+        """前线格子的世界坐标中心列表"""
+        layers = self.layers.get(team)
+        if layers is None:
+            return []
+        own = layers[0]
+        enemy = self.total_influence - own
+        rows, cols = np.nonzero((own >= threshold) & (enemy >= threshold))
+        half = self.cell_size / 2
+        return [(self.origin + c * self.cell_size + half, self.origin + r * self.cell_size + half)
+                for r, c in zip(rows.tolist(), cols.tolist())]
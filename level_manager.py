@@ -1,15 +1,17 @@
 import os
 import json
 import pygame
-from units import Unit, RepairUnit, UnitType, UnitState
-from ai import SimpleAI
-from improved_ai import AdvancedAI, HyperAggressiveAI, TurtleAI
+from units import Unit, RepairUnit, UnitState, reset_unit_ids
+from ai_registry import create_ai_controller
+from config import AI_WORKER_ENABLED
 
 class LevelManager:
     def __init__(self, levels_folder="levels"):
         self.levels_folder = levels_folder
         self.available_levels = []
         self.current_level_data = None
+        self.ai_workers = AI_WORKER_ENABLED  # 是否在子进程中运行AI控制器
+        self.ai_worker_seed = None          # 子进程的随机种子
         self.scan_levels()
         
     def scan_levels(self):
@@ -37,65 +39,16 @@ class LevelManager:
         self.available_levels.sort(key=lambda x: x['file'])
         print(f"Total levels found: {len(self.available_levels)}")
         
-    def get_ai_controller(self, ai_type, team, level_data):
-        """根据AI类型创建AI控制器"""
-        
-        # 恶魔级AI（最高难度）
-        if ai_type == "apocalypse":
-            from demon_ai import ApocalypseAI
-            return ApocalypseAI(team)
-        elif ai_type == "nightmare":
-            from demon_ai import NightmareAI
-            return NightmareAI(team)
-        elif ai_type == "demon":
-            from demon_ai import DemonAI
-            return DemonAI(team)
-        
-        # 空战专用AI
-        elif ai_type == "kamikaze":
-            from dogfight_ai import KamikazeAI
-            return KamikazeAI(team)
-        elif ai_type == "blitzkrieg":
-            from dogfight_ai import BlitzkriegAI
-            return BlitzkriegAI(team)
-        elif ai_type == "dogfight":
-            from dogfight_ai import DogfightAI
-            return DogfightAI(team)
-        
-        # 精英级AI
-        elif ai_type == "terminator":
-            from super_ai import TerminatorAI
-            return TerminatorAI(team)
-        elif ai_type == "elite":
-            from super_ai import EliteAI
-            return EliteAI(team)
-        
-        # 改进AI系列
-        elif ai_type == "hyper_aggressive":
-            from improved_ai import HyperAggressiveAI
-            return HyperAggressiveAI(team)
-        elif ai_type == "turtle":
-            from improved_ai import TurtleAI
-            return TurtleAI(team)
-        elif ai_type == "advanced":
-            from improved_ai import AdvancedAI
-            return AdvancedAI(team)
+    def wrap_ai_controller(self, controller):
+        """启用AI子进程时把控制器包装成在子进程中运行的代理"""
+        if not self.ai_workers:
+            return controller
+        from ai_worker import WorkerAIController
+        return WorkerAIController(controller, seed=self.ai_worker_seed)
         
-        # 基础AI系列
-        elif ai_type == "aggressive":
-            from ai import AggressiveAI
-            return AggressiveAI(team)
-        elif ai_type == "defensive":
-            from ai import DefensiveAI
-            return DefensiveAI(team)
-        elif ai_type == "simple":
-            from ai import SimpleAI
-            return SimpleAI(team)
-        
-        # 默认使用高级AI
-        else:
-            from super_ai import EliteAI
-            return EliteAI(team)
+    def get_ai_controller(self, ai_type, team, level_data):
+        """根据AI类型创建AI控制器（AI模块在第一次使用时才导入，未知类型使用默认AI）"""
+        return create_ai_controller(ai_type, team)
         
     def get_map_center(self, game_state):
         """计算地图中心点"""
@@ -128,8 +81,9 @@ class LevelManager:
                 level_data = json.load(f)
                 
             self.current_level_data = level_data
-            game_state.units.clear()
-            game_state.ai_controllers.clear()
+            game_state.clear_units()
+            game_state.clear_ai_controllers()
+            reset_unit_ids()
             
             # 加载单位数据
             units_data = level_data.get("units", {})
@@ -181,7 +135,7 @@ class LevelManager:
             # 创建AI控制器（支持多种AI类型）
             ai_type = level_data.get("ai_type", "advanced")
             ai_controller = self.get_ai_controller(ai_type, 1, level_data)
-            game_state.ai_controllers.append(ai_controller)
+            game_state.ai_controllers.append(self.wrap_ai_controller(ai_controller))
             
             # 可选：支持多个AI控制器
             additional_ais = level_data.get("additional_ais", [])
@@ -189,7 +143,7 @@ class LevelManager:
                 ai_type = ai_config.get("type", "advanced")
                 ai_team = ai_config.get("team", 1)
                 additional_ai = self.get_ai_controller(ai_type, ai_team, level_data)
-                game_state.ai_controllers.append(additional_ai)
+                game_state.ai_controllers.append(self.wrap_ai_controller(additional_ai))
             
             print(f"Level loaded successfully:")
             print(f"  - Player units: {player_units_loaded}")
@@ -281,6 +235,13 @@ class LevelManager:
             return self.available_levels[level_index]
         return None
         
+    def find_level(self, name):
+        """按文件名（可省略.json）或关卡名查找关卡索引"""
+        for i, level in enumerate(self.available_levels):
+            if name in (level['file'], level['file'][:-5], level['name']):
+                return i
+        return None
+        
     def get_level_count(self):
         """获取关卡数量"""
         return len(self.available_levels)
@@ -0,0 +1,64 @@
+from config import (COLOR_PLAYER, COLOR_ENEMY, COLOR_WHITE,
+                    LOD_SIMPLE_ZOOM, LOD_DOT_ZOOM, LOD_CLUSTER_CELL)
+from units import UnitType
+
+# 细节层级
+LOD_FULL = 0     # 完整绘制
+LOD_SIMPLE = 1   # 只画精灵/轮廓和护盾、禁用、选中圈
+LOD_DOTS = 2     # 阵营色圆点，密集单位合并成一个点
+
+class LODPolicy:
+    """根据相机缩放选择单位的绘制细节层级"""
+
+    def __init__(self, simple_zoom=LOD_SIMPLE_ZOOM, dot_zoom=LOD_DOT_ZOOM, cluster_cell=LOD_CLUSTER_CELL):
+        self.simple_zoom = simple_zoom
+        self.dot_zoom = dot_zoom
+        self.cluster_cell = cluster_cell
+        self.clusters = {}  # 每帧复用的合并网格
+
+    def level_for(self, zoom):
+        """获取缩放对应的细节层级"""
+        if zoom < self.dot_zoom:
+            return LOD_DOTS
+        if zoom < self.simple_zoom:
+            return LOD_SIMPLE
+        return LOD_FULL
+
+    def draw_unit_dots(self, screen, camera, units):
+        """圆点模式：同一网格内的同阵营单位合并为一个点，返回绘制的点数"""
+
+        cell = self.cluster_cell
+        clusters = self.clusters
+        clusters.clear()
+
+        for unit in units:
+            sx, sy = camera.world_to_screen(unit.x, unit.y)
+            key = (unit.team, sx // cell, sy // cell)
+            cluster = clusters.get(key)
+            if cluster is None:
+                clusters[key] = [sx, sy, 1, unit.selected, unit.unit_type == UnitType.MOTHERSHIP]
+            else:
+                cluster[0] += sx
+                cluster[1] += sy
+                cluster[2] += 1
+                cluster[3] = cluster[3] or unit.selected
+                cluster[4] = cluster[4] or unit.unit_type == UnitType.MOTHERSHIP
+
+        width = screen.get_width()
+        height = screen.get_height()
+        drawn = 0
+        for (team, _, _), (sum_x, sum_y, count, selected, has_mothership) in clusters.items():
+            x = sum_x // count
+            y = sum_y // count
+            if x < -10 or y < -10 or x > width + 10 or y > height + 10:
+                continue
+
+            # 点的大小随合并数量增长，母舰所在的点更大
+            radius = (5 if has_mothership else 2) + min(count - 1, 4)
+            color = COLOR_PLAYER if team == 0 else COLOR_ENEMY
+            screen.circle(color, (x, y), radius)
+            if selected:
+                screen.circle(COLOR_WHITE, (x, y), radius + 3, 1)
+            drawn += 1
+
+        return drawn
@@ -1,6 +1,10 @@
+import time
+startup_begin = time.perf_counter()  # 启动计时起点（导入其他模块之前）
+
 import pygame
-import sys
-import math
+import os
+import random
+import multiprocessing
 from config import *
 from camera import Camera
 from game_state import GameState
@@ -9,11 +13,18 @@ from sprite_manager import SpriteManager
 from menu import ContextMenu, MainMenu, GlobalCommandMenu
 from command_system import CommandSystem
 from ui_panel import UnitPanel
+from minimap import Minimap
+from frame_capture import FrameCapture
 from score_system import ScoreSystem
-from units import UnitType, UnitState
+from units import UnitType
+from commands import Attack, Follow, Repair
+from surface_pool import surface_pool
+from tracing import tracer, INFO
+from replay import ReplayRecorder
 
 class RTSGame:
     def __init__(self):
+        init_begin = time.perf_counter()
         pygame.init()
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption("即时策略游戏")
@@ -28,6 +39,7 @@ class RTSGame:
         self.global_menu = GlobalCommandMenu()
         self.command_system = CommandSystem()
         self.unit_panel = UnitPanel()
+        self.minimap = Minimap()
         self.score_system = ScoreSystem()
         self.font = get_font(36)
         self.small_font = get_font(20)
@@ -36,6 +48,19 @@ class RTSGame:
         self.selection_start = None
         self.selection_rect = None
         
+        # 性能信息（F3切换）
+        self.show_perf = False
+        
+        # 帧录制（F9切换）
+        self.frame_capture = None
+        
+        # 回放录制（REPLAY_RECORD开启时每局录制）
+        self.replay_recorder = None
+        
+        # 启动耗时（第一次显示主菜单时输出）
+        self.startup_times = {"imports": init_begin - startup_begin,
+                              "init": time.perf_counter() - init_begin}
+        
     def reset_game_state(self):
         """重置游戏状态"""
         self.game_state.reset()
@@ -43,14 +68,11 @@ class RTSGame:
         self.context_menu.hide()
         self.global_menu.hide()
         self.camera.stop_following()
+        self.minimap.invalidate()
         self.score_system = ScoreSystem()
         
     def show_score_screen(self, level_name, score, score_breakdown, is_new_record):
         """显示分数画面"""
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        overlay.set_alpha(200)
-        overlay.fill((0, 30, 0))
-        
         # 字体
         title_font = get_font(48)
         score_font = get_font(36)
@@ -69,7 +91,8 @@ class RTSGame:
             self.screen.fill(COLOR_BLACK)
             self.game_state.draw(self.screen, self.camera, self.sprite_manager)
             
-            # 绘制分数覆盖层
+            # 绘制分数覆盖层（每帧重新填充，表面可能已被其他绘制借用）
+            overlay = surface_pool.get_overlay((SCREEN_WIDTH, SCREEN_HEIGHT), (0, 30, 0), 200)
             self.screen.blit(overlay, (0, 0))
             
             # 标题
@@ -111,10 +134,6 @@ class RTSGame:
 
     def show_defeat_screen(self):
         """显示失败画面"""
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        overlay.set_alpha(180)
-        overlay.fill((50, 0, 0))
-        
         defeat_font = get_font(72)
         defeat_text = defeat_font.render("失败！", True, COLOR_ENEMY)
         defeat_rect = defeat_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 50))
@@ -136,6 +155,7 @@ class RTSGame:
             self.game_state.draw(self.screen, self.camera, self.sprite_manager)
             
             # 绘制失败覆盖层
+            overlay = surface_pool.get_overlay((SCREEN_WIDTH, SCREEN_HEIGHT), (50, 0, 0), 180)
             self.screen.blit(overlay, (0, 0))
             self.screen.blit(defeat_text, defeat_rect)
             self.screen.blit(continue_text, continue_rect)
@@ -182,6 +202,9 @@ class RTSGame:
                         self.camera.enable_edge_scroll(False)
                         if self.command_system.valid_target:
                             self.camera.set_follow_target(self.command_system.valid_target)
+                    elif self.minimap.contains(*mouse_pos):
+                        # 点击小地图跳转视角
+                        self.minimap.jump_camera(*mouse_pos, self.camera)
                     else:
                         # 检查是否点击了单位面板
                         panel_result = self.unit_panel.handle_click(*mouse_pos, self.game_state, button=1)
@@ -259,9 +282,69 @@ class RTSGame:
                 elif event.key == pygame.K_TAB:
                     # Tab键切换面板显示
                     self.unit_panel.toggle_visibility()
+                elif event.key == pygame.K_m:
+                    # M键切换小地图显示
+                    self.minimap.toggle_visibility()
+                elif event.key == pygame.K_F3:
+                    # F3键切换性能信息
+                    self.show_perf = not self.show_perf
+                elif event.key == pygame.K_F9:
+                    # F9键开始/停止录制
+                    self.toggle_capture()
                     
         return "continue"
         
+    def toggle_capture(self):
+        """开始/停止帧录制"""
+        if self.frame_capture:
+            self.stop_capture()
+        else:
+            output_dir = os.path.join(CAPTURE_DIR, time.strftime("%Y%m%d_%H%M%S"))
+            self.frame_capture = FrameCapture(output_dir)
+            self.frame_capture.start()
+            print(f"开始录制: {output_dir}")
+            
+    def stop_replay(self):
+        """结束回放录制"""
+        if self.replay_recorder:
+            self.replay_recorder.close(self.game_state)
+            print(f"回放已保存: {self.replay_recorder.path} ({self.replay_recorder.tick} tick)")
+            self.replay_recorder = None
+            
+    def stop_capture(self):
+        """停止录制并等待剩余帧写完"""
+        if self.frame_capture:
+            self.frame_capture.stop()
+            print(f"录制结束: {self.frame_capture.written} 帧, 丢弃 {self.frame_capture.dropped} 帧")
+            self.frame_capture = None
+        
+    def draw_perf_overlay(self):
+        """绘制性能信息（帧率、帧时间、画质档位、绘制命令数、AI决策数、单位命令数）"""
+        quality = self.game_state.quality
+        backend = self.game_state.render_backend
+        schedulers = [ai.unit_scheduler for ai in self.game_state.ai_controllers
+                      if hasattr(ai, 'unit_scheduler')]
+        lines = [
+            f"FPS: {self.clock.get_fps():.0f}",
+            f"帧时间: {quality.average_ms():.1f}/{quality.budget_ms:.1f}ms",
+            f"画质: {quality.tier['name']}",
+            f"单位: {len(self.game_state.units)}  特效: {len(self.game_state.effects)}",
+            f"绘制命令: {backend.executed}  剔除: {backend.culled}",
+        ]
+        if schedulers:
+            processed = sum(s.processed for s in schedulers)
+            total = sum(s.total for s in schedulers)
+            lines.append(f"AI决策: {processed}/{total}")
+        command_stats = self.game_state.commands.stats
+        lines.append(f"单位命令: 应用 {command_stats['applied']}  去重 {command_stats['dropped']}")
+        y = MINIMAP_MARGIN + MINIMAP_SIZE + 10
+        for i, line in enumerate(lines):
+            text = self.small_font.render(line, True, COLOR_YELLOW)
+            text_rect = text.get_rect()
+            text_rect.right = SCREEN_WIDTH - 10
+            text_rect.top = y + i * 18
+            self.screen.blit(text, text_rect)
+        
     def select_unit_at_position(self, mouse_pos):
         """在指定位置选择单位"""
         world_x, world_y = self.camera.screen_to_world(*mouse_pos)
@@ -361,30 +444,30 @@ class RTSGame:
         if not self.game_state.selected_units:
             return
             
+        commands = self.game_state.commands
         for selected_unit in self.game_state.selected_units:
             if clicked_unit.team != self.game_state.player_team:
                 # 点击敌方单位 - 执行攻击
                 if selected_unit.attack_damage > 0 and selected_unit.unit_type != UnitType.REPAIR:
-                    selected_unit.attack_target = clicked_unit
-                    selected_unit.target = clicked_unit
-                    selected_unit.state = UnitState.ATTACKING
+                    commands.submit(Attack(selected_unit, clicked_unit))
             else:
                 # 点击友方单位
                 if selected_unit.unit_type == UnitType.REPAIR or selected_unit.unit_type == UnitType.MOTHERSHIP:
                     # 修理机或母舰对受损友军进行修理
                     if clicked_unit.hp < clicked_unit.max_hp:
-                        selected_unit.repair_target = clicked_unit
-                        selected_unit.target = clicked_unit
-                        selected_unit.state = UnitState.REPAIRING
+                        commands.submit(Repair(selected_unit, clicked_unit))
                 else:
                     # 其他单位执行跟随
-                    selected_unit.follow_target = clicked_unit
-                    selected_unit.state = UnitState.FOLLOWING
-                    selected_unit.attack_target = None
-                    selected_unit.repair_target = None
+                    commands.submit(Follow(selected_unit, clicked_unit))
     
     def play_level(self, level_index):
         """游玩指定关卡"""
+        # 录制回放时先设置随机种子，地形和单位生成都由种子决定
+        seed = None
+        if REPLAY_RECORD:
+            seed = random.randrange(1 << 31)
+            random.seed(seed)
+            
         # 重置游戏状态
         self.reset_game_state()
         
@@ -393,6 +476,16 @@ class RTSGame:
             print("加载关卡失败")
             return "main_menu"
             
+        if REPLAY_RECORD:
+            level_file = self.level_manager.available_levels[level_index]['file']
+            path = os.path.join(REPLAY_DIR, f"{time.strftime('%Y%m%d_%H%M%S')}_{os.path.splitext(level_file)[0]}.jsonl")
+            # 逐单位决策的时间预算与机器快慢有关，录制时关闭，重新模拟才能得到相同的决策
+            for controller in self.game_state.ai_controllers:
+                if hasattr(controller, 'unit_scheduler'):
+                    controller.unit_scheduler.budget_ms = None
+            self.replay_recorder = ReplayRecorder(path, level_file, seed)
+            self.replay_recorder.start(self.game_state, self.level_manager.ai_workers)
+            
         # 获取关卡信息
         level_data = self.level_manager.current_level_data
         level_name = level_data.get('name', '未知关卡')
@@ -411,6 +504,8 @@ class RTSGame:
         # 游戏主循环
         while self.running:
             dt = self.clock.tick(FPS) / 1000.0
+            # 记录本帧实际耗时（不含帧率限制的等待），用于自动调整画质
+            self.game_state.quality.record(self.clock.get_rawtime())
             
             # 处理输入
             input_result = self.handle_input()
@@ -420,6 +515,9 @@ class RTSGame:
             # 更新左侧面板
             self.unit_panel.update(self.game_state)
             
+            # 更新小地图（单位点层低频刷新）
+            self.minimap.update(self.game_state, dt)
+            
             # 更新游戏状态
             self.game_state.update(dt)
             
@@ -448,7 +546,9 @@ class RTSGame:
             self.game_state.draw(self.screen, self.camera, self.sprite_manager)
             
             # 绘制命令光标
-            self.command_system.draw_cursor(self.screen, self.camera)
+            cursor_buffer = self.game_state.begin_render(self.screen)
+            self.command_system.draw_cursor(cursor_buffer, self.camera)
+            self.game_state.flush_render(self.screen)
             
             # 绘制UI信息
             if self.game_state.selected_units:
@@ -478,6 +578,13 @@ class RTSGame:
             # 绘制单位面板（覆盖在游戏画面上）
             self.unit_panel.draw(self.screen, self.game_state)
             
+            # 绘制小地图
+            self.minimap.draw(self.screen, self.camera)
+            
+            # 绘制性能信息
+            if self.show_perf:
+                self.draw_perf_overlay()
+            
             # 绘制右键菜单（最高优先级）
             self.context_menu.draw(self.screen)
             self.global_menu.draw(self.screen)
@@ -494,8 +601,8 @@ class RTSGame:
             
             # 绘制控制提示
             hints = [
-                "TAB:显示/隐藏单位面板 | 中键:拖动视角 | ESC:返回主菜单",
-                "左键:选择 | 右键:菜单/命令 | 滚轮:缩放/面板滚动"
+                "TAB:显示/隐藏单位面板 | M:小地图 | 中键:拖动视角 | ESC:返回主菜单",
+                "左键:选择 | 右键:菜单/命令 | 滚轮:缩放/面板滚动 | F3:性能信息 | F9:录制"
             ]
             for i, hint in enumerate(hints):
                 hint_text = self.small_font.render(hint, True, (200, 200, 200))
@@ -506,13 +613,30 @@ class RTSGame:
             
             pygame.display.flip()
             
+            # 录制当前帧（队列满时丢帧，不阻塞游戏循环）
+            if self.frame_capture:
+                self.frame_capture.capture(self.screen, self.game_state.level_time)
+            
         return "quit"
                 
+    def report_startup(self):
+        """输出从启动到主菜单的耗时"""
+        times = self.startup_times
+        total = time.perf_counter() - startup_begin
+        times["menu"] = total - times["imports"] - times["init"]
+        print(f"启动耗时: {total * 1000:.0f}ms (模块导入 {times['imports'] * 1000:.0f}ms, "
+              f"初始化 {times['init'] * 1000:.0f}ms, 主菜单 {times['menu'] * 1000:.0f}ms)")
+        if tracer.enabled("game", INFO):
+            tracer.emit("game", INFO, f"startup {total * 1000:.0f}ms", total=total, **times)
+        self.startup_times = None
+        
     def run(self):
         """主运行循环"""
         while self.running:
             # 显示主菜单
             menu = MainMenu(self.screen, self.level_manager)
+            if self.startup_times:
+                self.report_startup()
             selected_level = menu.run()
             
             if selected_level is None:
@@ -520,6 +644,8 @@ class RTSGame:
                 
             # 游玩选中的关卡
             result = self.play_level(selected_level)
+            self.stop_capture()
+            self.stop_replay()
             if result == "quit":
                 break
             # 如果result == "main_menu"，则继续循环回到主菜单
@@ -527,5 +653,6 @@ class RTSGame:
         pygame.quit()
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # 打包后AI子进程需要
     game = RTSGame()
     game.run()
\ No newline at end of file
@@ -0,0 +1,113 @@
+import pygame
+from config import (SCREEN_WIDTH, MAP_WIDTH, MAP_HEIGHT, COLOR_PLAYER, COLOR_ENEMY,
+                    COLOR_WHITE, COLOR_GRAY, MINIMAP_SIZE, MINIMAP_MARGIN, MINIMAP_UNIT_HZ)
+from units import UnitType
+
+class Minimap:
+    """小地图
+
+    地形和星空烘焙成底图，只在地形变化（TerrainManager.version）或换关时重绘；
+    单位点层按 MINIMAP_UNIT_HZ 的频率在底图上重新合成；视口框每帧绘制。
+    """
+
+    BORDER = 200  # 与相机的地图边界余量一致
+    BACKGROUND = (10, 10, 20)
+
+    def __init__(self, size=MINIMAP_SIZE, unit_hz=MINIMAP_UNIT_HZ):
+        self.size = size
+        self.x = SCREEN_WIDTH - size - MINIMAP_MARGIN
+        self.y = MINIMAP_MARGIN
+        self.visible = True
+        self.unit_interval = 1.0 / unit_hz
+        self.unit_timer = 0
+
+        # 世界范围映射到小地图
+        self.world_x = -self.BORDER
+        self.world_y = -self.BORDER
+        self.scale = size / (max(MAP_WIDTH, MAP_HEIGHT) + self.BORDER * 2)
+
+        self.base_layer = pygame.Surface((size, size))  # 地形+星空底图
+        self.layer = pygame.Surface((size, size))       # 底图+单位点
+        self.base_key = None
+
+    def toggle_visibility(self):
+        self.visible = not self.visible
+
+    def invalidate(self):
+        """强制下一次更新时重绘底图"""
+        self.base_key = None
+
+    def world_to_minimap(self, x, y):
+        return (int((x - self.world_x) * self.scale), int((y - self.world_y) * self.scale))
+
+    def minimap_to_world(self, mx, my):
+        return (mx / self.scale + self.world_x, my / self.scale + self.world_y)
+
+    def contains(self, mouse_x, mouse_y):
+        return (self.visible and self.x <= mouse_x < self.x + self.size and
+                self.y <= mouse_y < self.y + self.size)
+
+    def jump_camera(self, mouse_x, mouse_y, camera):
+        """点击小地图：相机跳转到对应位置"""
+        camera.focus_on(*self.minimap_to_world(mouse_x - self.x, mouse_y - self.y))
+
+    def update(self, game_state, dt):
+        if not self.visible:
+            return
+
+        # 地形被摧毁或换关时才重绘底图
+        terrain_manager = game_state.terrain_manager
+        base_key = (terrain_manager, terrain_manager.version, game_state.stars)
+        if base_key != self.base_key:
+            self.base_key = base_key
+            self.bake_base(terrain_manager, game_state.stars)
+            self.unit_timer = self.unit_interval
+
+        # 单位点低频刷新
+        self.unit_timer += dt
+        if self.unit_timer >= self.unit_interval:
+            self.unit_timer = 0
+            self.draw_units(game_state.units)
+
+    def bake_base(self, terrain_manager, stars):
+        """烘焙地形和星空底图"""
+        base = self.base_layer
+        base.fill(self.BACKGROUND)
+        for star in stars:
+            mx, my = self.world_to_minimap(star['x'], star['y'])
+            if 0 <= mx < self.size and 0 <= my < self.size:
+                base.set_at((mx, my), star['color'])
+        for terrain in terrain_manager.terrain_objects:
+            center = self.world_to_minimap(terrain.x, terrain.y)
+            pygame.draw.circle(base, terrain.color, center, max(1, int(terrain.radius * self.scale)))
+
+    def draw_units(self, units):
+        """在底图上合成单位点"""
+
+        layer = self.layer
+        layer.blit(self.base_layer, (0, 0))
+        for unit in units:
+            mx, my = self.world_to_minimap(unit.x, unit.y)
+            color = COLOR_PLAYER if unit.team == 0 else COLOR_ENEMY
+            if unit.unit_type == UnitType.MOTHERSHIP:
+                layer.fill(color, (mx - 2, my - 2, 5, 5))
+            else:
+                layer.fill(color, (mx - 1, my - 1, 2, 2))
+            if unit.selected:
+                pygame.draw.rect(layer, COLOR_WHITE, (mx - 3, my - 3, 7, 7), 1)
+
+    def draw(self, screen, camera):
+        if not self.visible:
+            return
+
+        screen.blit(self.layer, (self.x, self.y))
+
+        # 视口框（裁剪到小地图内）
+        left, top = self.world_to_minimap(*camera.screen_to_world(0, 0))
+        right, bottom = self.world_to_minimap(*camera.screen_to_world(camera.width, camera.height))
+        old_clip = screen.get_clip()
+        screen.set_clip((self.x, self.y, self.size, self.size))
+        pygame.draw.rect(screen, COLOR_WHITE, (self.x + left, self.y + top, right - left, bottom - top), 1)
+        screen.set_clip(old_clip)
+
+        pygame.draw.rect(screen, COLOR_GRAY, (self.x, self.y, self.size, self.size), 1)
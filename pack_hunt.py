@@ -0,0 +1,81 @@
+import numpy as np
+
+class PackHuntPlanner:
+    """群体狩猎分配
+
+    groups: 目标 -> 猎手列表（列表顺序决定包围位置），hunters: 猎手 -> 目标。
+    分配跨tick保留，每次更新只处理变化的部分：
+    - 目标死亡的小组解散，猎手回到空闲池
+    - 猎手死亡或离队后从小组移除，小组人数不足时补充
+    - 按优先级从高到低为缺人的目标挑选最近的空闲单位（NumPy批量求距离，
+      argpartition取最近的k个）
+    """
+
+    def __init__(self):
+        self.groups = {}
+        self.hunters = {}
+
+    def clear(self):
+        self.groups.clear()
+        self.hunters.clear()
+
+    def target_of(self, unit):
+        """单位被分配的目标，没有时返回None"""
+        return self.hunters.get(unit)
+
+    def update(self, my_units, enemy_units, priority, required):
+        """增量更新分配
+
+        priority(enemy) 返回目标优先级，required(enemy) 返回需要的猎手数量
+        """
+        alive_units = set(my_units)
+        alive_enemies = set(enemy_units)
+
+        # 解散目标已死亡的小组，移除已离队的猎手
+        for target in [t for t in self.groups if t not in alive_enemies]:
+            for hunter in self.groups.pop(target):
+                self.hunters.pop(hunter, None)
+        for target, members in self.groups.items():
+            if any(h not in alive_units for h in members):
+                for hunter in members:
+                    if hunter not in alive_units:
+                        self.hunters.pop(hunter, None)
+                members[:] = [h for h in members if h in alive_units]
+        for target in [t for t, members in self.groups.items() if not members]:
+            del self.groups[target]
+
+        free_units = [u for u in my_units if u not in self.hunters]
+        if not free_units:
+            return
+
+        # 需要补充猎手的目标（按优先级从高到低）
+        needs = []
+        for enemy in enemy_units:
+            missing = required(enemy) - len(self.groups.get(enemy, ()))
+            if missing > 0:
+                needs.append((enemy, missing))
+        if not needs:
+            return
+        needs.sort(key=lambda item: priority(item[0]), reverse=True)
+
+        fx = np.array([u.x for u in free_units], dtype=np.float64)
+        fy = np.array([u.y for u in free_units], dtype=np.float64)
+        taken = np.zeros(len(free_units), dtype=bool)
+        remaining = len(free_units)
+
+        for enemy, missing in needs:
+            if remaining == 0:
+                break
+            count = min(missing, remaining)
+            distance = np.hypot(fx - enemy.x, fy - enemy.y)
+            distance[taken] = np.inf
+            nearest = np.argpartition(distance, count - 1)[:count]
+            nearest = nearest[np.argsort(distance[nearest], kind='stable')]
+            taken[nearest] = True
+            remaining -= count
+
+            members = self.groups.setdefault(enemy, [])
+            for i in nearest.tolist():
+                hunter = free_units[i]
+                members.append(hunter)
+                self.hunters[hunter] = enemy
@@ -0,0 +1,146 @@
+import numpy as np
+from config import PREDICTION_HISTORY
+
+class MotionTracker:
+    """单位运动历史与速度估计（所有AI共享）
+
+    每个tick由模拟记录一次所有存活单位的位置（关卡时间）。每个单位在环形缓冲里
+    占一个槽位，保存最近 history 个采样；速度为缓冲内最早与最新采样之间的平均速度，
+    每tick对所有槽位批量计算一次。不再出现的单位（死亡/移除）自动释放槽位。
+    """
+
+    def __init__(self, history=PREDICTION_HISTORY, capacity=64):
+        self.history = history
+        self.slots = {}  # 单位 -> 槽位
+        self.free_slots = list(range(capacity - 1, -1, -1))
+        self.positions = np.zeros((capacity, history, 2))
+        self.times = np.zeros((capacity, history))
+        self.heads = np.zeros(capacity, dtype=np.intp)   # 下一次写入的位置
+        self.counts = np.zeros(capacity, dtype=np.intp)  # 有效采样数
+        self.velocities = np.zeros((capacity, 2))
+
+    def clear(self):
+        capacity = len(self.heads)
+        self.slots.clear()
+        self.free_slots = list(range(capacity - 1, -1, -1))
+        self.counts[:] = 0
+        self.heads[:] = 0
+        self.velocities[:] = 0
+
+    def grow(self):
+        """槽位不足时容量翻倍"""
+        capacity = len(self.heads)
+        self.positions = np.concatenate([self.positions, np.zeros_like(self.positions)])
+        self.times = np.concatenate([self.times, np.zeros_like(self.times)])
+        self.heads = np.concatenate([self.heads, np.zeros_like(self.heads)])
+        self.counts = np.concatenate([self.counts, np.zeros_like(self.counts)])
+        self.velocities = np.concatenate([self.velocities, np.zeros_like(self.velocities)])
+        self.free_slots.extend(range(capacity * 2 - 1, capacity - 1, -1))
+
+    def record(self, units, level_time):
+        """记录本tick的位置并更新速度估计"""
+        slots = self.slots
+        seen = set(units)
+        for unit in [u for u in slots if u not in seen]:
+            slot = slots.pop(unit)
+            self.counts[slot] = 0
+            self.velocities[slot] = 0
+            self.free_slots.append(slot)
+
+        indices = []
+        coords = []
+        for unit in units:
+            slot = slots.get(unit)
+            if slot is None:
+                if not self.free_slots:
+                    self.grow()
+                slot = self.free_slots.pop()
+                slots[unit] = slot
+                self.heads[slot] = 0
+                self.counts[slot] = 0
+            indices.append(slot)
+            coords.append((unit.x, unit.y))
+        if not indices:
+            return
+
+        idx = np.array(indices, dtype=np.intp)
+        heads = self.heads[idx]
+        self.positions[idx, heads] = coords
+        self.times[idx, heads] = level_time
+        self.heads[idx] = (heads + 1) % self.history
+        counts = np.minimum(self.counts[idx] + 1, self.history)
+        self.counts[idx] = counts
+
+        newest = heads
+        oldest = (heads + 1 - counts) % self.history
+        span = self.times[idx, newest] - self.times[idx, oldest]
+        delta = self.positions[idx, newest] - self.positions[idx, oldest]
+        valid = span > 0
+        velocity = np.zeros((len(idx), 2))
+        velocity[valid] = delta[valid] / span[valid, None]
+        self.velocities[idx] = velocity
+
+    def velocity_of(self, unit):
+        """单位的速度估计（每秒），没有记录时为(0, 0)"""
+        slot = self.slots.get(unit)
+        if slot is None:
+            return (0.0, 0.0)
+        vx, vy = self.velocities[slot]
+        return (float(vx), float(vy))
+
+    def predict(self, unit, predict_time):
+        """按当前速度外推 predict_time 秒后的位置"""
+        vx, vy = self.velocity_of(unit)
+        return (unit.x + vx * predict_time, unit.y + vy * predict_time)
+
+    def velocities_of(self, units):
+        """一组单位的速度数组 (n, 2)"""
+        result = np.zeros((len(units), 2))
+        slots = self.slots
+        for i, unit in enumerate(units):
+            slot = slots.get(unit)
+            if slot is not None:
+                result[i] = self.velocities[slot]
+        return result
+
+    def intercept(self, shooters, targets, speeds):
+        """批量求拦截点
+
+        shooters/targets 为等长的单位序列，speeds 为拦截速度（弹道速度或自身速度，
+        标量或数组）。返回 (n, 2) 的提前量瞄准点：目标按当前速度匀速运动时，
+        以给定速度从射手位置出发能与目标相遇的最早位置；追不上时瞄准
+        按直线飞行时间外推的位置。
+        """
+        sx = np.array([u.x for u in shooters], dtype=np.float64)
+        sy = np.array([u.y for u in shooters], dtype=np.float64)
+        tx = np.array([u.x for u in targets], dtype=np.float64)
+        ty = np.array([u.y for u in targets], dtype=np.float64)
+        velocity = self.velocities_of(targets)
+        speeds = np.broadcast_to(np.asarray(speeds, dtype=np.float64), sx.shape)
+        t = intercept_times(tx - sx, ty - sy, velocity[:, 0], velocity[:, 1], speeds)
+        return np.stack([tx + velocity[:, 0] * t, ty + velocity[:, 1] * t], axis=1)
+
+def intercept_times(px, py, vx, vy, speed):
+    """相对位置P、目标速度V、拦截速度s：求 |P + V·t| = s·t 的最小正根（向量化）
+
+    无解时返回直线距离除以速度。
+    """
+    a = vx * vx + vy * vy - speed * speed
+    b = 2 * (px * vx + py * vy)
+    c = px * px + py * py
+    fallback = np.sqrt(c) / np.maximum(speed, 1e-6)
+
+    disc = b * b - 4 * a * c
+    with np.errstate(divide='ignore', invalid='ignore'):
+        root = np.sqrt(np.maximum(disc, 0))
+        t1 = (-b - root) / (2 * a)
+        t2 = (-b + root) / (2 * a)
+        linear = -c / b  # a == 0 时退化为一次方程
+    t1 = np.where(t1 > 0, t1, np.inf)
+    t2 = np.where(t2 > 0, t2, np.inf)
+    quadratic = np.minimum(t1, t2)
+    linear = np.where(linear > 0, linear, np.inf)
+
+    degenerate = np.abs(a) < 1e-9
+    t = np.where(degenerate, linear, np.where(disc >= 0, quadratic, np.inf))
+    return np.where(np.isfinite(t), t, fallback)
@@ -0,0 +1,59 @@
+from collections import deque
+from config import (QUALITY_TIERS, QUALITY_FRAME_BUDGET_MS, QUALITY_SAMPLE_FRAMES,
+                    QUALITY_DOWNGRADE_RATIO, QUALITY_UPGRADE_RATIO, QUALITY_HOLD_FRAMES)
+
+class QualityGovernor:
+    """根据实测帧时间自动调整画质档位
+
+    记录最近若干帧的耗时（不含帧率限制的等待），滚动平均超出预算时降一档，
+    明显低于预算时升一档。每次切档后清空样本并保持若干帧，避免来回跳档。
+    """
+
+    def __init__(self, tiers=QUALITY_TIERS, budget_ms=QUALITY_FRAME_BUDGET_MS,
+                 sample_frames=QUALITY_SAMPLE_FRAMES, hold_frames=QUALITY_HOLD_FRAMES):
+        self.tiers = tiers
+        self.budget_ms = budget_ms
+        self.hold_frames = hold_frames
+        self.samples = deque(maxlen=sample_frames)
+        self.total_ms = 0
+        self.hold = 0
+        self.tier_index = 0
+        self.enabled = True
+
+    @property
+    def tier(self):
+        """当前档位的设置"""
+        return self.tiers[self.tier_index]
+
+    def average_ms(self):
+        """滚动平均帧时间"""
+        return self.total_ms / len(self.samples) if self.samples else 0
+
+    def set_tier(self, index):
+        """切换档位并重新开始采样"""
+        self.tier_index = max(0, min(len(self.tiers) - 1, index))
+        self.samples.clear()
+        self.total_ms = 0
+        self.hold = self.hold_frames
+
+    def record(self, frame_ms):
+        """记录一帧的耗时，必要时切换档位"""
+        samples = self.samples
+        if len(samples) == samples.maxlen:
+            self.total_ms -= samples[0]
+        samples.append(frame_ms)
+        self.total_ms += frame_ms
+
+        if not self.enabled:
+            return
+        if self.hold > 0:
+            self.hold -= 1
+            return
+        if len(samples) < samples.maxlen:
+            return
+
+        average = self.total_ms / len(samples)
+        if average > self.budget_ms * QUALITY_DOWNGRADE_RATIO and self.tier_index < len(self.tiers) - 1:
+            self.set_tier(self.tier_index + 1)
+        elif average < self.budget_ms * QUALITY_UPGRADE_RATIO and self.tier_index > 0:
+            self.set_tier(self.tier_index - 1)
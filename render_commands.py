@@ -0,0 +1,239 @@
+import json
+import pygame
+from surface_pool import surface_pool
+
+# 绘制命令类型（按类型排序时也按这个顺序）
+CMD_BLIT = 0
+CMD_POLYGON = 1
+CMD_RECT = 2
+CMD_CIRCLE = 3
+CMD_LINE = 4
+CMD_TEXT = 5
+CMD_OVERLAY = 6
+
+CMD_NAMES = {
+    CMD_BLIT: "blit",
+    CMD_POLYGON: "polygon",
+    CMD_RECT: "rect",
+    CMD_CIRCLE: "circle",
+    CMD_LINE: "line",
+    CMD_TEXT: "text",
+    CMD_OVERLAY: "overlay",
+}
+
+class RenderBuffer:
+    """每帧的绘制命令缓冲
+
+    绘制代码不直接调用 pygame.draw/blit，而是向缓冲写入紧凑的命令元组，
+    由后端统一执行。接口与 SurfaceCanvas 相同，绘制代码不关心目标是哪一个。
+    """
+
+    def __init__(self, width=0, height=0):
+        self.commands = []
+        self.width = width
+        self.height = height
+
+    def begin(self, size):
+        """开始新的一帧"""
+        self.commands.clear()
+        self.width, self.height = size
+
+    def get_width(self):
+        return self.width
+
+    def get_height(self):
+        return self.height
+
+    def get_size(self):
+        return (self.width, self.height)
+
+    def circle(self, color, center, radius, width=0):
+        self.commands.append((CMD_CIRCLE, color, center, radius, width))
+
+    def line(self, color, start, end, width=1):
+        self.commands.append((CMD_LINE, color, start, end, width))
+
+    def rect(self, color, rect, width=0):
+        self.commands.append((CMD_RECT, color, rect, width))
+
+    def polygon(self, color, points, width=0):
+        self.commands.append((CMD_POLYGON, color, points, width))
+
+    def blit(self, surface, pos):
+        self.commands.append((CMD_BLIT, surface, pos))
+
+    def blits(self, pairs, doreturn=False):
+        append = self.commands.append
+        for surface, pos in pairs:
+            append((CMD_BLIT, surface, pos))
+
+    def text(self, font, text, color, pos):
+        self.commands.append((CMD_TEXT, font, text, color, pos))
+
+    def overlay(self, color, alpha):
+        """全屏半透明覆盖层"""
+        self.commands.append((CMD_OVERLAY, color, alpha))
+
+class SurfaceCanvas:
+    """直接绘制到表面的画布，接口与 RenderBuffer 相同"""
+
+    def __init__(self, surface):
+        self.surface = surface
+
+    def get_width(self):
+        return self.surface.get_width()
+
+    def get_height(self):
+        return self.surface.get_height()
+
+    def get_size(self):
+        return self.surface.get_size()
+
+    def circle(self, color, center, radius, width=0):
+        pygame.draw.circle(self.surface, color, center, radius, width)
+
+    def line(self, color, start, end, width=1):
+        pygame.draw.line(self.surface, color, start, end, width)
+
+    def rect(self, color, rect, width=0):
+        pygame.draw.rect(self.surface, color, rect, width)
+
+    def polygon(self, color, points, width=0):
+        pygame.draw.polygon(self.surface, color, points, width)
+
+    def blit(self, surface, pos):
+        self.surface.blit(surface, pos)
+
+    def blits(self, pairs, doreturn=False):
+        self.surface.blits(pairs, doreturn=False)
+
+    def text(self, font, text, color, pos):
+        self.surface.blit(font.render(text, True, color), pos)
+
+    def overlay(self, color, alpha):
+        self.surface.blit(surface_pool.get_overlay(self.surface.get_size(), color, alpha), (0, 0))
+
+class PygameRenderBackend:
+    """在pygame表面上执行绘制命令
+
+    cull: 跳过完全在屏幕外的命令
+    sort_by_type: 按命令类型稳定排序以合并同类绘制（会改变不同类型之间的遮挡顺序）
+    """
+
+    def __init__(self, cull=True, sort_by_type=False):
+        self.cull = cull
+        self.sort_by_type = sort_by_type
+        self.executed = 0
+        self.culled = 0
+        self.pending_blits = []
+
+    def execute(self, buffer, screen):
+        commands = buffer.commands
+        if self.sort_by_type:
+            commands = sorted(commands, key=lambda c: c[0])
+
+        width, height = screen.get_size()
+        pending_blits = self.pending_blits
+        executed = 0
+        culled = 0
+
+        for command in commands:
+            kind = command[0]
+
+            if kind == CMD_BLIT:
+                surface, pos = command[1], command[2]
+                if self.cull and (pos[0] >= width or pos[1] >= height or
+                                  pos[0] + surface.get_width() <= 0 or
+                                  pos[1] + surface.get_height() <= 0):
+                    culled += 1
+                    continue
+                # 连续的blit合并为一次 Surface.blits
+                pending_blits.append((surface, pos))
+                executed += 1
+                continue
+
+            if pending_blits:
+                screen.blits(pending_blits, doreturn=False)
+                pending_blits.clear()
+
+            if kind == CMD_CIRCLE:
+                _, color, center, radius, line_width = command
+                if self.cull and (center[0] + radius < 0 or center[1] + radius < 0 or
+                                  center[0] - radius > width or center[1] - radius > height):
+                    culled += 1
+                    continue
+                pygame.draw.circle(screen, color, center, radius, line_width)
+            elif kind == CMD_LINE:
+                _, color, start, end, line_width = command
+                if self.cull and ((start[0] < 0 and end[0] < 0) or (start[1] < 0 and end[1] < 0) or
+                                  (start[0] > width and end[0] > width) or
+                                  (start[1] > height and end[1] > height)):
+                    culled += 1
+                    continue
+                pygame.draw.line(screen, color, start, end, line_width)
+            elif kind == CMD_RECT:
+                _, color, rect, line_width = command
+                pygame.draw.rect(screen, color, rect, line_width)
+            elif kind == CMD_POLYGON:
+                _, color, points, line_width = command
+                pygame.draw.polygon(screen, color, points, line_width)
+            elif kind == CMD_TEXT:
+                _, font, text, color, pos = command
+                screen.blit(font.render(text, True, color), pos)
+            elif kind == CMD_OVERLAY:
+                _, color, alpha = command
+                screen.blit(surface_pool.get_overlay((width, height), color, alpha), (0, 0))
+            executed += 1
+
+        if pending_blits:
+            screen.blits(pending_blits, doreturn=False)
+            pending_blits.clear()
+
+        self.executed = executed
+        self.culled = culled
+
+class NullRenderBackend:
+    """无头模式后端：直接丢弃命令"""
+
+    def __init__(self):
+        self.executed = 0
+        self.culled = 0
+
+    def execute(self, buffer, screen):
+        self.culled = len(buffer.commands)
+
+class RecordingRenderBackend:
+    """记录每帧的绘制命令（JSON行），并可继续交给内部后端执行"""
+
+    def __init__(self, stream, inner=None):
+        self.stream = stream
+        self.inner = inner
+        self.frame = 0
+        self.executed = 0
+        self.culled = 0
+
+    def serialize(self, command):
+        """把命令转换为可写入JSON的列表（表面和字体只记录尺寸/文字）"""
+        kind = command[0]
+        if kind == CMD_BLIT:
+            return [CMD_NAMES[kind], list(command[1].get_size()), list(command[2])]
+        if kind == CMD_TEXT:
+            return [CMD_NAMES[kind], command[2], list(command[3]), list(command[4])]
+        fields = []
+        for value in command[1:]:
+            if isinstance(value, (tuple, list, pygame.Rect)):
+                value = [list(v) if isinstance(v, tuple) else v for v in value]
+            fields.append(value)
+        return [CMD_NAMES[kind]] + fields
+
+    def execute(self, buffer, screen):
+        record = {
+            "frame": self.frame,
+            "commands": [self.serialize(c) for c in buffer.commands],
+        }
+        self.stream.write(json.dumps(record) + "\n")
+        self.frame += 1
+        if self.inner:
+            self.inner.execute(buffer, screen)
+            self.executed = self.inner.executed
+            self.culled = self.inner.culled
@@ -0,0 +1,176 @@
+import os
+import json
+import hashlib
+from commands import decode_command
+from config import REPLAY_CHECKSUM_INTERVAL
+
+REPLAY_VERSION = 1
+
+def to_json(value):
+    """json.dumps 的 default：numpy 数组/标量转成列表/数值"""
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    raise TypeError(f"无法序列化: {type(value).__name__}")
+
+def from_json(value):
+    """把JSON读回的列表还原成元组（命令参数中的坐标、单位id列表）"""
+    if isinstance(value, list):
+        return tuple(from_json(v) for v in value)
+    return value
+
+def normalize_commands(commands):
+    """编码后的命令统一成JSON读回的形式，便于比较"""
+    return json.loads(json.dumps([command.encode() for command in commands], default=to_json))
+
+def state_checksum(game_state):
+    """模拟状态的校验和：关卡时间、投射物数量，以及每个单位的位置、血量、能量、SP和状态"""
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update(repr((game_state.level_time, len(game_state.projectiles))).encode())
+    for unit in game_state.units:
+        digest.update(repr((unit.id, unit.team, unit.state.value, unit.x, unit.y,
+                            unit.hp, unit.energy, unit.sp, unit.shield)).encode())
+    return digest.hexdigest()
+
+def scheduler_budgeted(controllers):
+    """是否有控制器按时间预算截断逐单位决策（此时AI决策与机器快慢有关）"""
+    return any(getattr(getattr(c, 'unit_scheduler', None), 'budget_ms', None) is not None
+               for c in controllers)
+
+class ReplayRecorder:
+    """回放录制
+
+    JSONL格式：第一行是头部（关卡文件、随机种子、时间步长、AI控制器等），
+    之后每个有内容的tick一行 {"t": tick, "c": 命令, "s": 校验和, "dt": 时间步长}，
+    没有命令、不需要校验和且时间步长等于头部 dt 的tick不写；最后一行是结束信息。
+
+    命令是 CommandQueue.flush() 实际应用的命令（玩家和所有AI控制器），
+    与随机种子一起即可重新模拟整局。随机种子必须在 GameState.reset() 和加载关卡之前设置。
+    """
+
+    def __init__(self, path, level_file, seed, dt=None, checksum_interval=REPLAY_CHECKSUM_INTERVAL):
+        self.path = path
+        self.level_file = level_file
+        self.seed = seed
+        self.dt = dt  # 固定时间步长，None表示每tick记录实际dt
+        self.checksum_interval = checksum_interval
+        self.file = None
+        self.tick = 0
+        self.commands = 0
+
+    def start(self, game_state, ai_workers=False):
+        """关卡加载完成后写入头部，并开始接收 GameState 的tick回调"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = open(self.path, 'w', encoding='utf-8')
+        controllers = game_state.ai_controllers
+        self.write({
+            "version": REPLAY_VERSION,
+            "level": self.level_file,
+            "seed": self.seed,
+            "dt": self.dt,
+            "checksum_interval": self.checksum_interval,
+            "ai_workers": ai_workers,
+            "budgeted": scheduler_budgeted(controllers),
+            "controllers": [[c.team, type(getattr(c, 'controller', c)).__name__] for c in controllers],
+            "initial_checksum": state_checksum(game_state),
+        })
+        game_state.replay = self
+
+    def write(self, record):
+        self.file.write(json.dumps(record, ensure_ascii=False, separators=(',', ':'), default=to_json) + "\n")
+
+    def on_tick(self, game_state, dt, applied):
+        """GameState.update 结束时调用，applied 为本tick应用的命令"""
+        self.tick += 1
+        record = {"t": self.tick}
+        if applied:
+            record["c"] = [command.encode() for command in applied]
+            self.commands += len(applied)
+        if self.tick % self.checksum_interval == 0:
+            record["s"] = state_checksum(game_state)
+        if dt != self.dt:
+            record["dt"] = dt
+        if len(record) > 1:
+            self.write(record)
+
+    def close(self, game_state, result=None):
+        """写入结束信息并关闭文件"""
+        if self.file is None:
+            return
+        self.write({"end": True, "ticks": self.tick, "result": result,
+                    "level_time": game_state.level_time, "checksum": state_checksum(game_state)})
+        self.file.close()
+        self.file = None
+        if game_state.replay is self:
+            game_state.replay = None
+
+def load_replay(path):
+    """读取回放文件，返回 (头部, {tick: 记录}, 结束信息)"""
+    ticks = {}
+    end = None
+    with open(path, 'r', encoding='utf-8') as f:
+        header = json.loads(f.readline())
+        if header.get("version") != REPLAY_VERSION:
+            raise ValueError(f"不支持的回放版本: {header.get('version')}")
+        for line in f:
+            record = json.loads(line)
+            if record.get("end"):
+                end = record
+            else:
+                ticks[record["t"]] = record
+    return header, ticks, end
+
+class ReplayVerifier:
+    """按回放重新模拟时逐tick比对
+
+    inject() 在tick开始前把录制的命令提交到命令队列：未由本次运行的AI控制器控制的阵营
+    （玩家输入），playback 模式下为全部命令。on_tick() 比对本tick实际应用的命令和
+    录制的命令，到校验间隔时比对状态校验和，记录第一次分歧。
+    """
+
+    def __init__(self, header, ticks, playback=False):
+        self.header = header
+        self.ticks = ticks
+        self.playback = playback
+        self.tick = 0
+        self.command_mismatches = 0
+        self.checksum_mismatches = 0
+        self.checksums_verified = 0
+        self.first_command_divergence = None   # (tick, 录制的命令, 重新模拟的命令)
+        self.first_checksum_divergence = None  # (tick, 录制的校验和, 重新模拟的校验和)
+
+    def inject(self, game_state):
+        """提交下一tick录制的命令"""
+        record = self.ticks.get(self.tick + 1)
+        if record is None or "c" not in record:
+            return
+        controlled = set() if self.playback else {ai.team for ai in game_state.ai_controllers}
+        by_id = {unit.id: unit for unit in game_state.units}
+        for row in record["c"]:
+            command = decode_command(from_json(row), by_id)
+            if command is not None and command.unit.team not in controlled:
+                game_state.commands.submit(command)
+
+    def next_dt(self, default):
+        record = self.ticks.get(self.tick + 1)
+        if record is not None and "dt" in record:
+            return record["dt"]
+        return self.header["dt"] if self.header["dt"] is not None else default
+
+    def on_tick(self, game_state, dt, applied):
+        self.tick += 1
+        record = self.ticks.get(self.tick, {})
+        expected = record.get("c", [])
+        actual = normalize_commands(applied)
+        if actual != expected:
+            self.command_mismatches += 1
+            if self.first_command_divergence is None:
+                self.first_command_divergence = (self.tick, expected, actual)
+        if "s" in record:
+            self.checksums_verified += 1
+            checksum = state_checksum(game_state)
+            if checksum != record["s"]:
+                self.checksum_mismatches += 1
+                if self.first_checksum_divergence is None:
+                    self.first_checksum_divergence = (self.tick, record["s"], checksum)
@@ -0,0 +1,144 @@
+import os
+import io
+import sys
+import json
+import time
+import argparse
+import contextlib
+
+# 无头模式使用SDL的dummy驱动，必须在导入pygame之前设置
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from config import FPS
+from level_manager import LevelManager
+from headless import HeadlessRunner
+from replay import load_replay, state_checksum, ReplayVerifier
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+def run_replay(path, playback=False, max_ticks=None):
+    """按回放重新模拟，返回报告（分歧信息和每tick耗时统计）"""
+    header, ticks, end = load_replay(path)
+    total_ticks = end["ticks"] if end else max(ticks, default=0)
+    if max_ticks is not None:
+        total_ticks = min(total_ticks, max_ticks)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        level_manager = LevelManager()
+    level_index = level_manager.find_level(header["level"])
+    if level_index is None:
+        raise ValueError(f"找不到关卡: {header['level']}")
+
+    dt = header["dt"] if header["dt"] is not None else 1 / FPS
+    with contextlib.redirect_stdout(io.StringIO()):
+        runner = HeadlessRunner(level_manager, level_index, dt, seed=header["seed"],
+                                ai_workers=header["ai_workers"])
+    game_state = runner.game_state
+    if playback:
+        game_state.clear_ai_controllers()
+    elif not header["budgeted"]:
+        for controller in game_state.ai_controllers:
+            if hasattr(controller, 'unit_scheduler'):
+                controller.unit_scheduler.budget_ms = None
+
+    verifier = ReplayVerifier(header, ticks, playback)
+    game_state.replay = verifier
+    initial_ok = state_checksum(game_state) == header["initial_checksum"]
+
+    # AI子进程模式下前 latency+1 个tick在等子进程启动和第一次回复，不计入耗时统计
+    latency = max((getattr(c, 'latency', 0) for c in game_state.ai_controllers), default=0)
+    warmup_ticks = latency + 1 if latency else 0
+
+    tick_times = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        while verifier.tick < total_ticks:
+            verifier.inject(game_state)
+            runner.dt = verifier.next_dt(dt)
+            start = time.perf_counter()
+            runner.step()
+            if verifier.tick > warmup_ticks:
+                tick_times.append((time.perf_counter() - start) * 1000)
+        runner.close()
+    game_state.replay = None
+
+    final_ok = None
+    if end and verifier.tick == end["ticks"]:
+        final_ok = state_checksum(game_state) == end["checksum"]
+
+    ordered = sorted(tick_times)
+    return {
+        "replay": path,
+        "level": header["level"],
+        "seed": header["seed"],
+        "mode": "playback" if playback else "verify",
+        "ticks": verifier.tick,
+        "initial_state_match": initial_ok,
+        "final_state_match": final_ok,
+        "checksums_verified": verifier.checksums_verified,
+        "checksum_mismatches": verifier.checksum_mismatches,
+        "command_mismatch_ticks": verifier.command_mismatches,
+        "first_command_divergence": verifier.first_command_divergence,
+        "first_checksum_divergence": verifier.first_checksum_divergence,
+        "result": runner.result,
+        "recorded_result": end["result"] if end else None,
+        "tick_ms": {
+            "mean": sum(tick_times) / max(1, len(tick_times)),
+            "p50": percentile(ordered, 0.5),
+            "p95": percentile(ordered, 0.95),
+            "max": ordered[-1] if ordered else 0.0,
+        },
+    }
+
+def format_report(report):
+    lines = [f"回放: {report['replay']} ({report['level']}, 种子 {report['seed']}, {report['mode']})",
+             f"tick: {report['ticks']}  校验和: {report['checksums_verified']} 次, "
+             f"不一致 {report['checksum_mismatches']} 次  命令不一致的tick: {report['command_mismatch_ticks']}"]
+    if not report["initial_state_match"]:
+        lines.append("初始状态不一致：关卡文件或加载流程已改变")
+    divergence = report["first_command_divergence"]
+    if divergence:
+        tick, expected, actual = divergence
+        lines.append(f"命令首次分歧: tick {tick}")
+        lines.append(f"  录制: {expected[:5]}{' ...' if len(expected) > 5 else ''}")
+        lines.append(f"  重放: {actual[:5]}{' ...' if len(actual) > 5 else ''}")
+    divergence = report["first_checksum_divergence"]
+    if divergence:
+        lines.append(f"状态首次分歧: tick {divergence[0]} (录制 {divergence[1]}, 重放 {divergence[2]})")
+    if report["final_state_match"] is not None:
+        lines.append(f"结束状态: {'一致' if report['final_state_match'] else '不一致'}  "
+                     f"结果: {report['result'] or '未分胜负'} (录制: {report['recorded_result'] or '未分胜负'})")
+    timing = report["tick_ms"]
+    lines.append(f"每tick耗时: 平均 {timing['mean']:.2f}ms  p50 {timing['p50']:.2f}ms  "
+                 f"p95 {timing['p95']:.2f}ms  最大 {timing['max']:.2f}ms")
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="无头模式重新模拟回放，校验状态并统计每tick耗时")
+    parser.add_argument("replays", nargs="+", help="回放文件（JSONL）")
+    parser.add_argument("--playback", action="store_true",
+                        help="不运行AI，直接应用录制的全部命令（只校验模拟本身）")
+    parser.add_argument("--ticks", type=int, help="最多重新模拟的tick数")
+    parser.add_argument("--output", help="报告JSON路径")
+    args = parser.parse_args()
+
+    reports = []
+    for path in args.replays:
+        report = run_replay(path, args.playback, args.ticks)
+        reports.append(report)
+        print(format_report(report))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(reports, f, ensure_ascii=False, indent=2)
+        print(f"报告已写入 {args.output}")
+    diverged = any(r["first_command_divergence"] or r["first_checksum_divergence"] or
+                   not r["initial_state_match"] for r in reports)
+    return 1 if diverged else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,6 +2,7 @@ import time
 import json
 import os
 from config import *
+from units import UnitType, UnitState
 
 class ScoreSystem:
     def __init__(self):
@@ -25,7 +26,6 @@ class ScoreSystem:
         self.level_end_time = time.time()
         
         # 统计存活单位
-        from units import UnitType, UnitState
         self.surviving_player_units = 0
         self.mothership_survived = False
         
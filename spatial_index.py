@@ -0,0 +1,65 @@
+from config import SPATIAL_CELL_SIZE
+
+class SpatialGrid:
+    """均匀网格空间索引
+
+    构建时把单位按坐标放入网格，之后只读。半径查询只检查覆盖到的格子。
+    """
+
+    def __init__(self, units, cell_size=SPATIAL_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}
+        cells = self.cells
+        for unit in units:
+            key = (int(unit.x // cell_size), int(unit.y // cell_size))
+            cell = cells.get(key)
+            if cell is None:
+                cells[key] = [unit]
+            else:
+                cell.append(unit)
+
+    def cells_in_radius(self, x, y, radius):
+        """获取圆形范围覆盖到的格子"""
+        size = self.cell_size
+        min_cx = int((x - radius) // size)
+        max_cx = int((x + radius) // size)
+        min_cy = int((y - radius) // size)
+        max_cy = int((y + radius) // size)
+        cells = self.cells
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                cell = cells.get((cx, cy))
+                if cell:
+                    yield cell
+
+    def query_radius(self, x, y, radius, team=None, exclude_team=None):
+        """获取半径内的单位，可按阵营过滤"""
+        result = []
+        radius_sq = radius * radius
+        for cell in self.cells_in_radius(x, y, radius):
+            for unit in cell:
+                if team is not None and unit.team != team:
+                    continue
+                if exclude_team is not None and unit.team == exclude_team:
+                    continue
+                dx = unit.x - x
+                dy = unit.y - y
+                if dx * dx + dy * dy <= radius_sq:
+                    result.append(unit)
+        return result
+
+    def count_radius(self, x, y, radius, team=None, exclude_team=None):
+        """统计半径内的单位数量"""
+        count = 0
+        radius_sq = radius * radius
+        for cell in self.cells_in_radius(x, y, radius):
+            for unit in cell:
+                if team is not None and unit.team != team:
+                    continue
+                if exclude_team is not None and unit.team == exclude_team:
+                    continue
+                dx = unit.x - x
+                dy = unit.y - y
+                if dx * dx + dy * dy <= radius_sq:
+                    count += 1
+        return count
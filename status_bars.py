@@ -0,0 +1,82 @@
+import pygame
+
+class StatusBarRenderer:
+    """单位状态条渲染器
+
+    血条/能量条/SP条按 (尺寸, 颜色, 填充像素) 预渲染成小条带，护盾、禁用、
+    选中圆环按 (颜色, 半径, 线宽) 预渲染，绘制时把一个单位的全部片段
+    收集起来用一次 Surface.blits 提交，像素结果与逐个 draw.rect/circle 一致。
+    """
+
+    MAX_BAR_KEYS = 64    # 条带图集最多缓存的 (尺寸, 颜色) 组合，缩放级别变化时会增长
+    MAX_RING_KEYS = 128  # 圆环图集最多缓存的组合
+    RING_KEY_COLOR = (0, 0, 0)  # 圆环表面的透明色（圆环颜色都不是纯黑）
+
+    def __init__(self):
+        self.bar_atlas = {}   # (宽, 高, 背景色, 填充色) -> 以填充宽度为下标的条带列表
+        self.ring_atlas = {}  # (颜色, 半径, 线宽) -> (表面, 偏移)
+
+    def clear(self):
+        """清空图集"""
+        self.bar_atlas.clear()
+        self.ring_atlas.clear()
+
+    def get_bar(self, width, height, bg_color, fill_color, fill_width):
+        """获取指定填充宽度的条带表面"""
+        key = (width, height, bg_color, fill_color)
+        strips = self.bar_atlas.get(key)
+        if strips is None:
+            if len(self.bar_atlas) >= self.MAX_BAR_KEYS:
+                self.bar_atlas.clear()
+            strips = [None] * (width + 1)
+            self.bar_atlas[key] = strips
+
+        fill_width = max(0, min(width, fill_width))
+        strip = strips[fill_width]
+        if strip is None:
+            strip = pygame.Surface((width, height))
+            strip.fill(bg_color)
+            if fill_width > 0:
+                strip.fill(fill_color, (0, 0, fill_width, height))
+            strips[fill_width] = strip
+        return strip
+
+    def get_ring(self, color, radius, width):
+        """获取圆环表面和相对圆心的偏移"""
+        key = (color, radius, width)
+        ring = self.ring_atlas.get(key)
+        if ring is None:
+            if len(self.ring_atlas) >= self.MAX_RING_KEYS:
+                self.ring_atlas.clear()
+            # 四周留出余量，圆在表面内的栅格化结果与直接画在屏幕上相同
+            margin = radius + width + 2
+            surface = pygame.Surface((margin * 2, margin * 2))
+            surface.fill(self.RING_KEY_COLOR)
+            surface.set_colorkey(self.RING_KEY_COLOR)
+            pygame.draw.circle(surface, color, (margin, margin), radius, width)
+            ring = (surface, margin)
+            self.ring_atlas[key] = ring
+        return ring
+
+    def add_bar(self, fragments, x, y, width, height, ratio, bg_color, fill_color):
+        """向片段列表添加一个属性条"""
+        if width <= 0 or height <= 0:
+            return
+        strip = self.get_bar(width, height, bg_color, fill_color, int(width * ratio))
+        fragments.append((strip, (x, y)))
+
+    def add_ring(self, fragments, color, center, radius, width):
+        """向片段列表添加一个圆环"""
+        if radius <= 0:
+            return
+        surface, margin = self.get_ring(color, radius, width)
+        fragments.append((surface, (center[0] - margin, center[1] - margin)))
+
+    def flush(self, screen, fragments):
+        """一次性提交所有片段"""
+        if fragments:
+            screen.blits(fragments, doreturn=False)
+            fragments.clear()
+
+# 所有单位共享的渲染器
+status_bar_renderer = StatusBarRenderer()
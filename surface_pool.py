@@ -0,0 +1,48 @@
+import pygame
+from collections import OrderedDict
+
+class SurfacePool:
+    """临时表面池
+
+    按 (宽, 高, 标志) 复用覆盖层和临时表面，避免每帧分配屏幕大小的缓冲。
+    借出的表面在下一次以相同键借用前有效，使用前需要自行填充。
+    """
+
+    def __init__(self, max_surfaces=32):
+        self.max_surfaces = max_surfaces
+        self.surfaces = OrderedDict()
+        self.allocations = 0  # 实际分配次数（用于观察是否稳定复用）
+
+    def get(self, size, flags=0):
+        """借用指定尺寸和标志的表面"""
+        key = (int(size[0]), int(size[1]), flags)
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = pygame.Surface(key[:2], flags)
+            self.allocations += 1
+            self.surfaces[key] = surface
+            if len(self.surfaces) > self.max_surfaces:
+                self.surfaces.popitem(last=False)
+        else:
+            self.surfaces.move_to_end(key)
+        return surface
+
+    def get_overlay(self, size, color, alpha):
+        """借用一个填充好颜色、设置了整体透明度的覆盖层"""
+        overlay = self.get(size)
+        overlay.set_alpha(alpha)
+        overlay.fill(color)
+        return overlay
+
+    def get_clear(self, size):
+        """借用一个清空为全透明的逐像素透明表面"""
+        surface = self.get(size, pygame.SRCALPHA)
+        surface.fill((0, 0, 0, 0))
+        return surface
+
+    def clear(self):
+        """释放所有表面"""
+        self.surfaces.clear()
+
+# 全局共享的表面池
+surface_pool = SurfacePool()
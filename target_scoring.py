@@ -0,0 +1,209 @@
+import math
+import numpy as np
+from units import UnitType
+
+class EnemyArrays:
+    """一组敌人的坐标、血量比例、攻击力等数组，评分时共用"""
+
+    def __init__(self, enemies):
+        self.enemies = enemies
+        self.index = {enemy: i for i, enemy in enumerate(enemies)}
+        self.x = np.array([e.x for e in enemies], dtype=np.float64)
+        self.y = np.array([e.y for e in enemies], dtype=np.float64)
+        self.hp = np.array([e.hp for e in enemies], dtype=np.float64)
+        self.max_hp = np.array([e.max_hp for e in enemies], dtype=np.float64)
+        self.hp_ratio = self.hp / self.max_hp
+        self.attack = np.array([e.attack_damage for e in enemies], dtype=np.float64)
+        self.speed = np.array([e.speed for e in enemies], dtype=np.float64)
+
+    def type_weights(self, weights):
+        """按单位类型查表得到加成数组"""
+        return np.array([weights.get(e.unit_type, 0) for e in self.enemies], dtype=np.float64)
+
+class TargetProfile:
+    """目标评分权重
+
+    评分 = 敌人项（每个敌人算一次） + 距离项（按单位×敌人的距离矩阵计算），
+    超出 attack_range * range_factor 的目标不可选。
+    """
+
+    range_factor = None  # None表示不限距离
+
+    def enemy_scores(self, ai, arrays):
+        return np.zeros(len(arrays.enemies))
+
+    def distance_scores(self, distance, ranges):
+        return 0
+
+    def score(self, enemy_terms, distance, ranges):
+        return enemy_terms[None, :] + self.distance_scores(distance, ranges)
+
+def hp_bonus(hp_ratio, low, low_bonus, mid, mid_bonus):
+    """残血加成：低于low加low_bonus，低于mid加mid_bonus"""
+    return np.where(hp_ratio < low, low_bonus, np.where(hp_ratio < mid, mid_bonus, 0))
+
+class BestTargetProfile(TargetProfile):
+    """ImprovedAIController.select_best_target 的权重"""
+
+    range_factor = 2
+    TYPE_WEIGHTS = {UnitType.MOTHERSHIP: 200, UnitType.REPAIR: 150, UnitType.BOMBER: 120}
+
+    def enemy_scores(self, ai, arrays):
+        threat = np.array([ai.assess_threat(e) for e in arrays.enemies], dtype=np.float64)
+        return (threat * 0.4 + hp_bonus(arrays.hp_ratio, 0.3, 100, 0.6, 50)
+                + arrays.type_weights(self.TYPE_WEIGHTS))
+
+    def distance_scores(self, distance, ranges):
+        return (np.maximum(0, 500 - distance) / 500 * 100 * 0.3
+                + np.where(distance <= ranges[:, None], 100, 0))
+
+class EliteTargetProfile(TargetProfile):
+    """EliteAI.calculate_target_score 的权重（超出3倍攻击范围得0分）"""
+
+    TYPE_WEIGHTS = {UnitType.MOTHERSHIP: 200, UnitType.REPAIR: 150, UnitType.BOMBER: 100}
+
+    def __init__(self, range_factor=None):
+        self.range_factor = range_factor
+
+    def enemy_scores(self, ai, arrays):
+        return (hp_bonus(arrays.hp_ratio, 0.3, 100, 0.6, 50) + arrays.attack * 2
+                + arrays.type_weights(self.TYPE_WEIGHTS))
+
+    def score(self, enemy_terms, distance, ranges):
+        score = enemy_terms[None, :] + np.maximum(0, 200 - distance) / 200 * 50
+        return np.where(distance > ranges[:, None] * 3, 0, score)
+
+class TerminatorTargetProfile(TargetProfile):
+    """TerminatorAI.select_terminator_target 的权重"""
+
+    def enemy_scores(self, ai, arrays):
+        scores = np.array([10000 if e.unit_type == UnitType.MOTHERSHIP else
+                           5000 if e.unit_type == UnitType.REPAIR else
+                           e.attack_damage * 10 for e in arrays.enemies], dtype=np.float64)
+        return scores + np.where(arrays.hp_ratio < 0.5, 1000, 0)
+
+    def distance_scores(self, distance, ranges):
+        return np.maximum(0, 2000 - distance)
+
+class DemonTargetProfile(TargetProfile):
+    """DemonAI.select_demon_target 的权重"""
+
+    TYPE_WEIGHTS = {UnitType.MOTHERSHIP: 1000, UnitType.REPAIR: 600, UnitType.HEAVY: 400}
+    ISOLATION_BONUS = {0: 500, 1: 200}
+
+    def enemy_scores(self, ai, arrays):
+        extra = []
+        for enemy in arrays.enemies:
+            bonus = 0
+            # 能量状态 - 攻击能量低的目标
+            if enemy.max_energy > 0 and enemy.energy / enemy.max_energy < 0.3:
+                bonus += 300
+            # 孤立目标加成
+            bonus += self.ISOLATION_BONUS.get(ai.enemy_neighbours.get(enemy, 0), 0)
+            # 静止或缓慢移动的目标
+            if math.sqrt(enemy.vx ** 2 + enemy.vy ** 2) < 10:
+                bonus += 200
+            extra.append(bonus)
+        return (arrays.attack * 20 + arrays.hp * 5
+                + hp_bonus(arrays.hp_ratio, 0.3, 800, 0.6, 400)
+                + arrays.type_weights(self.TYPE_WEIGHTS)
+                + np.array(extra, dtype=np.float64))
+
+    def distance_scores(self, distance, ranges):
+        # 恶魔喜欢近距离猎杀
+        return np.where(distance < 200, 500,
+                        np.where(distance < 400, 300, np.maximum(0, 1000 - distance)))
+
+class DogfightTargetProfile(TargetProfile):
+    """DogfightAI.select_dogfight_target 的权重"""
+
+    def enemy_scores(self, ai, arrays):
+        return (1000 + np.where(arrays.hp_ratio < 0.4, 300, 0)
+                + arrays.attack * 5 + arrays.speed * 2)
+
+    def distance_scores(self, distance, ranges):
+        return np.maximum(0, 500 - distance)
+
+class TargetScorer:
+    """批量目标评分
+
+    敌人项按敌人列表缓存（列表对象不变就不重算，世界快照每tick重建元组），
+    prepare() 为一批单位一次性算出单位×敌人评分矩阵并按行取argmax；
+    之后 best()/scores() 对批内单位直接查表，批外单位单独算一行。
+    """
+
+    def __init__(self, ai, profile):
+        self.ai = ai
+        self.profile = profile
+        self.arrays = None
+        self.enemy_terms = None
+        self.batch_enemies = None
+        self.batch_rows = {}
+        self.batch_scores = None
+        self.batch_choices = None
+
+    def get_arrays(self, enemy_units):
+        arrays = self.arrays
+        if arrays is None or arrays.enemies is not enemy_units:
+            arrays = EnemyArrays(enemy_units)
+            self.arrays = arrays
+            self.enemy_terms = self.profile.enemy_scores(self.ai, arrays)
+        return arrays
+
+    def score_matrix(self, units, enemy_units, cache=True):
+        """单位×敌人的评分矩阵，不可选的目标为-inf
+
+        cache=False 时临时计算敌人项，不替换缓存（给列表外的个别目标评分）。
+        """
+        if cache:
+            arrays = self.get_arrays(enemy_units)
+            enemy_terms = self.enemy_terms
+        else:
+            arrays = EnemyArrays(enemy_units)
+            enemy_terms = self.profile.enemy_scores(self.ai, arrays)
+        ux = np.array([u.x for u in units], dtype=np.float64)
+        uy = np.array([u.y for u in units], dtype=np.float64)
+        ranges = np.array([u.attack_range for u in units], dtype=np.float64)
+        distance = np.hypot(ux[:, None] - arrays.x[None, :], uy[:, None] - arrays.y[None, :])
+        scores = self.profile.score(enemy_terms, distance, ranges)
+        scores = np.broadcast_to(scores, distance.shape).astype(np.float64)
+        if self.profile.range_factor is not None:
+            scores[distance > ranges[:, None] * self.profile.range_factor] = -np.inf
+        return scores
+
+    def prepare(self, units, enemy_units):
+        """为一批单位计算评分矩阵并选出各自的最佳目标"""
+        self.batch_enemies = enemy_units
+        self.batch_rows = {unit: i for i, unit in enumerate(units)}
+        if not units or not enemy_units:
+            self.batch_scores = None
+            self.batch_choices = None
+            return
+        self.batch_scores = self.score_matrix(units, enemy_units)
+        self.batch_choices = self.batch_scores.argmax(axis=1)
+
+    def scores(self, unit, enemy_units):
+        """单位对每个敌人的评分"""
+        row = self.batch_rows.get(unit)
+        if row is not None and enemy_units is self.batch_enemies and self.batch_scores is not None:
+            return self.batch_scores[row]
+        return self.score_matrix((unit,), enemy_units)[0]
+
+    def index_of(self, enemy, enemy_units):
+        """敌人在列表中的下标，不在列表中时返回None"""
+        return self.get_arrays(enemy_units).index.get(enemy)
+
+    def best(self, unit, enemy_units):
+        """最佳目标，没有可选目标时返回None"""
+        if not enemy_units:
+            return None
+        row = self.batch_rows.get(unit)
+        if row is not None and enemy_units is self.batch_enemies and self.batch_choices is not None:
+            choice = self.batch_choices[row]
+            scores = self.batch_scores[row]
+        else:
+            scores = self.score_matrix((unit,), enemy_units)[0]
+            choice = scores.argmax()
+        if scores[choice] == -np.inf:
+            return None
+        return enemy_units[choice]
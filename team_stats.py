@@ -0,0 +1,130 @@
+SKILL_READY_RATIO = 0.8  # SP达到该比例视为技能就绪
+
+class TeamStats:
+    """单个阵营的实力汇总（增量维护）
+
+    按 (单位类型, 技能是否就绪) 分组累计单位数、血量、攻击力，以及按能量比例加权的
+    血量和攻击力。单位的 hp/energy/sp/attack_damage 变化时只把单位标记为脏，
+    读取汇总时才重算这些单位的贡献，策略判断的读取与单位总数无关。
+    """
+
+    def __init__(self, team):
+        self.team = team
+        self.contributions = {}  # 单位 -> (分组, 贡献)
+        self.groups = {}  # 分组 -> [数量, 血量, 攻击力, 血量×能量比例, 攻击力×能量比例]
+        self.dirty = set()
+
+    def __len__(self):
+        return len(self.contributions)
+
+    @staticmethod
+    def contribution_of(unit):
+        energy_ratio = unit.energy / unit.max_energy if unit.max_energy > 0 else 1
+        skill_ready = unit.max_sp > 0 and unit.sp >= unit.max_sp * SKILL_READY_RATIO
+        hp, attack = unit.hp, unit.attack_damage
+        return (unit.unit_type, skill_ready), (1, hp, attack, hp * energy_ratio, attack * energy_ratio)
+
+    def add_contribution(self, key, values, sign):
+        group = self.groups.get(key)
+        if group is None:
+            group = self.groups[key] = [0, 0, 0, 0, 0]
+        for i, value in enumerate(values):
+            group[i] += sign * value
+        if group[0] == 0:
+            # 分组清空时归零，避免浮点误差累积
+            del self.groups[key]
+
+    def add(self, unit):
+        key, values = self.contribution_of(unit)
+        self.contributions[unit] = (key, values)
+        self.add_contribution(key, values, 1)
+
+    def remove(self, unit):
+        entry = self.contributions.pop(unit, None)
+        if entry is not None:
+            self.add_contribution(entry[0], entry[1], -1)
+        self.dirty.discard(unit)
+
+    def refresh(self):
+        """重算脏单位的贡献"""
+        for unit in self.dirty:
+            old_key, old_values = self.contributions[unit]
+            key, values = self.contribution_of(unit)
+            if key == old_key and values == old_values:
+                continue
+            self.add_contribution(old_key, old_values, -1)
+            self.contributions[unit] = (key, values)
+            self.add_contribution(key, values, 1)
+        self.dirty.clear()
+
+    def totals(self):
+        """(单位数, 血量总和, 攻击力总和)"""
+        if self.dirty:
+            self.refresh()
+        count = hp = attack = 0
+        for group in self.groups.values():
+            count += group[0]
+            hp += group[1]
+            attack += group[2]
+        return count, hp, attack
+
+    def weighted_strength(self, attack_weight, energy_base, type_weights, skill_bonus=1.0):
+        """按分组求 Σ (hp + attack_weight·attack) × (energy_base + (1-energy_base)·能量比例) × 类型权重
+
+        type_weights 为 {单位类型: 权重}（缺省为1），技能就绪的单位再乘 skill_bonus。
+        """
+        if self.dirty:
+            self.refresh()
+        energy_weight = 1 - energy_base
+        strength = 0
+        for (unit_type, skill_ready), group in self.groups.items():
+            base = group[1] + attack_weight * group[2]
+            weighted = group[3] + attack_weight * group[4]
+            value = energy_base * base + energy_weight * weighted
+            value *= type_weights.get(unit_type, 1)
+            if skill_ready:
+                value *= skill_bonus
+            strength += value
+        return strength
+
+class ForceStats:
+    """所有阵营的实力汇总，由GameState在单位加入/移除时维护"""
+
+    def __init__(self):
+        self.teams = {}  # 阵营 -> TeamStats
+
+    def team(self, team):
+        stats = self.teams.get(team)
+        if stats is None:
+            stats = self.teams[team] = TeamStats(team)
+        return stats
+
+    def add(self, unit):
+        stats = self.team(unit.team)
+        stats.add(unit)
+        unit.team_stats = stats
+
+    def remove(self, unit):
+        stats = self.teams.get(unit.team)
+        if stats is not None:
+            stats.remove(unit)
+        unit.team_stats = None
+
+    def rebuild(self, units):
+        """按单位列表重建（单位属性不跟踪变化时使用，如AI子进程中的单位镜像）"""
+        self.clear()
+        for unit in units:
+            self.team(unit.team).add(unit)
+
+    def clear(self):
+        for stats in self.teams.values():
+            for unit in stats.contributions:
+                if getattr(unit, 'team_stats', None) is stats:
+                    unit.team_stats = None
+        self.teams.clear()
+
+    def compare(self, team, measure):
+        """(己方实力, 所有敌方实力之和)，measure 为作用于 TeamStats 的计算函数"""
+        mine = measure(self.team(team))
+        enemy = sum(measure(stats) for other, stats in self.teams.items() if other != team)
+        return mine, enemy
@@ -61,17 +61,17 @@ class TerrainObject:
                     px = screen_x + math.cos(angle) * radius
                     py = screen_y + math.sin(angle) * radius
                     points.append((px, py))
-                pygame.draw.polygon(screen, color, points)
-                pygame.draw.polygon(screen, COLOR_WHITE, points, 2)
+                screen.polygon(color, points)
+                screen.polygon(COLOR_WHITE, points, 2)
             elif self.terrain_type == TerrainType.BARRIER:
                 # 能量屏障 - 方形
                 rect = pygame.Rect(screen_x - radius, screen_y - radius, radius * 2, radius * 2)
-                pygame.draw.rect(screen, color, rect)
-                pygame.draw.rect(screen, COLOR_CYAN, rect, 2)
+                screen.rect(color, rect)
+                screen.rect(COLOR_CYAN, rect, 2)
             else:
                 # 小行星和碎片 - 圆形
-                pygame.draw.circle(screen, color, (screen_x, screen_y), radius)
-                pygame.draw.circle(screen, COLOR_WHITE, (screen_x, screen_y), radius, 1)
+                screen.circle(color, (screen_x, screen_y), radius)
+                screen.circle(COLOR_WHITE, (screen_x, screen_y), radius, 1)
                 
             # 绘制血量条（如果是可破坏的且受损）
             if self.destructible and self.hp < self.max_hp:
@@ -81,17 +81,19 @@ class TerrainObject:
                 bar_y = screen_y - radius - 10
                 
                 hp_ratio = self.hp / self.max_hp
-                pygame.draw.rect(screen, COLOR_ENEMY, (bar_x, bar_y, bar_width, bar_height))
-                pygame.draw.rect(screen, COLOR_PLAYER, (bar_x, bar_y, int(bar_width * hp_ratio), bar_height))
+                screen.rect(COLOR_ENEMY, (bar_x, bar_y, bar_width, bar_height))
+                screen.rect(COLOR_PLAYER, (bar_x, bar_y, int(bar_width * hp_ratio), bar_height))
 
 class TerrainManager:
     def __init__(self):
         self.terrain_objects = []
+        self.version = 0  # 地形变化（生成/摧毁）时递增，供缓存判断是否需要重绘
         self.generate_terrain()
         
     def generate_terrain(self):
         """生成随机地形"""
         self.terrain_objects = []
+        self.version += 1
         
         # 生成小行星带
         for _ in range(12):
@@ -184,6 +186,7 @@ class TerrainManager:
                 if terrain.take_damage(damage):
                     destroyed.append(terrain)
                     self.terrain_objects.remove(terrain)
+                    self.version += 1
         return destroyed
         
     def draw(self, screen, camera):
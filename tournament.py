@@ -0,0 +1,212 @@
+import os
+import io
+import sys
+import json
+import time
+import argparse
+import contextlib
+import multiprocessing
+
+# 无头模式使用SDL的dummy驱动，必须在导入pygame之前设置
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from config import FPS
+from ai import AIController
+from level_manager import LevelManager
+from ai_registry import ai_types as registered_ai_types
+from headless import HeadlessRunner
+
+class TimedAIController(AIController):
+    """统计被包装AI控制器每次更新占用的CPU时间"""
+
+    def __init__(self, controller):
+        super().__init__(controller.team)
+        self.controller = controller
+        self.cpu_time = 0.0
+        self.ticks = 0
+
+    def update(self, units, game_state, dt):
+        start = time.thread_time()
+        self.controller.update(units, game_state, dt)
+        self.cpu_time += time.thread_time() - start
+        self.ticks += 1
+
+    def close(self):
+        self.controller.close()
+
+    def cpu_ms_per_tick(self):
+        return self.cpu_time / max(1, self.ticks) * 1000
+
+# 每个进程加载一次关卡列表
+process_level_manager = None
+
+def init_worker():
+    global process_level_manager
+    with contextlib.redirect_stdout(io.StringIO()):
+        process_level_manager = LevelManager()
+
+def run_match(match):
+    """运行一局：AI a 控制玩家方（阵营0），AI b 控制敌方（阵营1）"""
+    level_file, ai_a, ai_b, seed, frames, dt, unbudgeted = match
+    if process_level_manager is None:
+        init_worker()
+    level_index = process_level_manager.find_level(level_file)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        runner = HeadlessRunner(process_level_manager, level_index, dt, seed=seed)
+        game_state = runner.game_state
+        game_state.clear_ai_controllers()
+        controllers = []
+        for team, ai_type in ((0, ai_a), (1, ai_b)):
+            controller = process_level_manager.get_ai_controller(ai_type, team, process_level_manager.current_level_data)
+            if unbudgeted and hasattr(controller, 'unit_scheduler'):
+                controller.unit_scheduler.budget_ms = None
+            controllers.append(TimedAIController(controller))
+        game_state.ai_controllers.extend(controllers)
+        runner.run(frames)
+        runner.close()
+
+    winner_team = {"victory": 0, "defeat": 1}.get(runner.result)
+    return {
+        "level": level_file,
+        "ai_a": ai_a,
+        "ai_b": ai_b,
+        "seed": seed,
+        "winner_team": winner_team,  # None表示到达帧数上限仍未分胜负
+        "frames": runner.frame,
+        "level_time": game_state.level_time,
+        "survivors": [len([u for u in game_state.units if u.team == team]) for team in (0, 1)],
+        "cpu_ms_per_tick": [c.cpu_ms_per_tick() for c in controllers],
+    }
+
+def summarize(results):
+    """按AI类型汇总：胜率、胜局平均用时、平均存活单位、每tick平均CPU时间"""
+    stats = {}
+    for match in results:
+        for team, ai_type in enumerate((match["ai_a"], match["ai_b"])):
+            entry = stats.setdefault(ai_type, {
+                "games": 0, "wins": 0, "losses": 0, "draws": 0,
+                "win_time": 0.0, "survivors": 0, "cpu_ms": 0.0,
+            })
+            entry["games"] += 1
+            entry["survivors"] += match["survivors"][team]
+            entry["cpu_ms"] += match["cpu_ms_per_tick"][team]
+            if match["winner_team"] is None:
+                entry["draws"] += 1
+            elif match["winner_team"] == team:
+                entry["wins"] += 1
+                entry["win_time"] += match["level_time"]
+            else:
+                entry["losses"] += 1
+
+    summary = {}
+    for ai_type, entry in stats.items():
+        games = entry["games"]
+        summary[ai_type] = {
+            "games": games,
+            "wins": entry["wins"],
+            "losses": entry["losses"],
+            "draws": entry["draws"],
+            "win_rate": entry["wins"] / games,
+            "avg_time_to_victory": entry["win_time"] / entry["wins"] if entry["wins"] else None,
+            "avg_survivors": entry["survivors"] / games,
+            "avg_cpu_ms_per_tick": entry["cpu_ms"] / games,
+        }
+    return summary
+
+def pair_matrix(results):
+    """AI a 对 AI b 的胜率矩阵（a 的胜局 / 对局数，a、b 各自作为阵营0和阵营1都计入）"""
+    pairs = {}
+    for match in results:
+        for team, (ai_type, opponent) in enumerate(((match["ai_a"], match["ai_b"]),
+                                                    (match["ai_b"], match["ai_a"]))):
+            games, wins = pairs.get((ai_type, opponent), (0, 0))
+            pairs[(ai_type, opponent)] = (games + 1, wins + (match["winner_team"] == team))
+    matrix = {}
+    for (ai_type, opponent), (games, wins) in pairs.items():
+        matrix.setdefault(ai_type, {})[opponent] = wins / games
+    return matrix
+
+def format_table(summary):
+    """按胜率从高到低输出汇总表"""
+    header = f"{'AI':<18}{'对局':>6}{'胜':>6}{'负':>6}{'平':>6}{'胜率':>8}{'获胜用时':>10}{'存活':>8}{'CPU ms/tick':>13}"
+    lines = [header, "-" * len(header)]
+    for ai_type, entry in sorted(summary.items(), key=lambda item: -item[1]["win_rate"]):
+        win_time = entry["avg_time_to_victory"]
+        lines.append(
+            f"{ai_type:<18}{entry['games']:>6}{entry['wins']:>6}{entry['losses']:>6}{entry['draws']:>6}"
+            f"{entry['win_rate']:>8.1%}{(f'{win_time:.1f}s' if win_time is not None else '-'):>10}"
+            f"{entry['avg_survivors']:>8.1f}{entry['avg_cpu_ms_per_tick']:>13.3f}")
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="无头模式AI锦标赛：所有AI两两对战，统计胜率和CPU耗时")
+    parser.add_argument("--ais", help="参赛AI类型，逗号分隔（默认全部）")
+    parser.add_argument("--levels", help="关卡文件名，逗号分隔（默认全部）")
+    parser.add_argument("--seeds", type=int, default=3, help="每个对局组合运行的随机种子数")
+    parser.add_argument("--frames", type=int, default=FPS * 120, help="每局最多运行的帧数")
+    parser.add_argument("--dt", type=float, default=1 / FPS, help="固定时间步长（秒）")
+    parser.add_argument("--processes", type=int, default=os.cpu_count(), help="并行进程数")
+    parser.add_argument("--no-mirror", action="store_true", help="跳过同类型AI的对战")
+    parser.add_argument("--unbudgeted", action="store_true",
+                        help="不限制逐单位决策的时间预算（结果可复现，但CPU耗时不反映实际游戏）")
+    parser.add_argument("--output", default="tournament.json", help="结果JSON路径")
+    args = parser.parse_args()
+
+    known = registered_ai_types()
+    ai_types = args.ais.split(",") if args.ais else list(known)
+    unknown = [t for t in ai_types if t not in known]
+    if unknown:
+        print(f"未知的AI类型: {', '.join(unknown)}")
+        return 1
+
+    init_worker()
+    if args.levels:
+        levels = []
+        for name in args.levels.split(","):
+            index = process_level_manager.find_level(name)
+            if index is None:
+                print(f"找不到关卡: {name}")
+                return 1
+            levels.append(process_level_manager.available_levels[index]['file'])
+    else:
+        levels = [level['file'] for level in process_level_manager.available_levels]
+
+    matches = [(level, ai_a, ai_b, seed, args.frames, args.dt, args.unbudgeted)
+               for level in levels
+               for ai_a in ai_types
+               for ai_b in ai_types
+               if not (args.no_mirror and ai_a == ai_b)
+               for seed in range(args.seeds)]
+    print(f"{len(ai_types)} 种AI × {len(levels)} 个关卡 × {args.seeds} 个种子: "
+          f"{len(matches)} 局，{args.processes} 个进程")
+
+    start = time.perf_counter()
+    results = []
+    with multiprocessing.get_context("spawn").Pool(args.processes, initializer=init_worker) as pool:
+        for i, result in enumerate(pool.imap_unordered(run_match, matches), 1):
+            results.append(result)
+            if i % 50 == 0 or i == len(matches):
+                print(f"  {i}/{len(matches)} ({time.perf_counter() - start:.0f}s)")
+        # SDL会拦截SIGTERM，不能依赖 terminate() 结束子进程，正常关闭进程池
+        pool.close()
+        pool.join()
+    results.sort(key=lambda m: (m["level"], m["ai_a"], m["ai_b"], m["seed"]))
+
+    summary = summarize(results)
+    print(format_table(summary))
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({
+            "settings": {"ais": ai_types, "levels": levels, "seeds": args.seeds,
+                         "frames": args.frames, "dt": args.dt, "unbudgeted": args.unbudgeted},
+            "summary": summary,
+            "pairs": pair_matrix(results),
+            "matches": results,
+        }, f, ensure_ascii=False, indent=2)
+    print(f"结果已写入 {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+import os
+import json
+import time
+import queue
+import atexit
+import threading
+from collections import deque
+from config import TRACE_SPEC, TRACE_FILE, TRACE_BUFFER_SIZE
+
+# 事件级别
+DEBUG = 10
+INFO = 20
+WARNING = 30
+OFF = 100
+
+LEVEL_NAMES = {'debug': DEBUG, 'info': INFO, 'warning': WARNING, 'off': OFF}
+LEVEL_LABELS = {DEBUG: 'debug', INFO: 'info', WARNING: 'warning'}
+
+def parse_spec(spec):
+    """解析级别配置："info" 或 "ai:debug,unit:off"（不带分类的项作为默认级别）
+
+    返回 (默认阈值, {分类: 阈值})
+    """
+    default = OFF
+    thresholds = {}
+    for item in spec.split(','):
+        item = item.strip().lower()
+        if not item:
+            continue
+        category, _, level = item.rpartition(':')
+        if level not in LEVEL_NAMES:
+            raise ValueError(f"未知的跟踪级别: {level}")
+        if category in ('', '*', 'all'):
+            default = LEVEL_NAMES[level]
+        else:
+            thresholds[category] = LEVEL_NAMES[level]
+    return default, thresholds
+
+class Tracer:
+    """分级、分类的事件跟踪
+
+    事件进入内存环形缓冲（保留最近 buffer_size 条），配置了文件时由后台线程
+    以JSONL格式追加写入。调用方在格式化消息前先用 enabled() 检查，
+    关闭的分类只有一次字典查找的开销：
+
+        if tracer.enabled("ai", DEBUG):
+            tracer.emit("ai", DEBUG, f"...", unit=unit.id)
+
+    echo为True时同时输出到标准输出（调试用）。
+    """
+
+    def __init__(self, spec=TRACE_SPEC, path=TRACE_FILE, buffer_size=TRACE_BUFFER_SIZE, echo=False):
+        self.buffer = deque(maxlen=buffer_size)
+        self.default_threshold = OFF
+        self.thresholds = {}
+        self.echo = echo
+        self.emitted = 0  # 通过级别检查的事件数
+        self.path = None
+        self.queue = None
+        self.writer = None
+        self.configure(spec)
+        if path:
+            self.open_file(path)
+
+    @classmethod
+    def from_env(cls):
+        """按环境变量 RTS_TRACE（级别配置）和 RTS_TRACE_FILE（JSONL路径）创建"""
+        return cls(os.environ.get('RTS_TRACE', TRACE_SPEC), os.environ.get('RTS_TRACE_FILE', TRACE_FILE))
+
+    def configure(self, spec):
+        """重新设置各分类的级别"""
+        self.default_threshold, self.thresholds = parse_spec(spec)
+
+    def enabled(self, category, level):
+        return level >= self.thresholds.get(category, self.default_threshold)
+
+    def emit(self, category, level, message, **fields):
+        """记录一条事件（调用方应已检查 enabled）"""
+        event = (time.time(), category, level, message, fields)
+        self.buffer.append(event)
+        self.emitted += 1
+        if self.echo:
+            print(message)
+        if self.queue is not None:
+            self.queue.put(event)
+
+    def recent(self, count=None, category=None):
+        """最近的事件（旧的在前）"""
+        events = [e for e in self.buffer if category is None or e[1] == category]
+        return events if count is None else events[-count:]
+
+    def open_file(self, path):
+        """开始把事件追加写入JSONL文件"""
+        self.close()
+        self.path = path
+        self.queue = queue.SimpleQueue()
+        self.writer = threading.Thread(target=self.run_writer, args=(path, self.queue), daemon=True)
+        self.writer.start()
+
+    def close(self):
+        """停止写文件，等待已提交的事件写完"""
+        if self.writer is None:
+            return
+        self.queue.put(None)
+        self.writer.join()
+        self.writer = None
+        self.queue = None
+        self.path = None
+
+    def run_writer(self, path, events):
+        """后台线程：逐条写入，队列空时刷新"""
+        with open(path, 'a', encoding='utf-8') as f:
+            while True:
+                event = events.get()
+                if event is None:
+                    break
+                timestamp, category, level, message, fields = event
+                record = {'time': timestamp, 'category': category,
+                          'level': LEVEL_LABELS.get(level, level), 'message': message}
+                record.update(fields)
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+                if events.empty():
+                    f.flush()
+
+# 全局跟踪器
+tracer = Tracer.from_env()
+atexit.register(tracer.close)
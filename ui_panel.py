@@ -1,6 +1,7 @@
 import pygame
 from config import *
 from units import UnitState
+from surface_pool import surface_pool
 
 class UnitPanel:
     def __init__(self):
@@ -72,9 +73,7 @@ class UnitPanel:
             return
             
         # 绘制半透明背景
-        panel_surface = pygame.Surface((self.width, self.height))
-        panel_surface.set_alpha(220)  # 半透明
-        panel_surface.fill(COLOR_DARK_GRAY)
+        panel_surface = surface_pool.get_overlay((self.width, self.height), COLOR_DARK_GRAY, 220)
         screen.blit(panel_surface, (self.x, self.y))
         
         # 绘制边框
@@ -114,9 +113,8 @@ class UnitPanel:
                 if unit_y + self.unit_height >= y_offset and unit_y <= y_offset + content_height:
                     # 绘制单位背景
                     if unit.selected:
-                        back_surface = pygame.Surface((self.width - 16, self.unit_height - 2))
-                        back_surface.set_alpha(120)
-                        back_surface.fill(COLOR_BLUE)
+                        back_surface = surface_pool.get_overlay((self.width - 16, self.unit_height - 2),
+                                                                COLOR_BLUE, 120)
                         screen.blit(back_surface, (self.x + 2, unit_y))
                     
                     # 绘制单位名称
@@ -2,7 +2,34 @@ import pygame
 import math
 import random
 from enum import Enum
+from itertools import count
+from operator import attrgetter
 from config import *
+from status_bars import status_bar_renderer
+from effects import (MeleeEffect, Projectile, ProjectileEffect, ArtilleryProjectile,
+                     MissileProjectile, BeamEffect)
+from skill_system import SkillSystem
+from tracing import tracer, DEBUG, INFO
+
+unit_ids = count(1)  # 单位编号（AI子进程回传命令和回放时用来定位单位）
+
+def reset_unit_ids():
+    """重新从1开始编号（加载关卡时调用，同一关卡的单位编号可复现）"""
+    global unit_ids
+    unit_ids = count(1)
+
+def tracked_stat(name):
+    """影响阵营实力汇总的数值属性：值变化时把单位标记为脏"""
+    attr = '_' + name
+
+    def set_stat(self, value):
+        if value != self.__dict__.get(attr):
+            self.__dict__[attr] = value
+            stats = self.team_stats
+            if stats is not None:
+                stats.dirty.add(self)
+
+    return property(attrgetter(attr), set_stat)
 
 class UnitState(Enum):
     IDLE = "idle"
@@ -68,11 +95,23 @@ class GameObject:
             # 默认绘制
             radius = int(self.radius * camera.zoom)
             color = self.get_default_color() if hasattr(self, 'get_default_color') else COLOR_WHITE
-            pygame.draw.circle(screen, color, (screen_x, screen_y), radius, 2)
+            screen.circle(color, (screen_x, screen_y), radius, 2)
 
 class Unit(GameObject):
+    # 绘制时复用的片段列表（绘制是单线程的）
+    _draw_fragments = []
+    
+    # 阵营实力汇总跟踪的属性
+    hp = tracked_stat('hp')
+    energy = tracked_stat('energy')
+    sp = tracked_stat('sp')
+    attack_damage = tracked_stat('attack_damage')
+    team_stats = None  # 所属阵营的 TeamStats，由 GameState 加入/移除单位时设置
+    expiry = None  # buff/护盾到期调度器，由 GameState 加入单位时设置
+    
     def __init__(self, x, y, team, unit_data):
         super().__init__(x, y)
+        self.id = next(unit_ids)
         self.team = team
         self.unit_type = UnitType(unit_data["type"])
         
@@ -91,7 +130,7 @@ class Unit(GameObject):
         self.attack_range = unit_data.get("attack_range", 0)
         self.attack_cooldown = unit_data.get("attack_cooldown", 1.0)
         self.radius = unit_data.get("radius", 20)
-        self.last_attack_time = 0
+        self.last_attack_time = float('-inf')  # 关卡时间（秒）
         
         # 攻击类型
         self.attack_type = AttackType(unit_data.get("attack_type", "ranged"))
@@ -125,9 +164,9 @@ class Unit(GameObject):
         self.repair_rate = unit_data.get("repair_rate", 10)
         
         # Buff/Debuff系统
-        self.buffs = {}
+        self.buffs = {}  # 类型 -> (倍率, 到期时间)
         self.shield = 0
-        self.shield_time = 0
+        self.shield_expires_at = None
         
         # 补给状态
         self.is_supplying = False
@@ -146,21 +185,48 @@ class Unit(GameObject):
         else:
             return COLOR_PLAYER if self.team == 0 else COLOR_ENEMY
         
+    def schedule_expiry(self, duration, callback, *args):
+        """登记到期回调，返回到期时间（不在 GameState 中的单位不会到期）"""
+        if self.expiry is None:
+            return None
+        return self.expiry.schedule(duration, callback, *args)
+        
     def apply_buff(self, buff_type, multiplier, duration):
         """应用增益效果"""
-        self.buffs[buff_type] = (multiplier, duration)
-        self.update_stats()
+        previous = self.buffs.get(buff_type)
+        expires_at = self.schedule_expiry(duration, self.expire_buff, buff_type)
+        self.buffs[buff_type] = (multiplier, expires_at)
+        # 只刷新持续时间时属性不变
+        if previous is None or previous[0] != multiplier:
+            self.update_stats()
         
     def apply_shield(self, amount, duration):
         """应用护盾"""
         self.shield = amount
-        self.shield_time = duration
+        self.shield_expires_at = self.schedule_expiry(duration, self.expire_shield)
         
     def apply_debuff(self, debuff_type, duration):
         """应用负面效果"""
         if debuff_type == "disable":
             self.state = UnitState.DISABLED
-            self.buffs["disable"] = (1.0, duration)
+            self.buffs["disable"] = (1.0, self.schedule_expiry(duration, self.expire_buff, "disable"))
+            
+    def expire_buff(self, buff_type, expires_at):
+        """到期回调：移除buff/debuff（已被重新施加的旧条目忽略）"""
+        entry = self.buffs.get(buff_type)
+        if entry is None or entry[1] != expires_at or self.state == UnitState.DEAD:
+            return
+        del self.buffs[buff_type]
+        if buff_type == "disable":
+            self.state = UnitState.IDLE
+        else:
+            self.update_stats()
+            
+    def expire_shield(self, expires_at):
+        """到期回调：移除护盾"""
+        if self.shield_expires_at == expires_at:
+            self.shield = 0
+            self.shield_expires_at = None
             
     def update_stats(self):
         """更新单位属性"""
@@ -201,29 +267,6 @@ class Unit(GameObject):
         # 首先获取地形管理器
         terrain_manager = getattr(game_state, 'terrain_manager', None)
             
-        # 更新buff/debuff
-        expired_buffs = []
-        for buff_type, (multiplier, remaining_time) in self.buffs.items():
-            remaining_time -= dt
-            if remaining_time <= 0:
-                expired_buffs.append(buff_type)
-            else:
-                self.buffs[buff_type] = (multiplier, remaining_time)
-                
-        for buff_type in expired_buffs:
-            del self.buffs[buff_type]
-            if buff_type == "disable":
-                self.state = UnitState.IDLE
-                
-        # 更新属性
-        self.update_stats()
-        
-        # 更新护盾
-        if self.shield_time > 0:
-            self.shield_time -= dt
-            if self.shield_time <= 0:
-                self.shield = 0
-                
         # 如果被禁用，不执行其他逻辑
         if self.state == UnitState.DISABLED:
             return
@@ -234,7 +277,8 @@ class Unit(GameObject):
             if (self.sp >= self.max_sp and 
                 self.skill_data and 
                 self.unit_type != UnitType.MOTHERSHIP):
-                print(f"Player {self.unit_type} auto-using skill!")
+                if tracer.enabled("unit", INFO):
+                    tracer.emit("unit", INFO, f"Player {self.unit_type} auto-using skill!", unit=self.id)
                 self.use_skill(units, game_state)
                 
             # 自动补给（能量很低且空闲时）
@@ -243,7 +287,8 @@ class Unit(GameObject):
                 self.unit_type != UnitType.MOTHERSHIP):
                 mothership = self.find_mothership(units)
                 if mothership:
-                    print(f"Player {self.unit_type} auto-returning for supply")
+                    if tracer.enabled("unit", INFO):
+                        tracer.emit("unit", INFO, f"Player {self.unit_type} auto-returning for supply", unit=self.id)
                     self.state = UnitState.RETURNING
                     
             # 极小范围的自动寻敌（只有在完全空闲且敌人很近时）
@@ -257,7 +302,8 @@ class Unit(GameObject):
                 if enemy:
                     self.attack_target = enemy
                     self.state = UnitState.ATTACKING
-                    print(f"Player {self.unit_type} auto-engaging nearby enemy")
+                    if tracer.enabled("unit", INFO):
+                        tracer.emit("unit", INFO, f"Player {self.unit_type} auto-engaging nearby enemy", unit=self.id, target=enemy.id)
                     
             # 修理机自动修理（非常被动）
             if (self.unit_type == UnitType.REPAIR and
@@ -295,8 +341,8 @@ class Unit(GameObject):
                     else:
                         # 追击
                         self.move_towards(self.attack_target.x, self.attack_target.y, self.speed * dt, terrain_manager)
-                        if self.team == 1:  # AI单位打印追击信息
-                            print(f"AI {self.unit_type} chasing {self.attack_target.unit_type}, distance: {distance_to_target:.1f}")
+                        if self.team == 1 and tracer.enabled("unit", DEBUG):  # AI单位记录追击信息
+                            tracer.emit("unit", DEBUG, f"AI {self.unit_type} chasing {self.attack_target.unit_type}, distance: {distance_to_target:.1f}", unit=self.id, target=self.attack_target.id)
                 else:
                     # 其他单位正常攻击
                     if distance_to_target <= self.attack_range:
@@ -305,8 +351,8 @@ class Unit(GameObject):
                     else:
                         # 追击
                         self.move_towards(self.attack_target.x, self.attack_target.y, self.speed * dt, terrain_manager)
-                        if self.team == 1:  # AI单位打印追击信息
-                            print(f"AI {self.unit_type} pursuing {self.attack_target.unit_type}, distance: {distance_to_target:.1f}")
+                        if self.team == 1 and tracer.enabled("unit", DEBUG):  # AI单位记录追击信息
+                            tracer.emit("unit", DEBUG, f"AI {self.unit_type} pursuing {self.attack_target.unit_type}, distance: {distance_to_target:.1f}", unit=self.id, target=self.attack_target.id)
             else:
                 # 目标消失，AI单位立即寻找新目标，玩家单位停止
                 if self.team == 1:  # 如果是AI单位
@@ -315,7 +361,8 @@ class Unit(GameObject):
                         new_target = min(all_enemies, key=lambda e: self.distance_to(e))
                         self.attack_target = new_target
                         self.target = new_target
-                        print(f"AI {self.unit_type} acquired new target: {new_target.unit_type}")
+                        if tracer.enabled("unit", DEBUG):
+                            tracer.emit("unit", DEBUG, f"AI {self.unit_type} acquired new target: {new_target.unit_type}", unit=self.id, target=new_target.id)
                     else:
                         self.state = UnitState.IDLE
                         self.attack_target = None
@@ -393,7 +440,6 @@ class Unit(GameObject):
                 supply_amount = SUPPLY_RATE * dt
                 self.energy = min(self.energy + supply_amount, self.max_energy)
                 
-                from config import SUPPLY_HP_RATE
                 heal_amount = SUPPLY_HP_RATE * dt
                 self.hp = min(self.hp + heal_amount, self.max_hp)
                 
@@ -411,7 +457,7 @@ class Unit(GameObject):
                 self.supply_target = None
                 
     def perform_attack(self, game_state):
-        current_time = pygame.time.get_ticks() / 1000.0
+        current_time = game_state.level_time
         if current_time - self.last_attack_time >= self.attack_cooldown:
             energy_cost = ENERGY_ATTACK_COST if self.unit_type != UnitType.MOTHERSHIP else 0
             if self.energy >= energy_cost:
@@ -442,7 +488,6 @@ class Unit(GameObject):
                 
     def perform_melee_attack(self, game_state):
         self.target.take_damage(self.attack_damage)
-        from effects import MeleeEffect
         game_state.add_effect(MeleeEffect(self.x, self.y, self.target.x, self.target.y))
         
     def perform_ranged_attack(self, game_state):
@@ -455,25 +500,21 @@ class Unit(GameObject):
                 target_x, target_y = self.target.x, self.target.y
                 
             # 创建投射物而不是特效
-            from effects import Projectile
             projectile = Projectile(self.x, self.y, target_x, target_y,
                                   self.attack_damage // self.projectile_count,
                                   self.projectile_speed, self.target)
             game_state.add_projectile(projectile)
             
             # 添加发射特效
-            from effects import ProjectileEffect
             game_state.add_effect(ProjectileEffect(self.x, self.y, target_x, target_y))
             
     def perform_artillery_attack(self, game_state):
-        from effects import ArtilleryProjectile
         # 炮击有飞行时间，可以躲避
         projectile = ArtilleryProjectile(self.x, self.y, self.target.x, self.target.y,
                                        self.attack_damage, self.splash_radius, 200)
         game_state.add_projectile(projectile)
         
     def perform_missile_attack(self, game_state):
-        from effects import MissileProjectile
         # 导弹会追踪目标
         projectile = MissileProjectile(self.x, self.y, self.target, self.attack_damage, 300)
         game_state.add_projectile(projectile)
@@ -481,7 +522,6 @@ class Unit(GameObject):
     def perform_beam_attack(self, game_state):
         # 光束瞬间命中
         self.target.take_damage(self.attack_damage)
-        from effects import BeamEffect
         game_state.add_effect(BeamEffect(self.x, self.y, self.target.x, self.target.y))
     
     def take_damage(self, damage):
@@ -507,81 +547,78 @@ class Unit(GameObject):
             return
             
         if self.sp >= self.max_sp:
-            from skill_system import SkillSystem
             SkillSystem.execute_skill(self, self.skill_data, units, game_state)
             self.sp = 0
             
-    def draw(self, screen, camera, sprite_manager):
+    def draw(self, screen, camera, sprite_manager, detail=True):
+        """绘制单位，detail为False时（低细节层级）省略属性条和状态指示"""
         super().draw(screen, camera, sprite_manager)
         
         screen_x, screen_y = camera.world_to_screen(self.x, self.y)
+        center = (screen_x, screen_y)
+        
+        # 护盾、禁用圈、三个属性条和选中框收集后一次批量绘制
+        bars = status_bar_renderer
+        fragments = self._draw_fragments
         
         # 绘制护盾
         if self.shield > 0:
             shield_radius = int((self.radius + 8) * camera.zoom)
-            pygame.draw.circle(screen, COLOR_CYAN, (screen_x, screen_y), shield_radius, 2)
+            bars.add_ring(fragments, COLOR_CYAN, center, shield_radius, 2)
         
         # 绘制禁用效果
         if self.state == UnitState.DISABLED:
             disable_radius = int((self.radius + 12) * camera.zoom)
-            pygame.draw.circle(screen, COLOR_PURPLE, (screen_x, screen_y), disable_radius, 2)
+            bars.add_ring(fragments, COLOR_PURPLE, center, disable_radius, 2)
         
-        # 绘制血条
-        bar_width = int(40 * camera.zoom)
-        bar_height = int(4 * camera.zoom)
-        bar_offset = int((self.radius + 15) * camera.zoom)
+        if detail:
+            # 绘制血条
+            bar_width = int(40 * camera.zoom)
+            bar_height = int(4 * camera.zoom)
+            bar_offset = int((self.radius + 15) * camera.zoom)
+            bar_x = screen_x - bar_width//2
         
-        hp_ratio = self.hp / self.max_hp
-        pygame.draw.rect(screen, COLOR_ENEMY, 
-                       (screen_x - bar_width//2, screen_y - bar_offset, 
-                        bar_width, bar_height))
-        pygame.draw.rect(screen, COLOR_PLAYER, 
-                       (screen_x - bar_width//2, screen_y - bar_offset, 
-                        int(bar_width * hp_ratio), bar_height))
+            bars.add_bar(fragments, bar_x, screen_y - bar_offset, bar_width, bar_height,
+                         self.hp / self.max_hp, COLOR_ENEMY, COLOR_PLAYER)
                         
-        # 绘制能量条
-        if self.max_energy > 0:
-            energy_ratio = self.energy / self.max_energy
-            pygame.draw.rect(screen, COLOR_GRAY, 
-                           (screen_x - bar_width//2, screen_y - bar_offset - bar_height - 2, 
-                            bar_width, bar_height))
-            pygame.draw.rect(screen, COLOR_BLUE, 
-                           (screen_x - bar_width//2, screen_y - bar_offset - bar_height - 2, 
-                            int(bar_width * energy_ratio), bar_height))
+            # 绘制能量条
+            if self.max_energy > 0:
+                bars.add_bar(fragments, bar_x, screen_y - bar_offset - bar_height - 2, bar_width, bar_height,
+                             self.energy / self.max_energy, COLOR_GRAY, COLOR_BLUE)
                             
-        # 绘制SP条
-        if self.unit_type != UnitType.MOTHERSHIP and self.max_sp > 0:
-            sp_ratio = self.sp / self.max_sp
-            pygame.draw.rect(screen, COLOR_GRAY, 
-                           (screen_x - bar_width//2, screen_y - bar_offset - (bar_height + 2) * 2, 
-                            bar_width, bar_height))
-            pygame.draw.rect(screen, COLOR_YELLOW, 
-                           (screen_x - bar_width//2, screen_y - bar_offset - (bar_height + 2) * 2, 
-                            int(bar_width * sp_ratio), bar_height))
+            # 绘制SP条
+            if self.unit_type != UnitType.MOTHERSHIP and self.max_sp > 0:
+                bars.add_bar(fragments, bar_x, screen_y - bar_offset - (bar_height + 2) * 2, bar_width, bar_height,
+                             self.sp / self.max_sp, COLOR_GRAY, COLOR_YELLOW)
                             
         # 绘制选中框
         if self.selected:
             radius = int((self.radius + 5) * camera.zoom)
             color = COLOR_WHITE if self.team == 0 else COLOR_YELLOW
-            pygame.draw.circle(screen, color, (screen_x, screen_y), radius, 2)
+            bars.add_ring(fragments, color, center, radius, 2)
+            
+        bars.flush(screen, fragments)
+        
+        if not detail:
+            return
                              
         # 绘制状态指示
         if self.state == UnitState.SUPPLYING:
-            pygame.draw.circle(screen, COLOR_BLUE, (screen_x, screen_y - int(35 * camera.zoom)), 
-                             int(5 * camera.zoom))
+            screen.circle(COLOR_BLUE, (screen_x, screen_y - int(35 * camera.zoom)), 
+                          int(5 * camera.zoom))
         elif self.state == UnitState.FOLLOWING:
-            pygame.draw.circle(screen, COLOR_YELLOW, (screen_x, screen_y - int(35 * camera.zoom)), 
-                             int(5 * camera.zoom))
+            screen.circle(COLOR_YELLOW, (screen_x, screen_y - int(35 * camera.zoom)), 
+                          int(5 * camera.zoom))
         elif self.state in [UnitState.ATTACKING, UnitState.CIRCLE_STRAFING] and self.attack_target:
             # 绘制追击指示线
             if camera.zoom > 0.5:
                 target_x, target_y = camera.world_to_screen(self.attack_target.x, self.attack_target.y)
-                pygame.draw.line(screen, COLOR_ENEMY, (screen_x, screen_y), (target_x, target_y), 1)
+                screen.line(COLOR_ENEMY, (screen_x, screen_y), (target_x, target_y), 1)
         elif self.state == UnitState.REPAIRING and self.repair_target:
             # 绘制修理指示线
             if camera.zoom > 0.5:
                 target_x, target_y = camera.world_to_screen(self.repair_target.x, self.repair_target.y)
-                pygame.draw.line(screen, (0, 255, 0), (screen_x, screen_y), (target_x, target_y), 1)
+                screen.line((0, 255, 0), (screen_x, screen_y), (target_x, target_y), 1)
 
 class RepairUnit(Unit):
     def __init__(self, x, y, team, unit_data):
@@ -0,0 +1,132 @@
+from units import UnitType, UnitState
+from spatial_index import SpatialGrid
+
+DAMAGED_HP_RATIO = 0.7  # 血量低于该比例视为受伤
+
+class TeamView:
+    """一个阵营在本tick的汇总数据"""
+
+    __slots__ = ('team', 'units', 'mothership', 'centroid',
+                 'total_hp', 'total_max_hp', 'total_attack', 'total_energy')
+
+    def __init__(self, team, units):
+        self.team = team
+        self.units = tuple(units)
+        self.mothership = None
+        total_x = total_y = 0
+        total_hp = total_max_hp = total_attack = total_energy = 0
+        for unit in self.units:
+            if self.mothership is None and unit.unit_type == UnitType.MOTHERSHIP:
+                self.mothership = unit
+            total_x += unit.x
+            total_y += unit.y
+            total_hp += unit.hp
+            total_max_hp += unit.max_hp
+            total_attack += unit.attack_damage
+            total_energy += unit.energy
+        count = len(self.units)
+        self.centroid = (total_x / count, total_y / count) if count else None
+        self.total_hp = total_hp
+        self.total_max_hp = total_max_hp
+        self.total_attack = total_attack
+        self.total_energy = total_energy
+
+class NeighbourStats:
+    """单位周围半径内的邻居统计（不含自身；damaged_allies 含自身，技能判断按此计数）"""
+
+    __slots__ = ('enemies', 'allies', 'damaged_allies')
+
+    def __init__(self, unit, radius, grid):
+        enemies = allies = damaged_allies = 0
+        radius_sq = radius * radius
+        x, y, team = unit.x, unit.y, unit.team
+        for cell in grid.cells_in_radius(x, y, radius):
+            for other in cell:
+                dx = other.x - x
+                dy = other.y - y
+                if dx * dx + dy * dy > radius_sq:
+                    continue
+                if other.team != team:
+                    enemies += 1
+                    continue
+                if other.hp < other.max_hp * DAMAGED_HP_RATIO:
+                    damaged_allies += 1
+                if other is not unit:
+                    allies += 1
+        self.enemies = enemies
+        self.allies = allies
+        self.damaged_allies = damaged_allies
+
+class WorldView:
+    """每个tick构建一次的只读世界快照
+
+    在AI更新之前由GameState构建，所有AI控制器共享：阵营划分（元组）、母舰、
+    重心、实力汇总和空间索引只计算一次；影响力图提供O(1)的威胁/安全/前线查询，
+    forces 提供增量维护的各阵营加权实力。快照内的列表都是元组，控制器需要
+    修改时应先复制。邻居统计和来袭伤害按需计算并在本tick内缓存，所有技能判断共用。
+    """
+
+    def __init__(self, units, level_time=0, influence=None, motion=None, forces=None):
+        self.level_time = level_time
+        self.influence = influence  # GameState持有的影响力图（增量更新，跨tick复用）
+        self.motion = motion        # GameState持有的运动历史（速度估计、拦截点）
+        self.forces = forces        # GameState持有的各阵营实力汇总（ForceStats）
+        self.units = tuple(u for u in units if u.state != UnitState.DEAD)
+
+        by_team = {}
+        for unit in self.units:
+            members = by_team.get(unit.team)
+            if members is None:
+                by_team[unit.team] = [unit]
+            else:
+                members.append(unit)
+        self.teams = {team: TeamView(team, members) for team, members in by_team.items()}
+        self.enemies = {}  # 阵营 -> 其他所有阵营的单位（按需计算）
+        self.grid = SpatialGrid(self.units)
+        self.neighbour_cache = {}  # (单位, 半径) -> NeighbourStats
+        self.incoming = None  # 单位 -> (来袭攻击者数量, 来袭伤害)（按需计算）
+
+    def team(self, team):
+        """获取阵营汇总（阵营已全灭时返回空汇总）"""
+        view = self.teams.get(team)
+        if view is None:
+            view = TeamView(team, ())
+            self.teams[team] = view
+        return view
+
+    def my_units(self, team):
+        return self.team(team).units
+
+    def enemy_units(self, team):
+        """获取敌对阵营的全部单位"""
+        enemies = self.enemies.get(team)
+        if enemies is None:
+            enemies = tuple(u for u in self.units if u.team != team)
+            self.enemies[team] = enemies
+        return enemies
+
+    def mothership(self, team):
+        return self.team(team).mothership
+
+    def neighbours(self, unit, radius):
+        """单位半径内的敌人/友军/受伤友军数量（本tick缓存）"""
+        key = (unit, radius)
+        stats = self.neighbour_cache.get(key)
+        if stats is None:
+            stats = NeighbourStats(unit, radius, self.grid)
+            self.neighbour_cache[key] = stats
+        return stats
+
+    def incoming_attack(self, unit):
+        """以该单位为目标、且在1.5倍攻击范围内的攻击者数量和攻击力总和"""
+        if self.incoming is None:
+            incoming = {}
+            for attacker in self.units:
+                target = attacker.attack_target
+                if target is None or target.team == attacker.team:
+                    continue
+                if attacker.distance_to(target) <= attacker.attack_range * 1.5:
+                    count, damage = incoming.get(target, (0, 0))
+                    incoming[target] = (count + 1, damage + attacker.attack_damage)
+            self.incoming = incoming
+        return self.incoming.get(unit, (0, 0))